@@ -71,6 +71,7 @@ def add_summaries_from_django():
     # Process each document that needs a summary
     successful = 0
     failed = 0
+    updated_fingerprints = []  # Registry entries to write back in one transaction
     
     for i, doc in enumerate(docs_needing_summaries, 1):
         print(f"\n📄 Processing {i}/{len(docs_needing_summaries)}: {doc.company_name} {doc.form_type}")
@@ -128,10 +129,13 @@ def add_summaries_from_django():
                     # Update existing entry with summary
                     cognee_doc['summary'] = summary
                     cognee_doc['summary_generated_at'] = datetime.now().isoformat()
+                    updated_fingerprints.append(cognee_fingerprint)
                     print(f"    ✅ Summary added to existing Cognee entry [{cognee_fingerprint[:8]}]")
                 else:
                     # Create new Cognee registry entry
-                    fingerprint = cognee_service._create_document_fingerprint(content, metadata)
+                    # Hash the content once; the fingerprint reuses it
+                    content_hash = cognee_service._hash_content(content)
+                    fingerprint = cognee_service._create_document_fingerprint(content, metadata, content_hash)
                     doc_info = {
                         'fingerprint': fingerprint,
                         'metadata': metadata,
@@ -140,10 +144,11 @@ def add_summaries_from_django():
                         'content_preview': content[:2000],
                         'full_content': content,
                         'stored_at': datetime.now().isoformat(),
-                        'content_hash': cognee_service._create_document_fingerprint(content, metadata),
+                        'content_hash': content_hash,
                         'summary_generated_at': datetime.now().isoformat()
                     }
                     cognee_service._document_registry[fingerprint] = doc_info
+                    updated_fingerprints.append(fingerprint)
                     print(f"    ✅ New Cognee registry entry created [{fingerprint[:8]}]")
                 
                 successful += 1
@@ -164,7 +169,7 @@ def add_summaries_from_django():
     # Save updated registry
     if successful > 0:
         print(f"\n💾 Saving updated Cognee registry...")
-        cognee_service._save_document_registry()
+        cognee_service._save_registry_entries(updated_fingerprints)
         print(f"✅ Registry saved with {successful} new summaries")
     
     # Final report
@@ -165,6 +165,7 @@ class SummaryBackfillService:
             # Process documents
             print(f"\n🚀 Starting summary generation...")
             results = []
+            updated_fingerprints = []  # Registry entries to write back in one transaction
             
             for i, (fingerprint, doc_info) in enumerate(documents_to_process, 1):
                 metadata = doc_info.get('metadata', {})
@@ -177,6 +178,7 @@ class SummaryBackfillService:
                     # Update the document registry with the new summary
                     doc_info['summary'] = result['summary']
                     doc_info['summary_generated_at'] = datetime.now().isoformat()
+                    updated_fingerprints.append(fingerprint)
                     
                     self.processed_count += 1
                     print(f"      ✅ Summary added and registry updated")
@@ -195,7 +197,7 @@ class SummaryBackfillService:
             # Save the updated registry
             if self.processed_count > 0:
                 print(f"\n💾 Saving updated document registry...")
-                self.cognee_service._save_document_registry()
+                self.cognee_service._save_registry_entries(updated_fingerprints)
                 print(f"   ✅ Registry saved with {self.processed_count} new summaries")
             
             # Final summary
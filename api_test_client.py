@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the iterative analysis API test scripts
+
+Keeps one pooled keep-alive session for every script and implements the
+status polling loop once: conditional GETs with ETags, capped exponential
+backoff while nothing changes, and orjson parsing when it is installed.
+"""
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+BASE_URL = "http://localhost:8000"
+
+# Analysis statuses after which polling can stop
+TERMINAL_STATUSES = frozenset({'COMPLETED', 'FAILED', 'CANCELLED'})
+
+# Polling backoff: start fast, double each unchanged poll, cap the wait
+POLL_INITIAL_INTERVAL = 0.5
+POLL_MAX_INTERVAL = 30
+# Give up polling after this many seconds
+POLL_TIMEOUT = 300
+
+# Shared keep-alive session so repeated polls reuse one pooled connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
+
+def parse_json(response):
+    """Parse a response body, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def poll_until(url, is_done=None, on_update=None, params=None,
+               initial_interval=POLL_INITIAL_INTERVAL,
+               max_interval=POLL_MAX_INTERVAL,
+               timeout=POLL_TIMEOUT):
+    """
+    Poll a JSON endpoint until is_done(payload) is true or the timeout expires
+
+    The server's ETag is sent back as If-None-Match, so unchanged polls come
+    back as an empty 304. Each fresh payload resets the wait to
+    initial_interval; each 304 doubles it up to max_interval.
+
+    Args:
+        url: Endpoint to poll
+        is_done: Predicate on the payload; defaults to a terminal 'status'
+        on_update: Called with every fresh (non-304) payload
+        params: Callable returning the query params for the next poll
+        initial_interval: Seconds to wait after a changed payload
+        max_interval: Upper bound on the wait between polls
+        timeout: Seconds before giving up
+
+    Returns:
+        The payload that satisfied is_done, or None on timeout
+
+    Raises:
+        requests.HTTPError: If the endpoint answers with an error status
+    """
+    if is_done is None:
+        is_done = lambda payload: payload.get('status') in TERMINAL_STATUSES
+
+    deadline = time.monotonic() + timeout
+    last_etag = None
+    backoff_step = 0
+
+    while time.monotonic() < deadline:
+        headers = {'If-None-Match': last_etag} if last_etag else {}
+        response = SESSION.get(url, params=params() if params else None, headers=headers)
+
+        if response.status_code == 304:
+            backoff_step += 1
+        else:
+            response.raise_for_status()
+            last_etag = response.headers.get('ETag')
+            payload = parse_json(response)
+
+            if on_update:
+                on_update(payload)
+            if is_done(payload):
+                return payload
+            backoff_step = 0
+
+        wait = min(max_interval, initial_interval * 2 ** backoff_step)
+        time.sleep(max(0, min(wait, deadline - time.monotonic())))
+
+    return None
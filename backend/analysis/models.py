@@ -1,9 +1,30 @@
 from django.db import models
+from django.db.models import Q
 import json
 
+# Statuses of analyses that stopped before completing; only these can carry partial results
+TERMINATED_STATUSES = ['CANCELLED', 'FAILED']
+
+class IterativeAnalysisQuerySet(models.QuerySet):
+    """QuerySet helpers for IterativeAnalysis"""
+    
+    @staticmethod
+    def _has_partial_data():
+        """Q matching rows with a non-empty final_analysis or iteration_history"""
+        return (
+            (Q(final_analysis__isnull=False) & ~Q(final_analysis={})) |
+            (Q(iteration_history__isnull=False) & ~Q(iteration_history=[]))
+        )
+    
+    def with_partial_results(self):
+        """Filter to terminated analyses that have partial results (uses iter_terminated_idx)"""
+        return self.filter(Q(status__in=TERMINATED_STATUSES) & self._has_partial_data())
+
 class IterativeAnalysis(models.Model):
     """Model to store iterative analysis results"""
     
+    objects = IterativeAnalysisQuerySet.as_manager()
+    
     query = models.TextField(help_text="Original investment query")
     company_filter = models.CharField(max_length=255, blank=True, null=True, help_text="Company filter applied")
     
@@ -31,10 +52,20 @@ class IterativeAnalysis(models.Model):
         ('CANCELLED', 'Cancelled'),
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    TERMINATED_STATUSES = TERMINATED_STATUSES
     error_message = models.TextField(blank=True, null=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Small partial index covering only terminated analyses, the only
+            # rows that can carry partial results
+            models.Index(
+                fields=['status', '-created_at'],
+                name='iter_terminated_idx',
+                condition=Q(status__in=TERMINATED_STATUSES)
+            ),
+        ]
         verbose_name = 'Iterative Analysis'
         verbose_name_plural = 'Iterative Analyses'
     
@@ -165,16 +196,17 @@ class IterativeAnalysis(models.Model):
         self.completed_at = timezone.now()
         self.save()
 
-    def get_latest_iteration_analysis(self):
-        """Extract the latest analysis from iteration history for terminated analyses"""
-        if not self.iteration_history:
+    @staticmethod
+    def _latest_analysis_from_history(iteration_history):
+        """Return the analysis text of the most recent initial_analysis/refinement entry"""
+        if not iteration_history:
             return None
 
         # Find the most recent analysis iteration
         latest_analysis = None
         latest_timestamp = None
 
-        for iteration in self.iteration_history:
+        for iteration in iteration_history:
             if iteration.get('type') == 'initial_analysis' or iteration.get('type') == 'refinement':
                 timestamp = iteration.get('timestamp')
                 if timestamp and (not latest_timestamp or timestamp > latest_timestamp):
@@ -183,9 +215,28 @@ class IterativeAnalysis(models.Model):
 
         return latest_analysis
 
+    @classmethod
+    def latest_iteration_analysis_bulk(cls, ids):
+        """
+        Latest iteration analysis for many analyses with a single query
+        that loads only the id and iteration_history columns
+        
+        Returns:
+            Dict mapping analysis id -> latest analysis text (or None)
+        """
+        rows = cls.objects.filter(id__in=ids).values_list('id', 'iteration_history')
+        return {
+            analysis_id: cls._latest_analysis_from_history(iteration_history)
+            for analysis_id, iteration_history in rows
+        }
+
+    def get_latest_iteration_analysis(self):
+        """Extract the latest analysis from iteration history for terminated analyses"""
+        return self._latest_analysis_from_history(self.iteration_history)
+
     def has_partial_results(self):
         """Check if this terminated analysis has any partial results to display"""
-        if self.status not in ['CANCELLED', 'FAILED']:
+        if self.status not in TERMINATED_STATUSES:
             return False
 
         return bool(
@@ -3,6 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.http import parse_etags
+import hashlib
 import logging
 import threading
 from typing import Dict, Any
@@ -102,47 +104,91 @@ class IterativeAnalysisViewSet(viewsets.ModelViewSet):
             except:
                 pass
     
+    def _progress_etag(self, analysis: IterativeAnalysis, *representation) -> str:
+        """
+        ETag over the fields that change while an analysis progresses
+        
+        representation names the response shape (action name plus any
+        parameters that change the body) so different bodies never share a tag.
+        """
+        fingerprint = repr((
+            representation,
+            analysis.status,
+            analysis.total_iterations,
+            analysis.documents_analyzed,
+            analysis.rag_queries_executed,
+            analysis.final_completeness_score,
+            analysis.cancel_requested,
+            analysis.completed_at,
+            analysis.error_message,
+            len(analysis.iteration_history or []),
+        ))
+        return '"%s"' % hashlib.blake2b(fingerprint.encode(), digest_size=8).hexdigest()
+    
+    def _not_modified(self, request, etag: str) -> bool:
+        """True when If-None-Match names this ETag (weak comparison) or is *"""
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        
+        client_etags = parse_etags(if_none_match)
+        if client_etags == ['*']:
+            return True
+        return any(
+            (tag[2:] if tag.startswith('W/') else tag) == etag
+            for tag in client_etags
+        )
+    
+    def _build_status_payload(self, analysis: IterativeAnalysis) -> Dict[str, Any]:
+        """Build the status/progress payload shared by status and snapshot"""
+        response_data = {
+            'id': analysis.id,
+            'status': analysis.status,
+            'query': analysis.query,
+            'company_filter': analysis.company_filter,
+            'cancel_requested': analysis.cancel_requested,
+            'created_at': analysis.created_at,
+            'completed_at': analysis.completed_at if analysis.status == 'COMPLETED' else None,
+            'progress': {
+                'total_iterations': analysis.total_iterations,
+                'documents_analyzed': analysis.documents_analyzed,
+                'rag_queries_executed': analysis.rag_queries_executed,
+                'final_completeness_score': analysis.final_completeness_score
+            }
+        }
+        
+        if analysis.status == 'COMPLETED':
+            response_data['final_recommendation'] = analysis.get_final_recommendation()
+            response_data['confidence_level'] = analysis.get_confidence_level()
+        elif analysis.status in IterativeAnalysis.TERMINATED_STATUSES:
+            if analysis.status == 'FAILED':
+                response_data['error_message'] = analysis.error_message
+
+            # Include partial results information for terminated analyses
+            response_data['has_partial_results'] = analysis.has_partial_results()
+            if analysis.has_partial_results():
+                latest_analysis = analysis.get_latest_iteration_analysis()
+                if latest_analysis:
+                    response_data['latest_iteration_analysis'] = latest_analysis
+                response_data['termination_reason'] = (
+                    'Analysis was cancelled by user' if analysis.status == 'CANCELLED'
+                    else f'Analysis failed: {analysis.error_message}'
+                )
+        
+        return response_data
+    
     @action(detail=True, methods=['get'])
     def status(self, request, pk=None):
         """Get analysis status and progress"""
         try:
             analysis = self.get_object()
             
-            response_data = {
-                'id': analysis.id,
-                'status': analysis.status,
-                'query': analysis.query,
-                'company_filter': analysis.company_filter,
-                'cancel_requested': analysis.cancel_requested,
-                'created_at': analysis.created_at,
-                'completed_at': analysis.completed_at if analysis.status == 'COMPLETED' else None,
-                'progress': {
-                    'total_iterations': analysis.total_iterations,
-                    'documents_analyzed': analysis.documents_analyzed,
-                    'rag_queries_executed': analysis.rag_queries_executed,
-                    'final_completeness_score': analysis.final_completeness_score
-                }
-            }
+            # Skip building the payload entirely when nothing has changed
+            etag = self._progress_etag(analysis, 'status')
+            if self._not_modified(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
             
-            if analysis.status == 'COMPLETED':
-                response_data['final_recommendation'] = analysis.get_final_recommendation()
-                response_data['confidence_level'] = analysis.get_confidence_level()
-            elif analysis.status in ['FAILED', 'CANCELLED']:
-                if analysis.status == 'FAILED':
-                    response_data['error_message'] = analysis.error_message
-
-                # Include partial results information for terminated analyses
-                response_data['has_partial_results'] = analysis.has_partial_results()
-                if analysis.has_partial_results():
-                    latest_analysis = analysis.get_latest_iteration_analysis()
-                    if latest_analysis:
-                        response_data['latest_iteration_analysis'] = latest_analysis
-                    response_data['termination_reason'] = (
-                        'Analysis was cancelled by user' if analysis.status == 'CANCELLED'
-                        else f'Analysis failed: {analysis.error_message}'
-                    )
-            
-            return Response(response_data)
+            return Response(self._build_status_payload(analysis), headers={'ETag': etag})
             
         except Exception as e:
             logger.error(f"Error getting analysis status: {str(e)}")
@@ -161,7 +207,7 @@ class IterativeAnalysisViewSet(viewsets.ModelViewSet):
             if analysis.status == 'COMPLETED':
                 # Full results for completed analyses
                 pass
-            elif analysis.status in ['CANCELLED', 'FAILED'] and analysis.has_partial_results():
+            elif analysis.status in IterativeAnalysis.TERMINATED_STATUSES and analysis.has_partial_results():
                 # Partial results for terminated analyses
                 pass
             else:
@@ -277,6 +323,55 @@ class IterativeAnalysisViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _format_iteration_history(self, iteration_history) -> list:
+        """Process iteration history for better presentation"""
+        formatted_history = []
+        for iteration in iteration_history:
+            formatted_iteration = {
+                'iteration': iteration.get('iteration', 0),
+                'type': iteration.get('type', 'unknown'),
+                'timestamp': iteration.get('timestamp'),
+            }
+            
+            if iteration['type'] == 'initial_analysis':
+                formatted_iteration['summary'] = 'Generated comprehensive initial analysis'
+            elif iteration['type'] == 'evaluation':
+                eval_data = iteration.get('evaluation', {})
+                formatted_iteration.update({
+                    'completeness_score': eval_data.get('completeness_score', 0),
+                    'is_complete': eval_data.get('is_analysis_complete', False),
+                    'assessment': eval_data.get('overall_assessment', 'Unknown'),
+                    'questions_raised': len(eval_data.get('specific_questions', []))
+                })
+            elif iteration['type'] == 'rag_queries':
+                formatted_iteration.update({
+                    'queries_executed': len(iteration.get('queries', [])),
+                    'queries': iteration.get('queries', [])
+                })
+            elif iteration['type'] == 'refined_analysis':
+                formatted_iteration['summary'] = 'Analysis refined with RAG results'
+            
+            formatted_history.append(formatted_iteration)
+        
+        return formatted_history
+    
+    def _history_since(self, request, iteration_history) -> list:
+        """
+        Slice the stored history at the client's ?since_step=N cursor
+        
+        Several steps share an iteration number and are appended over time,
+        so the cursor is the count of steps the client already holds rather
+        than an iteration number.
+        """
+        return (iteration_history or [])[self._since_step(request):]
+    
+    def _since_step(self, request) -> int:
+        """Parse the ?since_step=N history cursor, defaulting to the full history"""
+        try:
+            return max(0, int(request.query_params.get('since_step', 0)))
+        except (TypeError, ValueError):
+            return 0
+    
     @action(detail=True, methods=['get'])
     def iteration_details(self, request, pk=None):
         """Get detailed iteration history"""
@@ -291,44 +386,22 @@ class IterativeAnalysisViewSet(viewsets.ModelViewSet):
                     'total_iterations': analysis.total_iterations,
                     'final_score': analysis.final_completeness_score,
                     'iteration_history': [],
+                    'history_length': 0,
                     'status': analysis.status
                 })
             
-            # Process iteration history for better presentation
-            formatted_history = []
-            for iteration in analysis.iteration_history:
-                formatted_iteration = {
-                    'iteration': iteration.get('iteration', 0),
-                    'type': iteration.get('type', 'unknown'),
-                    'timestamp': iteration.get('timestamp'),
-                }
-                
-                if iteration['type'] == 'initial_analysis':
-                    formatted_iteration['summary'] = 'Generated comprehensive initial analysis'
-                elif iteration['type'] == 'evaluation':
-                    eval_data = iteration.get('evaluation', {})
-                    formatted_iteration.update({
-                        'completeness_score': eval_data.get('completeness_score', 0),
-                        'is_complete': eval_data.get('is_analysis_complete', False),
-                        'assessment': eval_data.get('overall_assessment', 'Unknown'),
-                        'questions_raised': len(eval_data.get('specific_questions', []))
-                    })
-                elif iteration['type'] == 'rag_queries':
-                    formatted_iteration.update({
-                        'queries_executed': len(iteration.get('queries', [])),
-                        'queries': iteration.get('queries', [])
-                    })
-                elif iteration['type'] == 'refined_analysis':
-                    formatted_iteration['summary'] = 'Analysis refined with RAG results'
-                
-                formatted_history.append(formatted_iteration)
+            # Only format the steps the client has not seen yet
+            formatted_history = self._format_iteration_history(
+                self._history_since(request, analysis.iteration_history)
+            )
             
             return Response({
                 'analysis_id': analysis.id,
                 'query': analysis.query,
                 'total_iterations': analysis.total_iterations,
                 'final_score': analysis.final_completeness_score,
-                'iteration_history': formatted_history
+                'iteration_history': formatted_history,
+                'history_length': len(analysis.iteration_history)
             })
             
         except Exception as e:
@@ -338,6 +411,33 @@ class IterativeAnalysisViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=True, methods=['get'])
+    def snapshot(self, request, pk=None):
+        """Get status, progress and iteration history in a single response"""
+        try:
+            analysis = self.get_object()
+            
+            # The history slice depends on the cursor, so it is part of the tag
+            etag = self._progress_etag(analysis, 'snapshot', self._since_step(request))
+            if self._not_modified(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+            
+            # One fetch of the analysis row serves both halves of the payload
+            response_data = self._build_status_payload(analysis)
+            response_data['iteration_history'] = self._format_iteration_history(
+                self._history_since(request, analysis.iteration_history)
+            )
+            response_data['history_length'] = len(analysis.iteration_history or [])
+            
+            return Response(response_data, headers={'ETag': etag})
+            
+        except Exception as e:
+            logger.error(f"Error getting analysis snapshot: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
     @action(detail=False, methods=['get'])
     def service_status(self, request):
         """Check if the iterative analysis service is available"""
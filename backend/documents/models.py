@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 class Document(models.Model):
@@ -37,6 +38,14 @@ class Document(models.Model):
     
     class Meta:
         ordering = ['-filing_date', '-created_at']
+        indexes = [
+            # Partial index for STORED-only listings, in the default ordering
+            models.Index(
+                fields=['-filing_date', '-created_at'],
+                name='doc_stored_idx',
+                condition=Q(status='STORED')
+            ),
+        ]
     
     def __str__(self):
         return f"{self.form_type} - {self.company_name} ({self.filing_date})"
@@ -4,8 +4,10 @@ import os
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from functools import lru_cache
+from collections import namedtuple
 import hashlib
 import json
+import re
 
 # Configure Cognee paths BEFORE importing cognee
 def _configure_cognee_paths():
@@ -52,6 +54,27 @@ from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
+# Registry statistics gathered in a single pass (see CogneeService.snapshot)
+RegistrySnapshot = namedtuple('RegistrySnapshot', [
+    'total', 'with_summaries', 'ai_summaries', 'basic_summaries',
+    'avg_size', 'max_size', 'companies', 'form_types',
+    'earliest_filing', 'latest_filing', 'storage_dates', 'docs'
+])
+
+# Words ignored when matching company names ("Apple Inc." and "APPLE INC" share a key)
+COMPANY_SUFFIXES = {'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'llc', 'plc', 'the'}
+
+# Common company name patterns recognised in queries (lowercase pattern -> company name)
+COMPANY_PATTERNS = {
+    'apple': 'Apple Inc.',
+    'microsoft': 'Microsoft Corporation',
+    'google': 'Alphabet Inc.',
+    'amazon': 'Amazon.com Inc.',
+    'tesla': 'Tesla, Inc.',
+    'meta': 'Meta Platforms, Inc.',
+    'nvidia': 'NVIDIA Corporation'
+}
+
 class CogneeService:
     """Service class for Cognee RAG operations"""
     
@@ -107,6 +130,10 @@ class CogneeService:
         self._search_cache = {}
         self._openai_client = None
         self._document_registry = {}  # Track stored documents
+        self._registry_columns = None  # Column-wise view of hot registry fields, built on demand
+        self._registry_version = 0  # Bumped on every registry change, for callers' derived caches
+        self._registry_snapshot = None  # Cached RegistrySnapshot, built on demand
+        self._company_matchers = None  # Compiled company-name regexes, built on demand
         self._registry_file = None
         self._configure_cognee()
         self._configure_openai()
@@ -116,12 +143,23 @@ class CogneeService:
         """Load document registry from persistent storage"""
         try:
             if self._data_root:
-                self._registry_file = os.path.join(self._data_root, 'document_registry.pkl')
+                self._registry_file = os.path.join(self._data_root, 'document_registry.sqlite3')
+                legacy_file = os.path.join(self._data_root, 'document_registry.pkl')
+                import pickle
                 if os.path.exists(self._registry_file):
-                    import pickle
-                    with open(self._registry_file, 'rb') as f:
-                        self._document_registry = pickle.load(f)
+                    conn = self._registry_connection()
+                    try:
+                        rows = conn.execute('SELECT fingerprint, blob FROM registry').fetchall()
+                    finally:
+                        conn.close()
+                    self._document_registry = {fingerprint: pickle.loads(blob) for fingerprint, blob in rows}
                     logger.info(f"Loaded document registry with {len(self._document_registry)} entries")
+                elif os.path.exists(legacy_file):
+                    # Migrate the old single-pickle registry into the SQLite store
+                    with open(legacy_file, 'rb') as f:
+                        self._document_registry = pickle.load(f)
+                    self._save_document_registry()
+                    logger.info(f"Migrated legacy document registry with {len(self._document_registry)} entries")
                 else:
                     self._document_registry = {}
             else:
@@ -130,24 +168,218 @@ class CogneeService:
         except Exception as e:
             logger.error(f"Failed to load document registry: {str(e)}")
             self._document_registry = {}
+        finally:
+            self._invalidate_registry_columns()
+    
+    def _registry_connection(self):
+        """Open the SQLite registry store (one row per fingerprint), creating the table if needed"""
+        import sqlite3
+        conn = sqlite3.connect(self._registry_file)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS registry (fingerprint TEXT PRIMARY KEY, blob BLOB NOT NULL)')
+        return conn
+    
+    def _invalidate_registry_columns(self):
+        """Drop the column-wise registry view, snapshot and company matchers so they are rebuilt on next access"""
+        self._registry_version += 1
+        self._registry_columns = None
+        self._registry_snapshot = None
+        self._company_matchers = None
+    
+    def _get_registry_columns(self) -> Dict[str, Any]:
+        """
+        Parallel arrays over the registry's hot fields (fingerprint, accession number,
+        summary/full-content presence, content length, stored_at), in registry order, plus
+        accession, content-hash, company and filing indexes. Rebuilt lazily after any
+        load/save/clear so scans don't have to walk the nested registry dicts.
+        """
+        if self._registry_columns is None:
+            from array import array
+            fingerprints = []
+            accession_numbers = []
+            has_summary = bytearray()
+            has_full_content = bytearray()
+            content_length = array('q')
+            stored_at = []
+            # First registry entry wins for a repeated accession number / content hash / filing key
+            accession_index = {}
+            content_index = {}
+            # Normalized company name / ticker -> fingerprints, in registry order;
+            # (company, form type, filing date) -> first fingerprint for the similar-document check
+            company_index = {}
+            filing_index = {}
+            # Entries stored before embedding_model was recorded are assumed to use the current model
+            current_model = self._embedding_model_id()
+            # One pass over the registry, with each entry's metadata looked up once
+            for fingerprint, doc_info in self._document_registry.items():
+                metadata = doc_info.get('metadata') or {}
+                accession = metadata.get('accession_number', '')
+                fingerprints.append(fingerprint)
+                accession_numbers.append(accession)
+                has_summary.append(1 if doc_info.get('summary') else 0)
+                has_full_content.append(1 if 'full_content' in doc_info else 0)
+                content_length.append(doc_info.get('content_length', 0) or 0)
+                stored_at.append(doc_info.get('stored_at', ''))
+                
+                if accession:
+                    accession_index.setdefault(accession, fingerprint)
+                content_hash = doc_info.get('content_hash')
+                if content_hash:
+                    content_index.setdefault((doc_info.get('embedding_model', current_model), content_hash), fingerprint)
+                for key in {self.company_key(metadata.get('company_name', '')), self.company_key(metadata.get('ticker', ''))}:
+                    if key:
+                        company_index.setdefault(key, []).append(fingerprint)
+                filing_index.setdefault(self._filing_key(metadata), fingerprint)
+            self._registry_columns = {
+                'fingerprints': fingerprints,
+                'accession_numbers': accession_numbers,
+                'has_summary': has_summary,
+                'has_full_content': has_full_content,
+                'content_length': content_length,
+                'stored_at': stored_at,
+                'accession_index': accession_index,
+                'content_index': content_index,
+                'company_index': company_index,
+                'filing_index': filing_index,
+            }
+        return self._registry_columns
+    
+    def get_registry_entries_by_accession(self, accession_numbers: List[str] = None) -> Dict[str, tuple]:
+        """
+        Look up registry entries by accession number, like QuerySet.in_bulk()
+        
+        Args:
+            accession_numbers: Accession numbers to fetch (all indexed entries when None)
+            
+        Returns:
+            Dict mapping accession_number -> (fingerprint, doc_info) for the entries found
+        """
+        accession_index = self._get_registry_columns()['accession_index']
+        if accession_numbers is None:
+            accession_numbers = accession_index.keys()
+        
+        entries = {}
+        for accession in accession_numbers:
+            fingerprint = accession_index.get(accession)
+            if fingerprint is not None:
+                entries[accession] = (fingerprint, self._document_registry[fingerprint])
+        return entries
+    
+    def find_by_content_hash(self, content_hash: str) -> Optional[tuple]:
+        """
+        Find an entry already indexed from identical content with the current embedding model
+        
+        Args:
+            content_hash: _hash_content() of the document text
+            
+        Returns:
+            (fingerprint, doc_info) for the indexed entry, or None
+        """
+        if not content_hash:
+            return None
+        key = (self._embedding_model_id(), content_hash)
+        fingerprint = self._get_registry_columns()['content_index'].get(key)
+        if fingerprint is None:
+            return None
+        return fingerprint, self._document_registry[fingerprint]
+    
+    @staticmethod
+    def company_key(name: str) -> str:
+        """Normalize a company name or ticker for index lookups ("Tesla, Inc." -> "tesla")"""
+        words = re.sub(r'[^a-z0-9]+', ' ', str(name or '').lower()).split()
+        return " ".join(word for word in words if word not in COMPANY_SUFFIXES)
+    
+    def registry_version(self) -> int:
+        """Counter that changes whenever registry entries are added, replaced, updated or cleared"""
+        return self._registry_version
+    
+    def get_company_index(self) -> Dict[str, List[str]]:
+        """Normalized company name / ticker -> registry fingerprints (see company_key)"""
+        return self._get_registry_columns()['company_index']
+    
+    def iter_accession_numbers(self):
+        """Yield (fingerprint, accession_number) pairs for every registry entry"""
+        columns = self._get_registry_columns()
+        return zip(columns['fingerprints'], columns['accession_numbers'])
+    
+    def has_summary_mask(self) -> bytearray:
+        """Per-entry summary presence (1/0), aligned with iter_accession_numbers()"""
+        return self._get_registry_columns()['has_summary']
+    
+    def has_full_content_mask(self) -> bytearray:
+        """Per-entry full-content presence (1/0), aligned with iter_accession_numbers()"""
+        return self._get_registry_columns()['has_full_content']
+    
+    def content_length_column(self):
+        """Per-entry content length, aligned with iter_accession_numbers()"""
+        return self._get_registry_columns()['content_length']
     
     def _save_document_registry(self):
-        """Save document registry to persistent storage"""
+        """Save the whole document registry to persistent storage"""
+        self._invalidate_registry_columns()
         try:
             if self._registry_file:
                 os.makedirs(os.path.dirname(self._registry_file), exist_ok=True)
                 import pickle
-                with open(self._registry_file, 'wb') as f:
-                    pickle.dump(self._document_registry, f)
+                conn = self._registry_connection()
+                try:
+                    with conn:
+                        conn.execute('DELETE FROM registry')
+                        conn.executemany(
+                            'INSERT INTO registry (fingerprint, blob) VALUES (?, ?)',
+                            ((fingerprint, pickle.dumps(doc_info, pickle.HIGHEST_PROTOCOL))
+                             for fingerprint, doc_info in self._document_registry.items())
+                        )
+                finally:
+                    conn.close()
                 logger.info(f"Saved document registry with {len(self._document_registry)} entries")
         except Exception as e:
             logger.error(f"Failed to save document registry: {str(e)}")
     
-    def _create_document_fingerprint(self, content: str, metadata: Dict[str, Any]) -> str:
+    def _save_registry_entry(self, fingerprint: str):
+        """Write a single registry entry through to persistent storage"""
+        self._save_registry_entries([fingerprint])
+    
+    def _save_registry_entries(self, fingerprints: List[str]):
+        """
+        Write the given registry entries through to persistent storage in one transaction
+        
+        Unlike _save_document_registry, untouched rows are not rewritten, and either
+        every listed entry is stored or (on error) none are.
+        """
+        self._invalidate_registry_columns()
+        if not fingerprints:
+            return
+        try:
+            if self._registry_file:
+                os.makedirs(os.path.dirname(self._registry_file), exist_ok=True)
+                import pickle
+                conn = self._registry_connection()
+                try:
+                    with conn:
+                        conn.executemany(
+                            'INSERT OR REPLACE INTO registry (fingerprint, blob) VALUES (?, ?)',
+                            ((fingerprint, pickle.dumps(self._document_registry[fingerprint], pickle.HIGHEST_PROTOCOL))
+                             for fingerprint in fingerprints)
+                        )
+                finally:
+                    conn.close()
+        except Exception as e:
+            logger.error(f"Failed to save {len(fingerprints)} registry entries: {str(e)}")
+    
+    @staticmethod
+    def _hash_content(content: str, chunk_size: int = 64 * 1024) -> str:
+        """SHA-256 of the UTF-8 content, encoded chunk by chunk to avoid a full-size bytes copy"""
+        hasher = hashlib.sha256()
+        for start in range(0, len(content), chunk_size):
+            hasher.update(content[start:start + chunk_size].encode('utf-8'))
+        return hasher.hexdigest()
+    
+    def _create_document_fingerprint(self, content: str, metadata: Dict[str, Any], content_hash: str = None) -> str:
         """Create a unique fingerprint for a document based on content and metadata"""
         # Create a comprehensive fingerprint
         fingerprint_data = {
-            'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest(),
+            'content_hash': content_hash or self._hash_content(content),
             'company_name': metadata.get('company_name', '').lower(),
             'form_type': metadata.get('form_type', '').lower(),
             'filing_date': metadata.get('filing_date', ''),
@@ -157,85 +389,128 @@ class CogneeService:
         fingerprint_string = json.dumps(fingerprint_data, sort_keys=True)
         return hashlib.sha256(fingerprint_string.encode('utf-8')).hexdigest()
     
+    def snapshot(self) -> RegistrySnapshot:
+        """
+        Registry and processing statistics plus per-document summaries, computed in one
+        pass over the registry. Cached until the registry is next loaded, saved or cleared.
+        
+        get_registry_stats(), get_document_processing_stats() and the document summary
+        accessors all read from this snapshot.
+        
+        Returns:
+            RegistrySnapshot; docs uses the get_document_summaries() entry format, newest first
+        """
+        if self._registry_snapshot is not None:
+            return self._registry_snapshot
+        
+        with_summaries = ai_summaries = basic_summaries = 0
+        total_size = max_size = 0
+        companies = set()
+        form_types = set()
+        filing_dates = []
+        storage_dates = set()
+        docs = []
+        
+        for fingerprint, doc_info in self._document_registry.items():
+            metadata = doc_info['metadata']
+            companies.add(metadata.get('company_name', 'Unknown'))
+            form_types.add(metadata.get('form_type', 'Unknown'))
+            
+            doc_size = doc_info.get('content_length', 0)
+            total_size += doc_size
+            max_size = max(max_size, doc_size)
+            
+            if metadata.get('filing_date'):
+                filing_dates.append(metadata['filing_date'])
+            stored_at = doc_info.get('stored_at')
+            if stored_at:
+                storage_dates.add(stored_at[:10])  # Just the date part
+            
+            if 'summary' in doc_info:
+                with_summaries += 1
+            summary = doc_info.get('summary', {})
+            if summary:
+                # Basic summaries have simple patterns, AI summaries are more detailed
+                if 'standard regulatory disclosures' in summary.get('executive_summary', ''):
+                    basic_summaries += 1
+                else:
+                    ai_summaries += 1
+            
+            docs.append({
+                'fingerprint': fingerprint[:8],
+                'company_name': metadata.get('company_name'),
+                'form_type': metadata.get('form_type'),
+                'filing_date': metadata.get('filing_date'),
+                'ticker': metadata.get('ticker'),
+                'summary': summary,
+                'content_length': doc_size,
+                'stored_at': stored_at
+            })
+        
+        # Sort by filing date (newest first); documents without a date go last
+        docs.sort(key=lambda x: x.get('filing_date') or '', reverse=True)
+        total = len(self._document_registry)
+        
+        self._registry_snapshot = RegistrySnapshot(
+            total=total,
+            with_summaries=with_summaries,
+            ai_summaries=ai_summaries,
+            basic_summaries=basic_summaries,
+            avg_size=int(total_size / total) if total else 0,
+            max_size=max_size,
+            companies=sorted(companies, key=str),
+            form_types=sorted(form_types, key=str),
+            earliest_filing=min(filing_dates, default=None),
+            latest_filing=max(filing_dates, default=None),
+            storage_dates=sorted(storage_dates),
+            docs=docs
+        )
+        return self._registry_snapshot
+    
     def get_registry_stats(self) -> Dict[str, Any]:
         """Get statistics about the document registry"""
         try:
-            stats = {
-                'total_documents': len(self._document_registry),
-                'companies': set(),
-                'form_types': set(),
-                'date_range': {'earliest': None, 'latest': None},
-                'storage_dates': [],
-                'documents_with_summaries': 0
+            snapshot = self.snapshot()
+            return {
+                'total_documents': snapshot.total,
+                'companies': list(snapshot.companies),
+                'form_types': list(snapshot.form_types),
+                'date_range': {'earliest': snapshot.earliest_filing, 'latest': snapshot.latest_filing},
+                'storage_dates': list(snapshot.storage_dates),
+                'documents_with_summaries': snapshot.with_summaries
             }
             
-            for doc_info in self._document_registry.values():
-                metadata = doc_info['metadata']
-                stats['companies'].add(metadata.get('company_name', 'Unknown'))
-                stats['form_types'].add(metadata.get('form_type', 'Unknown'))
-                
-                # Count documents with summaries
-                if 'summary' in doc_info:
-                    stats['documents_with_summaries'] += 1
-                
-                filing_date = metadata.get('filing_date')
-                if filing_date:
-                    if not stats['date_range']['earliest'] or filing_date < stats['date_range']['earliest']:
-                        stats['date_range']['earliest'] = filing_date
-                    if not stats['date_range']['latest'] or filing_date > stats['date_range']['latest']:
-                        stats['date_range']['latest'] = filing_date
-                
-                stored_at = doc_info.get('stored_at')
-                if stored_at:
-                    stats['storage_dates'].append(stored_at[:10])  # Just the date part
-            
-            # Convert sets to lists for JSON serialization
-            stats['companies'] = list(stats['companies'])
-            stats['form_types'] = list(stats['form_types'])
-            stats['storage_dates'] = list(set(stats['storage_dates']))  # Unique dates
-            
-            return stats
-            
         except Exception as e:
             return {'error': str(e), 'total_documents': 0}
     
-    def get_document_summaries(self, company_name: str = None, form_type: str = None) -> List[Dict[str, Any]]:
-        """Get document summaries for agent query planning"""
-        try:
-            summaries = []
-            
-            for fingerprint, doc_info in self._document_registry.items():
-                metadata = doc_info['metadata']
-                
-                # Filter by company if specified (allow partial matches)
-                if company_name:
-                    stored_company = metadata.get('company_name', '').lower()
-                    filter_company = company_name.lower()
-                    # Allow partial matches - filter passes if either name contains the other
-                    if not (filter_company in stored_company or stored_company in filter_company):
-                        continue
-                    
-                # Filter by form type if specified  
-                if form_type and metadata.get('form_type', '').lower() != form_type.lower():
+    def count_document_summaries(self) -> int:
+        """Number of documents with registry entries (unfiltered), without building summaries"""
+        return len(self._document_registry)
+    
+    def iter_document_summaries(self, company_name: str = None, form_type: str = None):
+        """Lazily yield document summaries (newest first), applying the same filters as get_document_summaries()"""
+        filter_company = company_name.lower() if company_name else None
+        filter_form = form_type.lower() if form_type else None
+        
+        for doc in self.snapshot().docs:
+            # Filter by company if specified (allow partial matches)
+            if filter_company:
+                stored_company = (doc['company_name'] or '').lower()
+                # Allow partial matches - filter passes if either name contains the other
+                if not (filter_company in stored_company or stored_company in filter_company):
                     continue
                 
-                summary_info = {
-                    'fingerprint': fingerprint[:8],  # Short ID for reference
-                    'company_name': metadata.get('company_name'),
-                    'form_type': metadata.get('form_type'),
-                    'filing_date': metadata.get('filing_date'),
-                    'ticker': metadata.get('ticker'),
-                    'summary': doc_info.get('summary', {}),
-                    'content_length': doc_info.get('content_length', 0),
-                    'stored_at': doc_info.get('stored_at')
-                }
-                
-                summaries.append(summary_info)
-            
-            # Sort by filing date (newest first)
-            summaries.sort(key=lambda x: x.get('filing_date', ''), reverse=True)
+            # Filter by form type if specified  
+            if filter_form and (doc['form_type'] or '').lower() != filter_form:
+                continue
             
-            return summaries
+            # Copy so callers can't alter the cached snapshot
+            yield dict(doc)
+    
+    def get_document_summaries(self, company_name: str = None, form_type: str = None) -> List[Dict[str, Any]]:
+        """Get document summaries for agent query planning, newest first"""
+        try:
+            return list(self.iter_document_summaries(company_name, form_type))
             
         except Exception as e:
             logger.error(f"Error getting document summaries: {str(e)}")
@@ -663,6 +938,21 @@ Format as valid JSON with these keys. Keep each section concise but informative
             'risk_factors': f"Document mentions: {', '.join(found_risks[:4]) if found_risks else 'standard business risks'}"
         }
     
+    @staticmethod
+    def _build_rag_document_text(content: str, metadata: Dict[str, Any]) -> str:
+        """Raw document text with a basic metadata header, as stored in Cognee RAG"""
+        return f"""
+            Document Metadata:
+            - Company: {metadata.get('company_name', 'Unknown')}
+            - Form Type: {metadata.get('form_type', 'Unknown')}
+            - Filing Date: {metadata.get('filing_date', 'Unknown')}
+            - Ticker: {metadata.get('ticker', 'Unknown')}
+            - Accession Number: {metadata.get('accession_number', 'Unknown')}
+            
+            Document Content:
+            {content}
+            """
+    
     async def _add_document_async(self, content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Add document to Cognee RAG (async version) - parallel summary generation and RAG storage"""
         try:
@@ -678,17 +968,7 @@ Format as valid JSON with these keys. Keep each section concise but informative
             )
             
             # Task 2: Prepare and store document in RAG (without summary)
-            document_text = f"""
-            Document Metadata:
-            - Company: {metadata.get('company_name', 'Unknown')}
-            - Form Type: {metadata.get('form_type', 'Unknown')}
-            - Filing Date: {metadata.get('filing_date', 'Unknown')}
-            - Ticker: {metadata.get('ticker', 'Unknown')}
-            - Accession Number: {metadata.get('accession_number', 'Unknown')}
-            
-            Document Content:
-            {content}
-            """
+            document_text = self._build_rag_document_text(content, metadata)
             
             # Store document in Cognee RAG (parallel with summary generation)
             rag_storage_task = asyncio.create_task(
@@ -736,8 +1016,106 @@ Format as valid JSON with these keys. Keep each section concise but informative
             logger.error(f"Failed to store document in RAG: {str(e)}")
             return False
     
-    def add_document(self, content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Add document to Cognee RAG with registry tracking and duplicate detection"""
+    async def _add_documents_bulk_async(self, items: List[tuple]) -> Dict[str, Any]:
+        """Add several documents to Cognee RAG and build the knowledge graph in a single cognify pass"""
+        try:
+            summaries_task = asyncio.gather(*(
+                self._generate_document_summary(content, metadata) for content, metadata in items
+            ))
+            rag_storage_task = asyncio.gather(*(
+                self._store_document_in_rag(self._build_rag_document_text(content, metadata))
+                for content, metadata in items
+            ))
+            
+            summaries, rag_successes = await asyncio.gather(summaries_task, rag_storage_task)
+            
+            if any(rag_successes):
+                # One cognify pass chunks and embeds every newly added document together
+                await cognee.cognify()
+            
+            logger.info(f"Bulk processed {sum(rag_successes)}/{len(items)} documents with a single cognify pass")
+            return {
+                'success': True,
+                'summaries': summaries,
+                'rag_stored': rag_successes
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk process documents: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    @staticmethod
+    def _filing_key(metadata: Dict[str, Any]) -> tuple:
+        """(company, form type, filing date) key under which two filings count as the same document"""
+        return ((metadata.get('company_name') or '').lower(),
+                (metadata.get('form_type') or '').lower(),
+                metadata.get('filing_date'))
+    
+    def _find_duplicate(self, fingerprint: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the duplicate-document result for add_document, or None if the document is new"""
+        if fingerprint in self._document_registry:
+            existing_doc = self._document_registry[fingerprint]
+            return {
+                'success': False,
+                'duplicate': True,
+                'reason': 'Document already exists in registry',
+                'existing_document': {
+                    'company': existing_doc['metadata'].get('company_name'),
+                    'form_type': existing_doc['metadata'].get('form_type'),
+                    'stored_at': existing_doc.get('stored_at'),
+                    'fingerprint': fingerprint
+                }
+            }
+        
+        # Check for similar documents (same company, form type and filing date)
+        existing_fingerprint = self._get_registry_columns()['filing_index'].get(self._filing_key(metadata))
+        if existing_fingerprint is not None:
+            doc_info = self._document_registry[existing_fingerprint]
+            existing_meta = doc_info['metadata']
+            return {
+                'success': False,
+                'duplicate': True,
+                'reason': f'Similar document exists: {existing_meta.get("company_name")} {existing_meta.get("form_type")} from {existing_meta.get("filing_date")}',
+                'existing_document': {
+                    'company': existing_meta.get('company_name'),
+                    'form_type': existing_meta.get('form_type'),
+                    'stored_at': doc_info.get('stored_at'),
+                    'fingerprint': existing_fingerprint
+                }
+            }
+        
+        return None
+    
+    def _register_document(self, fingerprint: str, content: str, metadata: Dict[str, Any],
+                           summary: Optional[Dict[str, str]], content_hash: str):
+        """Register a stored document in our registry with FULL content and summary"""
+        doc_info = {
+            'fingerprint': fingerprint,
+            'metadata': metadata,
+            'summary': summary,  # Store structured summary
+            'content_length': len(content),
+            'content_preview': content[:2000],  # Store preview for similarity checks
+            'full_content': content,  # Store COMPLETE content for validation
+            'stored_at': datetime.now().isoformat(),
+            'content_hash': content_hash,
+            'embedding_model': self._embedding_model_id()
+        }
+        
+        self._document_registry[fingerprint] = doc_info
+        self._save_registry_entry(fingerprint)
+    
+    def add_document(self, content: str, metadata: Dict[str, Any], content_hash: str = None) -> Dict[str, Any]:
+        """
+        Add document to Cognee RAG with registry tracking and duplicate detection
+        
+        Args:
+            content: Full document text
+            metadata: Document metadata (company_name, form_type, filing_date, accession_number, ...)
+            content_hash: Precomputed _hash_content(content), to skip hashing here
+        """
         if not self.is_configured:
             logger.error("Cognee service not configured properly")
             return {
@@ -746,41 +1124,13 @@ Format as valid JSON with these keys. Keep each section concise but informative
             }
         
         try:
-            # Check for duplicates first
-            fingerprint = self._create_document_fingerprint(content, metadata)
+            # Check for duplicates first (content is hashed once and reused for the registry entry)
+            content_hash = content_hash or self._hash_content(content)
+            fingerprint = self._create_document_fingerprint(content, metadata, content_hash)
             
-            if fingerprint in self._document_registry:
-                existing_doc = self._document_registry[fingerprint]
-                return {
-                    'success': False,
-                    'duplicate': True,
-                    'reason': 'Document already exists in registry',
-                    'existing_document': {
-                        'company': existing_doc['metadata'].get('company_name'),
-                        'form_type': existing_doc['metadata'].get('form_type'),
-                        'stored_at': existing_doc.get('stored_at'),
-                        'fingerprint': fingerprint
-                    }
-                }
-            
-            # Check for similar documents (same company and form type)
-            for existing_fingerprint, doc_info in self._document_registry.items():
-                existing_meta = doc_info['metadata']
-                if (existing_meta.get('company_name', '').lower() == metadata.get('company_name', '').lower() and
-                    existing_meta.get('form_type', '').lower() == metadata.get('form_type', '').lower() and
-                    existing_meta.get('filing_date') == metadata.get('filing_date')):
-                    
-                    return {
-                        'success': False,
-                        'duplicate': True,
-                        'reason': f'Similar document exists: {existing_meta.get("company_name")} {existing_meta.get("form_type")} from {existing_meta.get("filing_date")}',
-                        'existing_document': {
-                            'company': existing_meta.get('company_name'),
-                            'form_type': existing_meta.get('form_type'),
-                            'stored_at': doc_info.get('stored_at'),
-                            'fingerprint': existing_fingerprint
-                        }
-                    }
+            duplicate = self._find_duplicate(fingerprint, metadata)
+            if duplicate:
+                return duplicate
             
             # Add document to Cognee (returns both success status and generated summary)
             cognee_result = self._run_async(self._add_document_async(content, metadata))
@@ -789,20 +1139,7 @@ Format as valid JSON with these keys. Keep each section concise but informative
                 # Use the summary generated during document processing (no double generation)
                 summary = cognee_result.get('summary')
                 
-                # Register document in our registry with FULL content and summary
-                doc_info = {
-                    'fingerprint': fingerprint,
-                    'metadata': metadata,
-                    'summary': summary,  # Store structured summary
-                    'content_length': len(content),
-                    'content_preview': content[:2000],  # Store preview for similarity checks
-                    'full_content': content,  # Store COMPLETE content for validation
-                    'stored_at': datetime.now().isoformat(),
-                    'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest()
-                }
-                
-                self._document_registry[fingerprint] = doc_info
-                self._save_document_registry()
+                self._register_document(fingerprint, content, metadata, summary, content_hash)
                 
                 logger.info(f"Successfully registered document: {metadata.get('company_name')} {metadata.get('form_type')} ({fingerprint[:8]})")
                 
@@ -825,6 +1162,93 @@ Format as valid JSON with these keys. Keep each section concise but informative
                 'error': str(e)
             }
     
+    def add_documents_bulk(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Add several documents to Cognee RAG with one knowledge-graph build for the whole batch
+        
+        Each document gets the same duplicate detection and registry tracking as add_document,
+        but Cognee chunks and embeds all new documents in a single cognify pass instead of one
+        pass per document.
+        
+        Args:
+            items: (content, metadata, content_hash) tuples; content_hash may be None
+            
+        Returns:
+            List of add_document-style result dicts, aligned with items
+        """
+        if not self.is_configured:
+            logger.error("Cognee service not configured properly")
+            return [{
+                'success': False,
+                'error': 'Cognee service not configured properly'
+            } for _ in items]
+        
+        results = [None] * len(items)
+        pending = []  # (index, fingerprint, content, metadata, content_hash)
+        pending_keys = set()  # fingerprints and (company, form, filing date) already in this batch
+        
+        try:
+            for index, (content, metadata, content_hash) in enumerate(items):
+                content_hash = content_hash or self._hash_content(content)
+                fingerprint = self._create_document_fingerprint(content, metadata, content_hash)
+                
+                similar_key = self._filing_key(metadata)
+                
+                duplicate = self._find_duplicate(fingerprint, metadata)
+                if not duplicate and (fingerprint in pending_keys or similar_key in pending_keys):
+                    duplicate = {
+                        'success': False,
+                        'duplicate': True,
+                        'reason': 'Document appears twice in this batch',
+                        'existing_document': {
+                            'company': metadata.get('company_name'),
+                            'form_type': metadata.get('form_type'),
+                            'stored_at': None,
+                            'fingerprint': fingerprint
+                        }
+                    }
+                if duplicate:
+                    results[index] = duplicate
+                    continue
+                
+                pending_keys.update((fingerprint, similar_key))
+                pending.append((index, fingerprint, content, metadata, content_hash))
+            
+            if pending:
+                cognee_result = self._run_async(self._add_documents_bulk_async(
+                    [(content, metadata) for _, _, content, metadata, _ in pending]
+                ))
+                
+                if not cognee_result.get('success'):
+                    error = f"Failed to add documents to Cognee RAG: {cognee_result.get('error', 'Unknown error')}"
+                    for index, *_ in pending:
+                        results[index] = {'success': False, 'error': error}
+                    return results
+                
+                for (index, fingerprint, content, metadata, content_hash), summary, rag_stored in zip(
+                        pending, cognee_result['summaries'], cognee_result['rag_stored']):
+                    if not rag_stored:
+                        results[index] = {
+                            'success': False,
+                            'error': 'Failed to add document to Cognee RAG: RAG storage failed'
+                        }
+                        continue
+                    
+                    self._register_document(fingerprint, content, metadata, summary, content_hash)
+                    logger.info(f"Successfully registered document: {metadata.get('company_name')} {metadata.get('form_type')} ({fingerprint[:8]})")
+                    results[index] = {
+                        'success': True,
+                        'fingerprint': fingerprint,
+                        'registered': True,
+                        'content_length': len(content)
+                    }
+            
+            return results
+                
+        except Exception as e:
+            logger.error(f"Error adding documents in bulk: {str(e)}")
+            return [result or {'success': False, 'error': str(e)} for result in results]
+    
     async def _search_context_async(self, query: str, search_type: SearchType = SearchType.GRAPH_COMPLETION) -> List[str]:
         """Search for relevant context from Cognee (async version)"""
         try:
@@ -899,30 +1323,71 @@ Format as valid JSON with these keys. Keep each section concise but informative
         
         return results
     
+    @staticmethod
+    def _embedding_model_id() -> str:
+        """Embedding model used for RAG storage and query embeddings"""
+        # Cognee names models as "<provider>/<model>"; the OpenAI client wants the bare model
+        return os.getenv('EMBEDDING_MODEL', 'text-embedding-3-large').split('/')[-1]
+    
+    def warm_embeddings(self, texts: List[str], batch_size: int = 2048) -> List[List[float]]:
+        """
+        Embed texts with as few provider calls as possible, for pre-populating query caches
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Inputs per embeddings request (OpenAI accepts up to 2048)
+            
+        Returns:
+            List of embedding vectors aligned with texts, or an empty list if unavailable
+        """
+        if not self._openai_client or not texts:
+            return []
+        
+        model = self._embedding_model_id()
+        try:
+            vectors = []
+            for start in range(0, len(texts), batch_size):
+                response = self._openai_client.embeddings.create(
+                    model=model,
+                    input=texts[start:start + batch_size]
+                )
+                vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+            return vectors
+        except Exception as e:
+            logger.error(f"Failed to embed {len(texts)} texts: {str(e)}")
+            return []
+    
+    def _get_company_matchers(self) -> List[tuple]:
+        """
+        Compiled (pattern, lowercase name -> company) matchers for detect_company_from_query:
+        registry company names first, then the common company patterns. Rebuilt with the
+        registry columns.
+        """
+        if self._company_matchers is None:
+            registry_names = {}
+            for doc_info in self._document_registry.values():
+                company_name = doc_info['metadata'].get('company_name', '')
+                if company_name:
+                    registry_names.setdefault(company_name.lower(), company_name)
+            
+            matchers = []
+            for names in (registry_names, COMPANY_PATTERNS):
+                if names:
+                    # Longest alternatives first so "apple inc." wins over a shorter overlapping name
+                    alternation = "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+                    matchers.append((re.compile(alternation), names))
+            self._company_matchers = matchers
+        return self._company_matchers
+    
     def detect_company_from_query(self, query: str) -> Optional[str]:
         """Detect company name from query text"""
         query_lower = query.lower()
         
-        # Check against companies in our registry first
-        for doc_info in self._document_registry.values():
-            company_name = doc_info['metadata'].get('company_name', '')
-            if company_name and company_name.lower() in query_lower:
-                return company_name
-        
-        # Common company name patterns
-        company_patterns = {
-            'apple': 'Apple Inc.',
-            'microsoft': 'Microsoft Corporation',
-            'google': 'Alphabet Inc.',
-            'amazon': 'Amazon.com Inc.',
-            'tesla': 'Tesla, Inc.',
-            'meta': 'Meta Platforms, Inc.',
-            'nvidia': 'NVIDIA Corporation'
-        }
-        
-        for pattern, company_name in company_patterns.items():
-            if pattern in query_lower:
-                return company_name
+        # Check against companies in our registry first, then common company name patterns
+        for pattern, names in self._get_company_matchers():
+            match = pattern.search(query_lower)
+            if match:
+                return names[match.group(0)]
         
         return None
     
@@ -1074,6 +1539,7 @@ Format as valid JSON with these keys. Keep each section concise but informative
             
             # Clear registry
             self._document_registry.clear()
+            self._invalidate_registry_columns()
             
             logger.info("Successfully pruned Cognee data, cleared project directories and registry")
             return True
@@ -1118,6 +1584,7 @@ Format as valid JSON with these keys. Keep each section concise but informative
             # Clear cache and registry
             self._search_cache.clear()
             self._document_registry.clear()
+            self._invalidate_registry_columns()
             print("✅ Cleared search cache and document registry")
             
             print("🎉 Complete reset successful!")
@@ -1199,40 +1666,18 @@ Format as valid JSON with these keys. Keep each section concise but informative
     def get_document_processing_stats(self) -> Dict[str, Any]:
         """Get statistics about document processing and summarization"""
         try:
-            stats = {
-                'total_documents_processed': len(self._document_registry),
-                'documents_with_ai_summaries': 0,
-                'documents_with_basic_summaries': 0,
-                'average_document_size': 0,
-                'largest_document_processed': 0,
+            snapshot = self.snapshot()
+            return {
+                'total_documents_processed': snapshot.total,
+                'documents_with_ai_summaries': snapshot.ai_summaries,
+                'documents_with_basic_summaries': snapshot.basic_summaries,
+                'average_document_size': snapshot.avg_size,
+                'largest_document_processed': snapshot.max_size,
                 'processing_method': 'Parallel: Summary generation + RAG storage',
                 'summary_storage': 'Agent metadata only (not in RAG)',
                 'rag_content': 'Raw documents only'
             }
             
-            total_size = 0
-            for doc_info in self._document_registry.values():
-                doc_size = doc_info.get('content_length', 0)
-                total_size += doc_size
-                
-                if doc_size > stats['largest_document_processed']:
-                    stats['largest_document_processed'] = doc_size
-                
-                # Check if summary exists and determine type
-                summary = doc_info.get('summary', {})
-                if summary:
-                    # Basic summaries have simple patterns, AI summaries are more detailed
-                    exec_summary = summary.get('executive_summary', '')
-                    if 'standard regulatory disclosures' in exec_summary:
-                        stats['documents_with_basic_summaries'] += 1
-                    else:
-                        stats['documents_with_ai_summaries'] += 1
-            
-            if stats['total_documents_processed'] > 0:
-                stats['average_document_size'] = int(total_size / stats['total_documents_processed'])
-            
-            return stats
-            
         except Exception as e:
             return {
                 'error': str(e),
@@ -1267,18 +1712,11 @@ Format as valid JSON with these keys. Keep each section concise but informative
             else:
                 truncated_content = raw_document_content
             
-            # Create validation prompt
+            # Create validation prompt - instructions and document content come first so the
+            # provider can serve this stable prefix from its prompt cache; insight/query go last
             validation_prompt = f"""You are an expert financial analyst tasked with validating AI-generated insights against source documents.
 
-USER QUERY: "{query}"
-
-RAG-GENERATED INSIGHT:
-{insight}
-
-ORIGINAL DOCUMENT CONTENT:
-{truncated_content}
-
-Please evaluate the RAG-generated insight and provide:
+For the RAG-generated insight given after the document, please provide:
 
 1. ACCURACY SCORE (0-10): How accurate is the insight based on the document?
 2. CORRECTNESS: Is the insight factually correct? (Yes/No/Partially)
@@ -1295,6 +1733,15 @@ Format your response as JSON with these exact keys:
 - supporting_evidence (array of strings)
 - improved_insight (string, only if corrections needed)
 - explanation (string: brief summary of your evaluation)
+
+<DOC_CORPUS>
+{truncated_content}
+</DOC_CORPUS>
+
+USER QUERY: "{query}"
+
+RAG-GENERATED INSIGHT:
+{insight}
 """
 
             # Call OpenAI API
@@ -1308,6 +1755,14 @@ Format your response as JSON with these exact keys:
                 # max_tokens=1500
             )
             
+            # Prompt-cache usage (reported by providers that support prefix caching)
+            usage = getattr(response, 'usage', None)
+            prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+            prompt_details = getattr(usage, 'prompt_tokens_details', None)
+            cached_tokens = (getattr(prompt_details, 'cached_tokens', 0) or 0) if prompt_details else 0
+            if prompt_tokens:
+                logger.info(f"Validation prompt tokens: {prompt_tokens} ({cached_tokens} served from prompt cache)")
+            
             # Parse the response
             validation_text = response.choices[0].message.content.strip()
             
@@ -1328,6 +1783,8 @@ Format your response as JSON with these exact keys:
                     'original_insight': insight,
                     'document_truncated': len(raw_document_content) > max_doc_length,
                     'document_length': len(raw_document_content),
+                    'prompt_tokens': prompt_tokens,
+                    'cached_prompt_tokens': cached_tokens,
                     'validation_timestamp': datetime.now().isoformat()
                 })
                 
@@ -3,6 +3,7 @@ EdgarTools service for fetching SEC filings and company data
 """
 import os
 import logging
+import threading
 from typing import List, Dict, Any, Optional
 from edgar import Company, get_filings, find
 from datetime import datetime
@@ -18,7 +19,22 @@ class EdgarService:
         import edgar
         if hasattr(edgar, 'set_identity'):
             edgar.set_identity(self.user_agent)
-        
+        # Per-CIK accession -> filing index, so fetching several filings of one company
+        # reuses a single submissions request instead of re-listing filings each time
+        self._filings_by_cik = {}
+        self._cik_locks = {}
+        self._cik_locks_guard = threading.Lock()
+    
+    def _get_filings_index(self, cik: str, refresh: bool = False) -> Dict[str, Any]:
+        """Accession number -> filing for a company, fetched once per CIK (thread-safe)"""
+        with self._cik_locks_guard:
+            lock = self._cik_locks.setdefault(cik, threading.Lock())
+        with lock:
+            if refresh or cik not in self._filings_by_cik:
+                company = Company(cik)
+                self._filings_by_cik[cik] = {filing.accession_no: filing for filing in company.get_filings()}
+            return self._filings_by_cik[cik]
+    
     def search_company(self, query: str) -> List[Dict[str, Any]]:
         """Search for companies by name or ticker symbol"""
         try:
@@ -87,17 +103,11 @@ class EdgarService:
     def get_filing_content(self, accession_number: str, cik: str) -> Optional[Dict[str, Any]]:
         """Get the content of a specific filing"""
         try:
-            # For EdgarTools, we need to find the filing first
-            # This is a simplified approach - in production you might cache filings
-            company = Company(cik)
-            company_filings = company.get_filings()
-            
-            # Find the specific filing by accession number
-            target_filing = None
-            for filing in company_filings:
-                if filing.accession_no == accession_number:
-                    target_filing = filing
-                    break
+            # For EdgarTools, we need to find the filing first (company listings are cached per CIK)
+            target_filing = self._get_filings_index(cik).get(accession_number)
+            if not target_filing:
+                # The cached listing may predate this filing
+                target_filing = self._get_filings_index(cik, refresh=True).get(accession_number)
             
             if not target_filing:
                 logger.error(f"Filing {accession_number} not found for CIK {cik}")
@@ -2,14 +2,27 @@ import logging
 import json
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from functools import cached_property, lru_cache
 from openai import OpenAI
 import os
 
-from .cognee_service import CogneeService
-from .gemini_validation_service import GeminiValidationService
-
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
+def _get_cognee_service():
+    """Build the shared CogneeService on first use (imports cognee lazily)"""
+    from .cognee_service import CogneeService
+    return CogneeService()
+
+
+@lru_cache(maxsize=None)
+def _get_gemini_validation_service():
+    """Build the shared GeminiValidationService on first use (imports the Gemini SDK lazily)"""
+    from .gemini_validation_service import GeminiValidationService
+    return GeminiValidationService()
+
+
 class IterativeAnalysisService:
     """
     Iterative Financial Analysis Service
@@ -24,10 +37,20 @@ class IterativeAnalysisService:
     """
     
     def __init__(self):
-        self.cognee_service = CogneeService()
-        self.gemini_validation_service = GeminiValidationService()
         self._configure_openai()
         self.max_iterations = 10  # Prevent infinite loops
+        # Optional ApproximateQueryCache for the RAG tool's Cognee searches
+        self.query_cache = None
+    
+    @cached_property
+    def cognee_service(self):
+        """RAG service, constructed on first access"""
+        return _get_cognee_service()
+    
+    @cached_property
+    def gemini_validation_service(self):
+        """Gemini validation service, constructed on first access"""
+        return _get_gemini_validation_service()
         
     def _configure_openai(self):
         """Configure OpenAI client for analysis"""
@@ -48,6 +71,9 @@ class IterativeAnalysisService:
         """
         Create a RAG query tool that can be called by LLMs
         
+        The tool does not depend on its arguments, so it is built once per
+        service instance and reused.
+        
         Args:
             query: The specific question to query the RAG database
             context: Additional context to help focus the search
@@ -55,11 +81,27 @@ class IterativeAnalysisService:
         Returns:
             Dict containing the tool definition and execution function
         """
+        return self._rag_query_tool
+    
+    def _search_context(self, question: str, search_type: str) -> List[Any]:
+        """Cognee search for the RAG tool, through query_cache when one is set"""
+        if self.query_cache is None:
+            return self.cognee_service.search_context(question, search_type)
+        query_vector = self.query_cache.vectorize(question)
+        hit, results = self.query_cache.lookup(question, (search_type,), query_vector)
+        if not hit:
+            results = self.cognee_service.search_context(question, search_type)
+            self.query_cache.store(question, results, (search_type,), query_vector)
+        return results
+    
+    @cached_property
+    def _rag_query_tool(self) -> Dict[str, Any]:
+        """Tool definition and execution function for the RAG query tool"""
         def execute_rag_query(question: str, search_type: str = "graph") -> Dict[str, Any]:
             """Execute a RAG query and return structured results with Gemini validation"""
             try:
                 # Get context from RAG
-                results = self.cognee_service.search_context(question, search_type)
+                results = self._search_context(question, search_type)
 
                 # Get document summaries for context
                 summaries = self.cognee_service.get_document_summaries()
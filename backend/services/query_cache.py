@@ -0,0 +1,132 @@
+"""
+Approximate query cache that reuses results for near-duplicate queries
+"""
+import math
+import re
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from functools import wraps
+from operator import mul
+
+# Tokens that change a query's answer however similar the rest is: numbers,
+# years, quarters (Q3, 3Q) and amounts with digits, plus all-caps tickers
+KEY_TOKEN_PATTERN = re.compile(r"\b(?:\w*\d[\w.,%$]*|[A-Z]{2,5})\b")
+
+
+class ApproximateQueryCache:
+    """
+    Approximate key-value cache for near-duplicate queries.
+
+    Queries are compared by cosine distance between their embeddings (when an
+    ``embed`` function is given; stored unit-normalized as int8 with a scale,
+    a quarter of the float32 footprint) or their term-frequency vectors; a lookup hits
+    when the closest cached query is within ``threshold``. Entries are evicted
+    least-recently-used once ``capacity`` is reached. Queries only match when
+    their numeric and ticker tokens are equal, so "revenue 2022" never reuses
+    the result for "revenue 2023".
+    """
+
+    def __init__(self, threshold: float = 0.05, capacity: int = 256, embed=None):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.embed = embed  # texts -> list of embedding vectors
+        self._entries = OrderedDict()  # (query, (extra args, key tokens)) -> (vector, norm, value)
+        self._warm_vectors = {}  # query -> pre-computed embedding
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _with_norm(vector):
+        return vector, math.sqrt(sum(v * v for v in vector.values()))
+
+    @staticmethod
+    def _dense(embedding):
+        """
+        Unit-normalized embedding quantized to int8 with a per-vector scale.
+
+        Returned as (int8 array, 1 / scale) so the usual dot / (norm * norm)
+        in lookup yields the cosine of the dequantized vectors.
+        """
+        norm = math.sqrt(sum(v * v for v in embedding))
+        peak = max(map(abs, embedding), default=0.0) / norm if norm else 0.0
+        if not peak:
+            return array('b', bytes(len(embedding))), 0.0
+        scale = peak / 127
+        return array('b', [round(v / norm / scale) for v in embedding]), 1 / scale
+
+    @staticmethod
+    def _dot(vector, cached_vector):
+        if isinstance(vector, array) and isinstance(cached_vector, array):
+            return sum(map(mul, vector, cached_vector))
+        if isinstance(vector, dict) and isinstance(cached_vector, dict):
+            return sum(count * cached_vector.get(term, 0) for term, count in vector.items())
+        return 0.0  # embedding vs term-frequency vector: not comparable
+
+    def warm(self, queries, vectors):
+        """Seed pre-computed embeddings for known queries"""
+        for query, vector in zip(queries, vectors):
+            self._warm_vectors[query] = self._dense(vector)
+
+    @staticmethod
+    def key_tokens(query: str) -> tuple:
+        """Numeric and ticker tokens that must be equal for two queries to match"""
+        return tuple(sorted({token.lower() for token in KEY_TOKEN_PATTERN.findall(query)}))
+
+    def vectorize(self, query: str):
+        """Vector and norm used to compare query against cached queries"""
+        if query in self._warm_vectors:
+            return self._warm_vectors[query]
+        if self.embed:
+            vectors = self.embed([query])
+            if vectors:
+                return self._dense(vectors[0])
+        return self._with_norm(Counter(re.findall(r"[a-z0-9']+", query.lower())))
+
+    def lookup(self, query: str, extra=(), query_vector=None):
+        vector, norm = query_vector or self.vectorize(query)
+        extra = (extra, self.key_tokens(query))
+        with self._lock:
+            best_key, best_distance = None, None
+            for key, (cached_vector, cached_norm, _) in self._entries.items():
+                if key[1] != extra or not norm or not cached_norm:
+                    continue
+                distance = 1 - self._dot(vector, cached_vector) / (norm * cached_norm)
+                if best_distance is None or distance < best_distance:
+                    best_key, best_distance = key, distance
+            if best_key is not None and best_distance <= self.threshold:
+                self._entries.move_to_end(best_key)
+                self.hits += 1
+                return True, self._entries[best_key][2]
+            self.misses += 1
+            return False, None
+
+    def store(self, query: str, value, extra=(), query_vector=None):
+        vector, norm = query_vector or self.vectorize(query)
+        key = (query, (extra, self.key_tokens(query)))
+        with self._lock:
+            if key in self._entries:
+                # Overwrite in place (e.g. two threads missed on the same query)
+                self._entries.move_to_end(key)
+            elif len(self._entries) >= self.capacity:
+                self._entries.popitem(last=False)
+            self._entries[key] = (vector, norm, value)
+
+    def clear(self):
+        """Drop all cached results (pre-computed query embeddings are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def wrap(self, func):
+        """Decorate ``func(query, *args)`` so near-duplicate queries reuse results"""
+        @wraps(func)
+        def cached(query, *args):
+            query_vector = self.vectorize(query)
+            hit, value = self.lookup(query, args, query_vector)
+            if hit:
+                return value
+            value = func(query, *args)
+            self.store(query, value, args, query_vector)
+            return value
+        return cached
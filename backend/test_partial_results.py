@@ -24,7 +24,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finDocGPT.settings')
 django.setup()
 
 from analysis.models import IterativeAnalysis
+from django.db import connection, transaction
 from django.utils import timezone
+from datetime import timedelta
 
 def test_partial_results_functionality():
     """Test the partial results functionality"""
@@ -32,145 +34,152 @@ def test_partial_results_functionality():
     print("🧪 Testing Partial Results for Terminated Analyses")
     print("=" * 60)
     
-    # Test 1: Create analysis with partial results and mark as cancelled
-    print("📋 Test 1: Cancelled Analysis with Partial Results")
-    print("-" * 50)
-    
-    # Create test analysis
-    analysis1 = IterativeAnalysis.objects.create(
-        query="Test cancelled analysis with partial results",
-        status='IN_PROGRESS',
-        total_iterations=0,
-        documents_analyzed=5,
-        final_completeness_score=0.0
-    )
-    
-    # Simulate partial results from cancelled analysis
-    partial_results = {
-        'final_analysis': {
-            'executive_summary': 'Partial analysis completed before cancellation.',
-            'financial_analysis': 'Limited financial data was analyzed.',
-            'investment_opportunities': 'Some opportunities identified.',
-            'risk_assessment': 'Initial risk factors noted.'
-        },
-        'iteration_history': [
-            {
-                'type': 'initial_analysis',
-                'timestamp': timezone.now().isoformat(),
-                'analysis': 'This is the initial analysis that was completed before cancellation.',
-                'completeness_score': 6.5
+    # One timestamp for all fixture history entries; refinements must sort after
+    # the initial analysis for get_latest_iteration_analysis()
+    now = timezone.now()
+    now_iso = now.isoformat()
+    later_iso = (now + timedelta(seconds=1)).isoformat()
+    
+    # Fixture writes share one transaction so they are flushed with a single commit
+    with transaction.atomic():
+        # Create all test analyses still running in a single INSERT; each one is
+        # then terminated (and saved) through mark_cancelled()/mark_failed()
+        analysis1, analysis2, analysis3 = IterativeAnalysis.objects.bulk_create([
+            IterativeAnalysis(
+                query="Test cancelled analysis with partial results",
+                status='IN_PROGRESS',
+                total_iterations=0,
+                documents_analyzed=5,
+                final_completeness_score=0.0
+            ),
+            IterativeAnalysis(
+                query="Test failed analysis with partial results",
+                status='IN_PROGRESS',
+                total_iterations=0,
+                documents_analyzed=3,
+                final_completeness_score=0.0
+            ),
+            IterativeAnalysis(
+                query="Test failed analysis without partial results",
+                status='IN_PROGRESS',
+                total_iterations=0,
+                documents_analyzed=0,
+                final_completeness_score=0.0
+            ),
+        ], batch_size=100)
+    
+        # Test 1: Create analysis with partial results and mark as cancelled
+        print("📋 Test 1: Cancelled Analysis with Partial Results")
+        print("-" * 50)
+    
+        # Simulate partial results from cancelled analysis
+        partial_results = {
+            'final_analysis': {
+                'executive_summary': 'Partial analysis completed before cancellation.',
+                'financial_analysis': 'Limited financial data was analyzed.',
+                'investment_opportunities': 'Some opportunities identified.',
+                'risk_assessment': 'Initial risk factors noted.'
             },
-            {
-                'type': 'rag_queries',
-                'timestamp': timezone.now().isoformat(),
-                'queries': ['What is the revenue?', 'What are the risks?'],
-                'results': ['Revenue data found', 'Risk factors identified']
+            'iteration_history': [
+                {
+                    'type': 'initial_analysis',
+                    'timestamp': now_iso,
+                    'analysis': 'This is the initial analysis that was completed before cancellation.',
+                    'completeness_score': 6.5
+                },
+                {
+                    'type': 'rag_queries',
+                    'timestamp': now_iso,
+                    'queries': ['What is the revenue?', 'What are the risks?'],
+                    'results': ['Revenue data found', 'Risk factors identified']
+                }
+            ],
+            'total_iterations': 1,
+            'documents_analyzed': 5,
+            'analysis_quality': {
+                'final_completeness_score': 6.5,
+                'rag_queries_executed': 2
             }
-        ],
-        'total_iterations': 1,
-        'documents_analyzed': 5,
-        'analysis_quality': {
-            'final_completeness_score': 6.5,
-            'rag_queries_executed': 2
         }
-    }
-    
-    # Mark as cancelled with partial results
-    analysis1.mark_cancelled(partial_results, message='User cancelled during iteration 1')
-    
-    print(f"  ✓ Created cancelled analysis #{analysis1.id}")
-    print(f"  ✓ Status: {analysis1.status}")
-    print(f"  ✓ Has partial results: {analysis1.has_partial_results()}")
-    
-    # Test latest iteration analysis extraction
-    latest_analysis = analysis1.get_latest_iteration_analysis()
-    if latest_analysis:
-        print(f"  ✓ Latest iteration analysis: {latest_analysis[:100]}...")
-    else:
-        print("  ✗ No latest iteration analysis found")
-    
-    print()
-    
-    # Test 2: Create analysis with partial results and mark as failed
-    print("📋 Test 2: Failed Analysis with Partial Results")
-    print("-" * 50)
     
-    # Create test analysis
-    analysis2 = IterativeAnalysis.objects.create(
-        query="Test failed analysis with partial results",
-        status='IN_PROGRESS',
-        total_iterations=0,
-        documents_analyzed=3,
-        final_completeness_score=0.0
-    )
-    
-    # Simulate partial results from failed analysis
-    partial_results_failed = {
-        'final_analysis': {
-            'executive_summary': 'Partial analysis before failure.',
-            'financial_analysis': 'Some financial metrics analyzed.',
-            'investment_opportunities': 'Few opportunities found.',
-            'risk_assessment': 'Risk analysis incomplete.'
-        },
-        'iteration_history': [
-            {
-                'type': 'initial_analysis',
-                'timestamp': timezone.now().isoformat(),
-                'analysis': 'Initial analysis completed before system failure occurred.',
-                'completeness_score': 5.8
+        # Mark as cancelled with partial results
+        analysis1.mark_cancelled(partial_results, message='User cancelled during iteration 1')
+    
+        print(f"  ✓ Created cancelled analysis #{analysis1.id}")
+        print(f"  ✓ Status: {analysis1.status}")
+        print(f"  ✓ Has partial results: {analysis1.has_partial_results()}")
+    
+        # Test latest iteration analysis extraction
+        latest_analysis = analysis1.get_latest_iteration_analysis()
+        if latest_analysis:
+            print(f"  ✓ Latest iteration analysis: {latest_analysis[:100]}...")
+        else:
+            print("  ✗ No latest iteration analysis found")
+    
+        print()
+    
+        # Test 2: Create analysis with partial results and mark as failed
+        print("📋 Test 2: Failed Analysis with Partial Results")
+        print("-" * 50)
+    
+        # Simulate partial results from failed analysis
+        partial_results_failed = {
+            'final_analysis': {
+                'executive_summary': 'Partial analysis before failure.',
+                'financial_analysis': 'Some financial metrics analyzed.',
+                'investment_opportunities': 'Few opportunities found.',
+                'risk_assessment': 'Risk analysis incomplete.'
             },
-            {
-                'type': 'refinement',
-                'timestamp': timezone.now().isoformat(),
-                'analysis': 'Refinement analysis was in progress when failure occurred.',
-                'completeness_score': 7.2
+            'iteration_history': [
+                {
+                    'type': 'initial_analysis',
+                    'timestamp': now_iso,
+                    'analysis': 'Initial analysis completed before system failure occurred.',
+                    'completeness_score': 5.8
+                },
+                {
+                    'type': 'refinement',
+                    'timestamp': later_iso,
+                    'analysis': 'Refinement analysis was in progress when failure occurred.',
+                    'completeness_score': 7.2
+                }
+            ],
+            'total_iterations': 2,
+            'documents_analyzed': 3,
+            'analysis_quality': {
+                'final_completeness_score': 7.2,
+                'rag_queries_executed': 4
             }
-        ],
-        'total_iterations': 2,
-        'documents_analyzed': 3,
-        'analysis_quality': {
-            'final_completeness_score': 7.2,
-            'rag_queries_executed': 4
         }
-    }
     
-    # Mark as failed with partial results
-    analysis2.mark_failed('Database connection error', partial_results_failed)
+        # Mark as failed with partial results
+        analysis2.mark_failed('Database connection error', partial_results_failed)
     
-    print(f"  ✓ Created failed analysis #{analysis2.id}")
-    print(f"  ✓ Status: {analysis2.status}")
-    print(f"  ✓ Error message: {analysis2.error_message}")
-    print(f"  ✓ Has partial results: {analysis2.has_partial_results()}")
+        print(f"  ✓ Created failed analysis #{analysis2.id}")
+        print(f"  ✓ Status: {analysis2.status}")
+        print(f"  ✓ Error message: {analysis2.error_message}")
+        print(f"  ✓ Has partial results: {analysis2.has_partial_results()}")
     
-    # Test latest iteration analysis extraction
-    latest_analysis2 = analysis2.get_latest_iteration_analysis()
-    if latest_analysis2:
-        print(f"  ✓ Latest iteration analysis: {latest_analysis2[:100]}...")
-    else:
-        print("  ✗ No latest iteration analysis found")
+        # Test latest iteration analysis extraction
+        latest_analysis2 = analysis2.get_latest_iteration_analysis()
+        if latest_analysis2:
+            print(f"  ✓ Latest iteration analysis: {latest_analysis2[:100]}...")
+        else:
+            print("  ✗ No latest iteration analysis found")
     
-    print()
-    
-    # Test 3: Analysis without partial results
-    print("📋 Test 3: Failed Analysis without Partial Results")
-    print("-" * 50)
+        print()
     
-    # Create test analysis
-    analysis3 = IterativeAnalysis.objects.create(
-        query="Test failed analysis without partial results",
-        status='IN_PROGRESS',
-        total_iterations=0,
-        documents_analyzed=0,
-        final_completeness_score=0.0
-    )
+        # Test 3: Analysis without partial results
+        print("📋 Test 3: Failed Analysis without Partial Results")
+        print("-" * 50)
     
-    # Mark as failed without partial results
-    analysis3.mark_failed('Failed before any analysis could be performed')
+        # Mark as failed without partial results
+        analysis3.mark_failed('Failed before any analysis could be performed')
     
-    print(f"  ✓ Created failed analysis #{analysis3.id}")
-    print(f"  ✓ Status: {analysis3.status}")
-    print(f"  ✓ Error message: {analysis3.error_message}")
-    print(f"  ✓ Has partial results: {analysis3.has_partial_results()}")
+        print(f"  ✓ Created failed analysis #{analysis3.id}")
+        print(f"  ✓ Status: {analysis3.status}")
+        print(f"  ✓ Error message: {analysis3.error_message}")
+        print(f"  ✓ Has partial results: {analysis3.has_partial_results()}")
     
     print()
     
@@ -206,11 +215,13 @@ def test_partial_results_functionality():
     print("🧹 Cleanup")
     print("-" * 20)
     
-    test_analyses = IterativeAnalysis.objects.filter(
-        query__startswith="Test"
-    )
-    count = test_analyses.count()
-    test_analyses.delete()
+    # Single DELETE statement; IterativeAnalysis has no relations or delete signals
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {IterativeAnalysis._meta.db_table} WHERE query LIKE %s",
+            ["Test%"]
+        )
+        count = cursor.rowcount
     print(f"  ✓ Cleaned up {count} test analyses")
     
     print()
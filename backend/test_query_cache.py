@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the approximate query cache
+
+This script tests:
+1. Paraphrased queries reuse a cached result
+2. Queries differing only in the year never share a result
+3. Queries differing only in the ticker never share a result
+
+To run: python test_query_cache.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add the services directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / 'services'))
+
+from query_cache import ApproximateQueryCache
+
+def test_query_cache():
+    """Test near-duplicate matching in the approximate query cache"""
+
+    print("🧪 Testing Approximate Query Cache")
+    print("=" * 50)
+
+    calls = []
+
+    def search(query, search_type):
+        calls.append(query)
+        return f"{search_type} results for {query}"
+
+    # Loose threshold so only the key tokens can keep these queries apart
+    cache = ApproximateQueryCache(threshold=0.3)
+    cached_search = cache.wrap(search)
+
+    # Test 1: Paraphrase hit
+    print("\n📝 Test 1: Paraphrased query")
+    print("-" * 30)
+    first = cached_search("What was Apple revenue in 2023?", "chunks")
+    second = cached_search("what was apple's revenue in 2023", "chunks")
+    assert second == first, "Paraphrased query should reuse the cached result"
+    assert len(calls) == 1, f"Expected 1 search, got {len(calls)}"
+    print("  ✓ Paraphrase reused the cached result")
+
+    # Test 2: Year-only difference
+    print("\n📝 Test 2: Year-only difference")
+    print("-" * 30)
+    other_year = cached_search("What was Apple revenue in 2022?", "chunks")
+    assert other_year != first, "A different year must not reuse the cached result"
+    assert len(calls) == 2, f"Expected 2 searches, got {len(calls)}"
+    print("  ✓ 2022 query missed the 2023 entry")
+
+    # Test 3: Ticker-only difference
+    print("\n📝 Test 3: Ticker-only difference")
+    print("-" * 30)
+    cached_search("AAPL operating margin", "chunks")
+    cached_search("MSFT operating margin", "chunks")
+    assert len(calls) == 4, f"Expected 4 searches, got {len(calls)}"
+    print("  ✓ MSFT query missed the AAPL entry")
+
+    print(f"\n📊 Hits: {cache.hits}, misses: {cache.misses}")
+    print("\n🎉 Query cache testing completed!")
+
+if __name__ == "__main__":
+    test_query_cache()
@@ -26,9 +26,14 @@ def check_all_documents():
     cognee_service = CogneeService()
     
     # Get Django documents (what frontend sees)
-    django_docs = Document.objects.all().order_by('-filing_date')
+    django_docs = Document.objects.only(
+        'id', 'company_name', 'form_type', 'filing_date',
+        'accession_number', 'status', 'content_size'
+    ).order_by('-filing_date')
+    # Count up front and stream the rows below so memory stays flat on large tables
+    django_count = django_docs.count()
     print(f"📊 Django Database (Frontend Source):")
-    print(f"   Total documents: {django_docs.count()}")
+    print(f"   Total documents: {django_count}")
     
     # Get Cognee registry documents
     cognee_docs = cognee_service._document_registry
@@ -38,64 +43,64 @@ def check_all_documents():
     print(f"\n📋 Detailed Document Comparison:")
     print("-" * 60)
     
+    # Registry entries keyed by accession number, from the service's accession index
+    accession_to_cognee = cognee_service.get_registry_entries_by_accession()
+    docs_with_summaries = sum(cognee_service.has_summary_mask())
+    
+    # Buffer the report and write it in one call per section
+    buf = []
+    emit = buf.append
+    
     # Check each Django document
-    for i, doc in enumerate(django_docs, 1):
-        print(f"{i}. {doc.company_name} {doc.form_type} ({doc.filing_date})")
-        print(f"   Django ID: {doc.id} | Accession: {doc.accession_number}")
-        print(f"   Status: {doc.status} | Size: {doc.content_size or 'Unknown'}")
+    for i, doc in enumerate(django_docs.iterator(chunk_size=500), 1):
+        emit(f"{i}. {doc.company_name} {doc.form_type} ({doc.filing_date})\n")
+        emit(f"   Django ID: {doc.id} | Accession: {doc.accession_number}\n")
+        emit(f"   Status: {doc.status} | Size: {doc.content_size or 'Unknown'}\n")
         
         # Check if this document is in Cognee registry
-        found_in_cognee = False
-        has_summary = False
-        cognee_fingerprint = None
-        
-        for fingerprint, cognee_doc in cognee_docs.items():
-            cognee_metadata = cognee_doc.get('metadata', {})
-            if cognee_metadata.get('accession_number') == doc.accession_number:
-                found_in_cognee = True
-                cognee_fingerprint = fingerprint[:8]
-                has_summary = 'summary' in cognee_doc and cognee_doc['summary']
-                break
+        entry = accession_to_cognee.get(doc.accession_number)
         
-        if found_in_cognee:
+        if entry:
+            fingerprint, cognee_doc = entry
+            cognee_fingerprint = fingerprint[:8]
+            has_summary = 'summary' in cognee_doc and cognee_doc['summary']
             status_icon = "✅" if has_summary else "⚠️"
             summary_status = "Has Summary" if has_summary else "No Summary"
-            print(f"   Cognee: {status_icon} Found [{cognee_fingerprint}] - {summary_status}")
+            emit(f"   Cognee: {status_icon} Found [{cognee_fingerprint}] - {summary_status}\n")
         else:
-            print(f"   Cognee: ❌ Not found in registry")
+            emit(f"   Cognee: ❌ Not found in registry\n")
         
-        print()
+        emit("\n")
+    
+    sys.stdout.write("".join(buf))
+    buf.clear()
     
     # Summary statistics
-    django_count = django_docs.count()
     cognee_count = len(cognee_docs)
     
-    # Count documents with summaries
-    docs_with_summaries = 0
-    for cognee_doc in cognee_docs.values():
-        if 'summary' in cognee_doc and cognee_doc['summary']:
-            docs_with_summaries += 1
-    
-    print("="*60)
-    print("📈 Summary Statistics:")
-    print(f"   Frontend shows: {django_count} documents")
-    print(f"   Cognee registry has: {cognee_count} documents")
-    print(f"   Documents with summaries: {docs_with_summaries}")
-    print(f"   Documents missing from Cognee: {django_count - cognee_count}")
-    print(f"   Documents needing summaries: {cognee_count - docs_with_summaries}")
+    emit("="*60 + "\n")
+    emit("📈 Summary Statistics:\n")
+    emit(f"   Frontend shows: {django_count} documents\n")
+    emit(f"   Cognee registry has: {cognee_count} documents\n")
+    emit(f"   Documents with summaries: {docs_with_summaries}\n")
+    emit(f"   Documents missing from Cognee: {django_count - cognee_count}\n")
+    emit(f"   Documents needing summaries: {cognee_count - docs_with_summaries}\n")
     
     # Recommendations
-    print(f"\n💡 Recommendations:")
+    emit(f"\n💡 Recommendations:\n")
     if django_count > cognee_count:
-        print(f"   • {django_count - cognee_count} Django documents are not in Cognee registry")
-        print(f"   • These documents may need to be reprocessed to add to RAG")
+        emit(f"   • {django_count - cognee_count} Django documents are not in Cognee registry\n")
+        emit(f"   • These documents may need to be reprocessed to add to RAG\n")
         
     if cognee_count > docs_with_summaries:
-        print(f"   • {cognee_count - docs_with_summaries} Cognee documents need summaries")
-        print(f"   • Run: python quick_add_summaries.py")
+        emit(f"   • {cognee_count - docs_with_summaries} Cognee documents need summaries\n")
+        emit(f"   • Run: python quick_add_summaries.py\n")
     
     if cognee_count == docs_with_summaries and django_count == cognee_count:
-        print(f"   • ✅ All documents are properly processed with summaries!")
+        emit(f"   • ✅ All documents are properly processed with summaries!\n")
+    
+    sys.stdout.write("".join(buf))
+    buf.clear()
     
     return {
         'django_count': django_count,
@@ -110,45 +115,53 @@ def check_specific_documents():
     print("-" * 60)
     
     # Get Django documents with STORED status
-    stored_docs = Document.objects.filter(status='STORED')
+    stored_docs = Document.objects.filter(status='STORED').only(
+        'id', 'company_name', 'form_type', 'filing_date',
+        'accession_number', 'content_size', 'stored_at'
+    )
     print(f"📊 Django documents with STORED status: {stored_docs.count()}")
     
     # Get Cognee service
     cognee_service = CogneeService()
+    accession_to_cognee = cognee_service.get_registry_entries_by_accession(
+        [doc.accession_number for doc in stored_docs]
+    )
+    
+    # Buffer the per-document report and write it in one call
+    buf = []
+    emit = buf.append
     
     # Check each stored document
     for doc in stored_docs:
-        print(f"\n📄 {doc.company_name} {doc.form_type}")
-        print(f"   Accession: {doc.accession_number}")
-        print(f"   Filing Date: {doc.filing_date}")
-        print(f"   Content Size: {doc.content_size}")
-        print(f"   Stored At: {doc.stored_at}")
+        emit(f"\n📄 {doc.company_name} {doc.form_type}\n")
+        emit(f"   Accession: {doc.accession_number}\n")
+        emit(f"   Filing Date: {doc.filing_date}\n")
+        emit(f"   Content Size: {doc.content_size}\n")
+        emit(f"   Stored At: {doc.stored_at}\n")
         
         # Check in Cognee registry
-        found_in_cognee = False
-        for fingerprint, cognee_doc in cognee_service._document_registry.items():
-            cognee_metadata = cognee_doc.get('metadata', {})
-            if cognee_metadata.get('accession_number') == doc.accession_number:
-                found_in_cognee = True
-                has_full_content = 'full_content' in cognee_doc
-                has_summary = 'summary' in cognee_doc and cognee_doc['summary']
-                content_length = cognee_doc.get('content_length', 0)
-                
-                print(f"   Cognee Registry: ✅ Found [{fingerprint[:8]}]")
-                print(f"   Full Content: {'✅' if has_full_content else '❌'} ({content_length:,} chars)")
-                print(f"   Summary: {'✅' if has_summary else '❌'}")
-                
-                if has_summary:
-                    summary = cognee_doc['summary']
-                    exec_summary = summary.get('executive_summary', '')
-                    if exec_summary:
-                        preview = exec_summary[:100] + "..." if len(exec_summary) > 100 else exec_summary
-                        print(f"   Summary Preview: {preview}")
-                break
-        
-        if not found_in_cognee:
-            print(f"   Cognee Registry: ❌ Not found")
-            print(f"   Issue: Document marked as STORED but not in Cognee registry")
+        entry = accession_to_cognee.get(doc.accession_number)
+        if entry:
+            fingerprint, cognee_doc = entry
+            has_full_content = 'full_content' in cognee_doc
+            has_summary = 'summary' in cognee_doc and cognee_doc['summary']
+            content_length = cognee_doc.get('content_length', 0)
+            
+            emit(f"   Cognee Registry: ✅ Found [{fingerprint[:8]}]\n")
+            emit(f"   Full Content: {'✅' if has_full_content else '❌'} ({content_length:,} chars)\n")
+            emit(f"   Summary: {'✅' if has_summary else '❌'}\n")
+            
+            if has_summary:
+                summary = cognee_doc['summary']
+                exec_summary = summary.get('executive_summary', '')
+                if exec_summary:
+                    preview = exec_summary[:100] + "..." if len(exec_summary) > 100 else exec_summary
+                    emit(f"   Summary Preview: {preview}\n")
+        else:
+            emit(f"   Cognee Registry: ❌ Not found\n")
+            emit(f"   Issue: Document marked as STORED but not in Cognee registry\n")
+    
+    sys.stdout.write("".join(buf))
 
 if __name__ == "__main__":
     stats = check_all_documents()
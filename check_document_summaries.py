@@ -25,24 +25,23 @@ def check_summaries():
         print("❌ CogneeService not configured!")
         return
     
-    # Get registry stats
-    stats = cognee_service.get_registry_stats()
-    processing_stats = cognee_service.get_document_processing_stats()
+    # Registry and processing stats plus the document list, gathered in one pass
+    snapshot = cognee_service.snapshot()
     
     print(f"📊 Registry Statistics:")
-    print(f"   Total documents: {stats.get('total_documents', 0)}")
-    print(f"   Documents with summaries: {stats.get('documents_with_summaries', 0)}")
-    print(f"   Companies: {len(stats.get('companies', []))}")
-    print(f"   Form types: {stats.get('form_types', [])}")
+    print(f"   Total documents: {snapshot.total}")
+    print(f"   Documents with summaries: {snapshot.with_summaries}")
+    print(f"   Companies: {len(snapshot.companies)}")
+    print(f"   Form types: {snapshot.form_types}")
     
     print(f"\n📈 Processing Statistics:")
-    print(f"   AI summaries: {processing_stats.get('documents_with_ai_summaries', 0)}")
-    print(f"   Basic summaries: {processing_stats.get('documents_with_basic_summaries', 0)}")
-    print(f"   Average document size: {processing_stats.get('average_document_size', 0):,} characters")
-    print(f"   Largest document: {processing_stats.get('largest_document_processed', 0):,} characters")
+    print(f"   AI summaries: {snapshot.ai_summaries}")
+    print(f"   Basic summaries: {snapshot.basic_summaries}")
+    print(f"   Average document size: {snapshot.avg_size:,} characters")
+    print(f"   Largest document: {snapshot.max_size:,} characters")
     
     # Get detailed document list
-    summaries = cognee_service.get_document_summaries()
+    summaries = snapshot.docs
     
     if summaries:
         print(f"\n📋 Document Details:")
@@ -78,7 +77,7 @@ def check_summaries():
     print(f"   RAG storage: {doc_processing.get('rag_storage', 'Unknown')}")
     print(f"   Processing method: {doc_processing.get('processing_method', 'Unknown')}")
     
-    return stats
+    return snapshot
 
 if __name__ == "__main__":
     check_summaries()
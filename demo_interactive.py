@@ -4,11 +4,19 @@ Demo script showing the interactive FinDocGPT capabilities
 This demonstrates the flow without requiring user input
 """
 
+import asyncio
 import os
 import sys
 import django
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Add the backend directory to Python path
 backend_path = Path(__file__).parent / 'backend'
 sys.path.insert(0, str(backend_path))
@@ -20,9 +28,19 @@ django.setup()
 # Import services
 from services.edgar_service import EdgarService
 from services.cognee_service import CogneeService
+from demo_utils import snip
 
-def demo_flow():
-    """Demonstrate the complete flow"""
+# Upper bound on concurrent RAG/LLM requests issued by the demo
+MAX_PARALLEL_QUERIES = 4
+# Upper bound on worker processes fetching and parsing EDGAR filings
+MAX_FETCH_WORKERS = 4
+
+def fetch_filing_content(accession_number: str, cik: str):
+    """Fetch one filing in a worker process (services are not picklable, so build one here)"""
+    return EdgarService().get_filing_content(accession_number, cik)
+
+async def demo_flow_async():
+    """Demonstrate the complete flow, offloading blocking service calls to threads"""
     print("🚀 FinDocGPT Interactive Demo")
     print("="*50)
     
@@ -40,7 +58,7 @@ def demo_flow():
     # Demo search
     print("\n2. Searching for Apple Inc documents...")
     try:
-        filings = edgar_service.search_filings_by_query("Apple Inc", limit=2)
+        filings = await asyncio.to_thread(edgar_service.search_filings_by_query, "Apple Inc", limit=2)
         print(f"✅ Found {len(filings)} documents:")
         
         for filing in filings:
@@ -51,72 +69,98 @@ def demo_flow():
             return
         
         # Demo document processing
-        print(f"\n3. Processing first document: {filings[0]['form']} - {filings[0]['company_name']}")
+        print(f"\n3. Fetching content for {len(filings)} documents in parallel...")
         
-        content_data = edgar_service.get_filing_content(
-            filings[0]['accession_number'], 
-            filings[0]['cik']
-        )
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=min(len(filings), MAX_FETCH_WORKERS)) as pool:
+            contents = await asyncio.gather(*(
+                loop.run_in_executor(pool, fetch_filing_content, filing['accession_number'], filing['cik'])
+                for filing in filings
+            ))
         
-        if content_data:
-            print(f"✅ Content fetched ({content_data['size']} characters)")
+        # Store in Cognee one document at a time (the registry is not process-safe)
+        print("4. Storing in Cognee RAG...")
+        stored_count = 0
+        for filing, content_data in zip(filings, contents):
+            if not content_data:
+                print(f"❌ Failed to fetch document content: {filing['form']} - {filing['company_name']}")
+                continue
             
-            # Store in Cognee
-            print("4. Storing in Cognee RAG...")
+            print(f"✅ Content fetched for {filing['form']} ({content_data['size']} characters)")
             metadata = {
-                'company_name': filings[0]['company_name'],
-                'form_type': filings[0]['form'],
-                'ticker': filings[0].get('ticker', ''),
-                'filing_date': str(filings[0]['filing_date']),
-                'accession_number': filings[0]['accession_number'],
-                'cik': filings[0]['cik']
+                'company_name': filing['company_name'],
+                'form_type': filing['form'],
+                'ticker': filing.get('ticker', ''),
+                'filing_date': str(filing['filing_date']),
+                'accession_number': filing['accession_number'],
+                'cik': filing['cik']
             }
             
-            success = cognee_service.add_document(content_data['content'], metadata)
+            result = await asyncio.to_thread(cognee_service.add_document, content_data['content'], metadata)
             
-            if success:
+            # Duplicates are already in the RAG store, so they can be queried too
+            if result.get('success') or result.get('duplicate'):
                 print("✅ Document stored in Cognee")
+                stored_count += 1
+            else:
+                print(f"❌ Failed to store document: {result.get('error', 'Unknown error')}")
+        
+        if stored_count:
+            # Demo querying
+            print("\n5. Querying stored documents...")
+            
+            test_queries = [
+                "What is Apple's revenue?",
+                "What are the main business segments?", 
+                "What are key risk factors?"
+            ]
+            
+            def run_query(query):
+                # Use natural language search (like the Cognee example)
+                natural_results = cognee_service.search_context(query, "natural")
+                # Also test investment context
+                context = cognee_service.get_investment_context(query)
+                return natural_results, context
+            
+            # Queries are independent, so overlap their network round-trips
+            limit = asyncio.Semaphore(MAX_PARALLEL_QUERIES)
+            
+            async def run_query_async(query):
+                async with limit:
+                    return await asyncio.to_thread(run_query, query)
+            
+            query_results = await asyncio.gather(*(run_query_async(q) for q in test_queries))
+            
+            for query, (natural_results, context) in zip(test_queries, query_results):
+                print(f"\n💬 Query: '{query}'")
+                print(f"✅ Natural language response generated: {len(natural_results) > 0}")
                 
-                # Demo querying
-                print("\n5. Querying stored document...")
-                
-                test_queries = [
-                    "What is Apple's revenue?",
-                    "What are the main business segments?", 
-                    "What are key risk factors?"
-                ]
-                
-                for query in test_queries:
-                    print(f"\n💬 Query: '{query}'")
-                    
-                    # Use natural language search (like the Cognee example)
-                    natural_results = cognee_service.search_context(query, "natural")
-                    print(f"✅ Natural language response generated: {len(natural_results) > 0}")
-                    
-                    if natural_results:
-                        # Show natural language response
-                        response = str(natural_results[0])[:300] + "..."
-                        print(f"🤖 AI Response: {response}")
-                    
-                    # Also test investment context
-                    context = cognee_service.get_investment_context(query)
-                    if context.get('insights'):
-                        print(f"💡 Investment insights: {len(context['insights'])} generated")
-                        if context['insights']:
-                            insight_sample = str(context['insights'][0])[:200] + "..."
-                            print(f"   Sample insight: {insight_sample}")
-                
-                print("\n🎉 Demo completed successfully!")
-                print("\n💡 To use interactively, run:")
-                print("   python interactive_cognee_edgar.py")
+                if natural_results:
+                    # Show natural language response
+                    response = snip(natural_results[0], 300)
+                    print(f"🤖 AI Response: {response}")
                 
-            else:
-                print("❌ Failed to store document")
+                if context.get('insights'):
+                    print(f"💡 Investment insights: {len(context['insights'])} generated")
+                    if context['insights']:
+                        insight_sample = snip(context['insights'][0], 200)
+                        print(f"   Sample insight: {insight_sample}")
+            
+            print("\n🎉 Demo completed successfully!")
+            print("\n💡 To use interactively, run:")
+            print("   python interactive_cognee_edgar.py")
+            
         else:
-            print("❌ Failed to fetch document content")
+            print("❌ No documents were stored")
             
     except Exception as e:
         print(f"❌ Demo failed: {str(e)}")
 
+def demo_flow():
+    """Demonstrate the complete flow"""
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+    asyncio.run(demo_flow_async())
+
 if __name__ == "__main__":
     demo_flow()
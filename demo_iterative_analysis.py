@@ -27,25 +27,71 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finDocGPT.settings')
 django.setup()
 
 from services.iterative_analysis_service import IterativeAnalysisService
-from services.cognee_service import CogneeService
+from services.query_cache import ApproximateQueryCache
+from itertools import islice
 import json
 from datetime import datetime
+from demo_utils import snip
+
+# Section banners for the separators the demo uses
+_BANNERS = {'=': '=' * 60, '-': '-' * 60}
 
 def print_section(title: str, content: str = "", separator: str = "="):
     """Print a formatted section"""
-    print(f"\n{separator * 60}")
-    print(f"{title}")
-    print(f"{separator * 60}")
+    banner = _BANNERS.get(separator) or separator * 60
+    lines = ["", banner, title, banner]
     if content:
-        print(content)
+        lines.append(content)
+    print("\n".join(lines))
 
 def print_json_pretty(data: dict, max_length: int = 500):
     """Print JSON data in a readable format"""
-    json_str = json.dumps(data, indent=2)
-    if len(json_str) > max_length:
-        print(json_str[:max_length] + "...")
-    else:
-        print(json_str)
+    # iterencode yields the document piecewise, so stop once max_length is exceeded
+    chunks = []
+    total = 0
+    for chunk in json.JSONEncoder(indent=2).iterencode(data):
+        chunks.append(chunk)
+        total += len(chunk)
+        if total > max_length:
+            print("".join(chunks)[:max_length] + "...")
+            return
+    print("".join(chunks))
+
+def print_initial_analysis(iteration: dict):
+    print(f"\n📝 Iteration {iteration['iteration']}: Initial Analysis Generated")
+
+def print_evaluation(iteration: dict):
+    evaluation = iteration.get('evaluation', {})
+    questions = evaluation.get('specific_questions', [])
+    
+    print(f"\n🔍 Iteration {iteration['iteration']}: Completeness Evaluation")
+    print(f"   Score: {evaluation.get('completeness_score', 0)}/10")
+    print(f"   Complete: {'Yes' if evaluation.get('is_analysis_complete', False) else 'No'}")
+    print(f"   Questions Raised: {len(questions)}")
+    
+    if questions:
+        print(f"   Sample Question: {snip(questions[0], 100)}")
+
+def print_rag_queries(iteration: dict):
+    queries = iteration.get('queries', [])
+    print(f"\n🔎 Iteration {iteration['iteration']}: RAG Queries Executed")
+    print(f"   Queries: {len(queries)}")
+    if queries:
+        print(f"   Sample: {snip(queries[0], 80)}")
+
+def print_refined_analysis(iteration: dict):
+    print(f"\n✨ Iteration {iteration['iteration']}: Analysis Refined")
+
+def print_unknown_iteration(iteration: dict):
+    pass
+
+# Iteration history entries always carry 'iteration', 'type' and an ISO 'timestamp'
+ITERATION_PRINTERS = {
+    'initial_analysis': print_initial_analysis,
+    'evaluation': print_evaluation,
+    'rag_queries': print_rag_queries,
+    'refined_analysis': print_refined_analysis,
+}
 
 def demo_iterative_analysis():
     """Demonstrate the iterative analysis system"""
@@ -56,7 +102,13 @@ def demo_iterative_analysis():
     # Initialize services
     print("\n📋 Initializing services...")
     analysis_service = IterativeAnalysisService()
-    cognee_service = CogneeService()
+    # Share the analysis service's Cognee instance for embeddings and document listings
+    cognee_service = analysis_service.cognee_service
+    query_cache = ApproximateQueryCache(
+        embed=cognee_service.warm_embeddings if cognee_service._openai_client else None
+    )
+    # Cache only this service's RAG searches; the shared CogneeService stays untouched
+    analysis_service.query_cache = query_cache
     
     # Check if services are ready
     if not analysis_service.openai_client:
@@ -68,21 +120,23 @@ def demo_iterative_analysis():
     
     # Check available documents
     print_section("📊 Available Documents", separator="-")
-    document_summaries = cognee_service.get_document_summaries()
+    document_count = cognee_service.count_document_summaries()
     
-    if not document_summaries:
+    if not document_count:
         print("❌ No documents available in RAG database")
         print("Please run the document processing scripts first to add documents")
         return
     
-    print(f"✅ Found {len(document_summaries)} documents in RAG database:")
-    for i, doc in enumerate(document_summaries[:3], 1):  # Show first 3
+    print(f"✅ Found {document_count} documents in RAG database:")
+    # Summaries come newest first, so only the 3 shown are copied out
+    newest_summaries = islice(cognee_service.iter_document_summaries(), 3)
+    for i, doc in enumerate(newest_summaries, 1):
         summary = doc.get('summary', {})
         print(f"\n{i}. {doc.get('company_name')} - {doc.get('form_type')} ({doc.get('filing_date')})")
-        print(f"   Executive Summary: {summary.get('executive_summary', 'N/A')[:100]}...")
+        print(f"   Executive Summary: {snip(summary.get('executive_summary', 'N/A'), 100)}")
     
-    if len(document_summaries) > 3:
-        print(f"   ... and {len(document_summaries) - 3} more documents")
+    if document_count > 3:
+        print(f"   ... and {document_count - 3} more documents")
     
     # Demo queries
     demo_queries = [
@@ -91,6 +145,9 @@ def demo_iterative_analysis():
         "Provide a comprehensive risk assessment for investment in the available companies"
     ]
     
+    # Embed every known demo query in one provider call and seed the query cache
+    query_cache.warm(demo_queries, cognee_service.warm_embeddings(demo_queries))
+    
     print_section("🎯 Demo Queries Available")
     for i, query in enumerate(demo_queries, 1):
         print(f"{i}. {query}")
@@ -141,36 +198,7 @@ def demo_iterative_analysis():
     iteration_history = results['iteration_history']
     
     for iteration in iteration_history:
-        iter_num = iteration.get('iteration', 0)
-        iter_type = iteration.get('type', 'unknown')
-        timestamp = iteration.get('timestamp', '')
-        
-        if iter_type == 'initial_analysis':
-            print(f"\n📝 Iteration {iter_num}: Initial Analysis Generated")
-            
-        elif iter_type == 'evaluation':
-            evaluation = iteration.get('evaluation', {})
-            score = evaluation.get('completeness_score', 0)
-            is_complete = evaluation.get('is_analysis_complete', False)
-            questions = evaluation.get('specific_questions', [])
-            
-            print(f"\n🔍 Iteration {iter_num}: Completeness Evaluation")
-            print(f"   Score: {score}/10")
-            print(f"   Complete: {'Yes' if is_complete else 'No'}")
-            print(f"   Questions Raised: {len(questions)}")
-            
-            if questions and len(questions) > 0:
-                print(f"   Sample Question: {questions[0][:100]}...")
-                
-        elif iter_type == 'rag_queries':
-            queries = iteration.get('queries', [])
-            print(f"\n🔎 Iteration {iter_num}: RAG Queries Executed")
-            print(f"   Queries: {len(queries)}")
-            if queries:
-                print(f"   Sample: {queries[0][:80]}...")
-                
-        elif iter_type == 'refined_analysis':
-            print(f"\n✨ Iteration {iter_num}: Analysis Refined")
+        ITERATION_PRINTERS.get(iteration['type'], print_unknown_iteration)(iteration)
     
     # Demonstrate RAG tool functionality
     print_section("🛠️  RAG Tool Demonstration", separator="-")
@@ -186,14 +214,16 @@ def demo_iterative_analysis():
     test_query = "What are Apple's key financial metrics?"
     print(f"Query: {test_query}")
     
-    execute_function = rag_tool["execute_function"]
+    execute_function = query_cache.wrap(rag_tool["execute_function"])
     tool_result = execute_function(test_query, "graph")
     
     print(f"Results: {len(tool_result.get('results', []))} items found")
     print(f"Relevant Documents: {len(tool_result.get('relevant_documents', []))}")
     
     if tool_result.get('results'):
-        print(f"Sample Result: {str(tool_result['results'][0])[:150]}...")
+        print(f"Sample Result: {snip(tool_result['results'][0], 150)}")
+    
+    print(f"\n🗄️  Query cache: {query_cache.hits} hits / {query_cache.misses} misses")
     
     print_section("🎉 Demo Complete!", 
                   "The iterative analysis system successfully demonstrated:\n" +
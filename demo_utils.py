@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Display helpers shared by the demo scripts
+"""
+
+import reprlib
+
+
+def snip(value, limit: int = 300) -> str:
+    """Truncate a value for display without materializing the full str() of large results"""
+    if not isinstance(value, str):
+        # reprlib only walks as much of a container as fits the size budget
+        short_repr = reprlib.Repr()
+        short_repr.maxstring = short_repr.maxother = limit
+        # Every element takes at least two characters (", "), so at most limit // 2
+        # of them can be visible; the defaults (4 dict items, 6 list items) elide far sooner
+        short_repr.maxdict = short_repr.maxlist = short_repr.maxtuple = max(1, limit // 2)
+        short_repr.maxset = short_repr.maxfrozenset = short_repr.maxdeque = max(1, limit // 2)
+        value = short_repr.repr(value)
+    return value[:limit] + "..."
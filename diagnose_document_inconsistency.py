@@ -5,6 +5,7 @@ This helps identify processing pipeline issues.
 """
 
 import os
+import re
 import sys
 import django
 from datetime import datetime
@@ -14,10 +15,21 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finDocGPT.settings')
 django.setup()
 
+from django.db import connection
+from django.db.models import Count
+
 from documents.models import Document
 from services.cognee_service import CogneeService
 from services.edgar_service import EdgarService
 
+def _match_key(company_name, form_type, filing_date):
+    """Normalized (company, form, date) key that tolerates case, punctuation and whitespace drift"""
+    return (
+        re.sub(r'[^a-z0-9]', '', (company_name or '').lower()),
+        (form_type or '').strip().upper(),
+        str(filing_date or '')[:10]
+    )
+
 def diagnose_document_inconsistency():
     """Diagnose why some documents are in Cognee registry and others aren't"""
     
@@ -28,18 +40,28 @@ def diagnose_document_inconsistency():
     cognee_service = CogneeService()
     
     # Get all documents from Django
-    django_docs = list(Document.objects.all().order_by('-filing_date'))
+    # One-shot read of the columns we report on, bypassing queryset compilation
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id, status, company_name, form_type, filing_date, content_size, "
+            f"accession_number, stored_at FROM {Document._meta.db_table} "
+            "ORDER BY filing_date DESC"
+        )
+        columns = [col[0] for col in cursor.description]
+        django_docs = [dict(zip(columns, row)) for row in cursor.fetchall()]
     cognee_docs = cognee_service._document_registry
+    # accession_number -> (fingerprint, registry entry), built once for O(1) lookups
+    cognee_by_accession = cognee_service.get_registry_entries_by_accession()
     
     print(f"📊 Overview:")
     print(f"   Django Database: {len(django_docs)} documents")
     print(f"   Cognee Registry: {len(cognee_docs)} documents")
     
     # Analyze document statuses
-    status_counts = {}
-    for doc in django_docs:
-        status = doc.status
-        status_counts[status] = status_counts.get(status, 0) + 1
+    status_counts = {
+        row['status']: row['c']
+        for row in Document.objects.values('status').annotate(c=Count('id')).order_by()
+    }
     
     print(f"\n📈 Django Document Status Breakdown:")
     for status, count in status_counts.items():
@@ -49,74 +71,89 @@ def diagnose_document_inconsistency():
     print(f"\n🔍 Detailed Document Analysis:")
     print("-" * 60)
     
-    in_both = 0
-    only_in_django = 0
-    only_in_cognee = 0
+    # Classify documents up front with set algebra; accession numbers are unique in Django
+    django_accessions = {doc['accession_number'] for doc in django_docs}
+    in_both = len(django_accessions & cognee_by_accession.keys())
+    only_in_django = len(django_docs) - in_both
+    
+    # Index orphaned registry entries by normalized metadata so documents whose
+    # accession number drifted can still be paired with a likely registry entry
+    orphans = []
+    orphans_by_key = {}
+    for fingerprint, accession in cognee_service.iter_accession_numbers():
+        if accession not in django_accessions:
+            metadata = cognee_docs[fingerprint].get('metadata', {})
+            orphans.append((accession, metadata))
+            key = _match_key(metadata.get('company_name'), metadata.get('form_type'), metadata.get('filing_date'))
+            orphans_by_key.setdefault(key, []).append((fingerprint, accession))
+    
+    # Buffer the per-document report and write it in one go
+    buf = []
+    emit = buf.append
     
     # Check each Django document
     for i, doc in enumerate(django_docs, 1):
-        found_in_cognee = False
         cognee_info = None
         
         # Look for this document in Cognee registry
-        for fingerprint, cognee_doc in cognee_docs.items():
-            cognee_metadata = cognee_doc.get('metadata', {})
-            if cognee_metadata.get('accession_number') == doc.accession_number:
-                found_in_cognee = True
-                cognee_info = {
-                    'fingerprint': fingerprint[:8],
-                    'has_full_content': 'full_content' in cognee_doc,
-                    'has_summary': 'summary' in cognee_doc and cognee_doc['summary'],
-                    'content_length': cognee_doc.get('content_length', 0),
-                    'stored_at': cognee_doc.get('stored_at', 'Unknown')
-                }
-                in_both += 1
-                break
-        
-        if not found_in_cognee:
-            only_in_django += 1
+        hit = cognee_by_accession.get(doc['accession_number'])
+        found_in_cognee = hit is not None
+        if found_in_cognee:
+            fingerprint, cognee_doc = hit
+            cognee_info = {
+                'fingerprint': fingerprint[:8],
+                'has_full_content': 'full_content' in cognee_doc,
+                'has_summary': 'summary' in cognee_doc and cognee_doc['summary'],
+                'content_length': cognee_doc.get('content_length', 0),
+                'stored_at': cognee_doc.get('stored_at', 'Unknown')
+            }
         
         # Display status
         status_icon = "✅" if found_in_cognee else "❌"
-        print(f"{i:2d}. {status_icon} {doc.company_name} {doc.form_type} ({doc.filing_date})")
-        print(f"     Django: ID={doc.id} | Status={doc.status} | Size={doc.content_size}")
-        print(f"     Accession: {doc.accession_number}")
+        emit(f"{i:2d}. {status_icon} {doc['company_name']} {doc['form_type']} ({doc['filing_date']})\n")
+        emit(f"     Django: ID={doc['id']} | Status={doc['status']} | Size={doc['content_size']}\n")
+        emit(f"     Accession: {doc['accession_number']}\n")
         
         if found_in_cognee:
             info = cognee_info
             content_status = "✅" if info['has_full_content'] else "❌"
             summary_status = "✅" if info['has_summary'] else "❌"
-            print(f"     Cognee: [{info['fingerprint']}] | Content={content_status} | Summary={summary_status}")
-            print(f"     Cognee Size: {info['content_length']:,} chars | Stored: {info['stored_at'][:10]}")
+            emit(f"     Cognee: [{info['fingerprint']}] | Content={content_status} | Summary={summary_status}\n")
+            emit(f"     Cognee Size: {info['content_length']:,} chars | Stored: {info['stored_at'][:10]}\n")
         else:
-            print(f"     Cognee: ❌ Not found in registry")
+            emit(f"     Cognee: ❌ Not found in registry\n")
             
             # Try to identify why it's missing
             reasons = []
-            if doc.status != 'STORED':
-                reasons.append(f"Django status is {doc.status} (not STORED)")
-            if not doc.content_size:
+            if doc['status'] != 'STORED':
+                reasons.append(f"Django status is {doc['status']} (not STORED)")
+            if not doc['content_size']:
                 reasons.append("No content size recorded")
-            if not doc.stored_at:
+            if not doc['stored_at']:
                 reasons.append("No stored_at timestamp")
             
             if reasons:
-                print(f"     Possible reasons: {', '.join(reasons)}")
+                emit(f"     Possible reasons: {', '.join(reasons)}\n")
+            
+            candidates = orphans_by_key.get(_match_key(doc['company_name'], doc['form_type'], doc['filing_date']), [])
+            for candidate_fingerprint, candidate_accession in candidates:
+                emit(f"     Likely registry match: [{candidate_fingerprint[:8]}] Accession={candidate_accession}\n")
         
-        print()
+        emit("\n")
+    
+    sys.stdout.write("".join(buf))
+    buf.clear()
     
     # Check for documents only in Cognee (orphaned)
     print(f"🔍 Checking for orphaned Cognee documents...")
-    django_accessions = {doc.accession_number for doc in django_docs}
     
-    for fingerprint, cognee_doc in cognee_docs.items():
-        cognee_metadata = cognee_doc.get('metadata', {})
-        accession = cognee_metadata.get('accession_number')
-        
-        if accession not in django_accessions:
-            only_in_cognee += 1
-            print(f"   🔄 Orphaned: {cognee_metadata.get('company_name')} {cognee_metadata.get('form_type')}")
-            print(f"      Accession: {accession} | Not in Django database")
+    only_in_cognee = len(orphans)
+    for accession, cognee_metadata in orphans:
+        emit(f"   🔄 Orphaned: {cognee_metadata.get('company_name')} {cognee_metadata.get('form_type')}\n")
+        emit(f"      Accession: {accession or None} | Not in Django database\n")
+    
+    sys.stdout.write("".join(buf))
+    buf.clear()
     
     # Summary statistics
     print(f"\n" + "="*60)
@@ -166,14 +203,9 @@ def diagnose_document_inconsistency():
     print(f"\n🏥 PROCESSING PIPELINE HEALTH:")
     print(f"-" * 35)
     
-    stored_docs = [doc for doc in django_docs if doc.status == 'STORED']
-    stored_in_cognee = 0
-    
-    for doc in stored_docs:
-        for cognee_doc in cognee_docs.values():
-            if cognee_doc.get('metadata', {}).get('accession_number') == doc.accession_number:
-                stored_in_cognee += 1
-                break
+    stored_docs = [doc for doc in django_docs if doc['status'] == 'STORED']
+    stored_accessions = {doc['accession_number'] for doc in stored_docs}
+    stored_in_cognee = len(stored_accessions & cognee_by_accession.keys())
     
     if len(stored_docs) > 0:
         success_rate = (stored_in_cognee / len(stored_docs)) * 100
@@ -184,6 +216,14 @@ def diagnose_document_inconsistency():
             print(f"   ⚠️  {len(stored_docs) - stored_in_cognee} STORED documents are missing from Cognee")
             print(f"   🔧 This indicates processing pipeline issues")
     
+    if cognee_docs:
+        # Column-wise scan over the registry's presence flags
+        complete_entries = sum(
+            has_content & has_summary
+            for has_content, has_summary in zip(cognee_service.has_full_content_mask(), cognee_service.has_summary_mask())
+        )
+        print(f"📦 Registry Completeness: {complete_entries}/{len(cognee_docs)} entries have full content and a summary")
+    
     return {
         'django_count': len(django_docs),
         'cognee_count': len(cognee_docs),
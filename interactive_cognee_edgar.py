@@ -6,53 +6,324 @@ Fetch SEC documents via Edgar, store in Cognee RAG, and query for insights
 Usage: python interactive_cognee_edgar.py
 """
 
+import io
 import os
+import re
 import sys
+import math
+import heapq
+import zlib
+import atexit
+import bisect
+import tempfile
 import django
 import asyncio
+from collections import Counter, OrderedDict, defaultdict, deque
+from contextlib import contextmanager, redirect_stdout
+from functools import cached_property
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 # Add the backend directory to Python path
 backend_path = Path(__file__).parent / 'backend'
 sys.path.insert(0, str(backend_path))
 
-# Setup Django
+# Django settings; django.setup() and the services are loaded on first use (see _setup_django)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finDocGPT.settings')
-django.setup()
 
-# Import services
-from services.edgar_service import EdgarService
-from services.cognee_service import CogneeService
+# Concurrent EDGAR fetches (SEC fair-access policy allows 10 requests/second)
+EDGAR_MAX_CONCURRENCY = 10
+# Session-level LRU cache of search results, keyed by (normalized query, company, search type)
+SEARCH_CACHE_SIZE = 512
+# Paraphrased queries whose embeddings are within this cosine distance (similarity > 0.95) share results
+SEMANTIC_CACHE_DISTANCE = 0.05
+SEMANTIC_CACHE_SIZE = 1000
+# Retrieval-first insight validation: ~500-word chunks (~50 overlap), top-k sent to the validator
+VALIDATION_CHUNK_WORDS = 500
+VALIDATION_CHUNK_OVERLAP = 50
+VALIDATION_TOP_K = 12
+VALIDATION_RERANK_CANDIDATES = 48
+VALIDATION_DENSE_WEIGHT = 0.5
+# Validation chunks follow SEC item boundaries, then sentence boundaries within each item
+SEC_ITEM_HEADING = re.compile(r'(?im)^[ \t]*item[ \t]+(\d{1,2}[a-c]?)\b[.:]?')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+# Financial-content patterns, compiled once
+# Next major section: all-caps header line, SEC item header or SEC part header
+SECTION_BOUNDARY = re.compile(r'\n[A-Z][A-Z\s]+\n|\nITEM \d+|\nPART [IVX]+')
+FINANCIAL_FIGURE = re.compile(r'\$[\d,]+|\d+\.\d+%|\d{4}')
+# Dollar amounts and percentages in one scan; the 'decimal' group marks percentages like 12.5%
+FINANCIAL_AMOUNT = re.compile(r'(?P<dollar>\$[\d,]+(?:\.\d+)?)|(?P<pct>\d+(?P<decimal>\.\d+)?%)')
+# Financial statement sections extracted for validation, in output order
+FINANCIAL_SECTIONS = [
+    'CONSOLIDATED STATEMENTS OF OPERATIONS',
+    'CONSOLIDATED STATEMENTS OF COMPREHENSIVE INCOME',
+    'CONSOLIDATED BALANCE SHEETS',
+    'CONSOLIDATED STATEMENTS OF CASH FLOWS',
+    'RESULTS OF OPERATIONS',
+    'FINANCIAL CONDITION',
+    'LIQUIDITY AND CAPITAL RESOURCES'
+]
+FINANCIAL_SECTION_HEADING = re.compile("|".join(re.escape(section.lower()) for section in FINANCIAL_SECTIONS))
+# Sections whose presence the document-processing diagnosis reports, one capture group each
+DIAGNOSTIC_SECTIONS = [
+    'CONSOLIDATED STATEMENTS OF OPERATIONS',
+    'CONSOLIDATED BALANCE SHEETS',
+    'RESULTS OF OPERATIONS',
+    'REVENUE',
+    'NET SALES'
+]
+DIAGNOSTIC_SECTION_HEADING = re.compile("|".join(f"({re.escape(section.lower())})" for section in DIAGNOSTIC_SECTIONS))
+# Terms for the manual raw-document search in RAG diagnostics
+MANUAL_SEARCH_TERM = re.compile(r'revenue|sales|growth|increase|billion|million')
+# Include object introspection (attribute listings) in the RAG debug output
+DIAGNOSTIC_VERBOSE = False
+# Concurrent Cognee searches in the RAG diagnostic tools
+DIAGNOSTIC_SEARCH_CONCURRENCY = 8
+# Concurrent LLM validation calls
+VALIDATION_CONCURRENCY = 4
+# zlib level for session filing text spilled to disk (fast; plain-text filings shrink ~3x)
+LAZY_CONTENT_COMPRESSION = 3
+
+# Banner and main menu, each written to stdout in one call
+BANNER = "\n".join([
+    "",
+    "="*70,
+    "🚀 FinDocGPT Interactive Console",
+    "📊 SEC Document Analysis with Cognee RAG",
+    "="*70,
+    "\nFeatures:",
+    "• Fetch real SEC filings via EdgarTools",
+    "• Store documents in Cognee knowledge graph",
+    "• Query documents using natural language",
+    "• Interactive document exploration",
+    "\n" + "-"*70,
+    ""
+])
+
+MENU = "\n".join([
+    "\n📋 Main Menu:",
+    "1. 🔍 Search & Fetch SEC Documents",
+    "2. 📄 View Stored Documents",
+    "3. 💬 Query Documents (RAG)",
+    "4. 📊 Session Statistics",
+    "5. 🔧 Service Status",
+    "6. 🧹 Clear Cognee Data",
+    "7. 🔄 Complete Reset (Fix Issues)",
+    "8. 🔍 Debug RAG Results",
+    "9. 🔬 Diagnose RAG Accuracy Issues",
+    "10. 📋 Document Registry",
+    "11. 🔬 Diagnose Validation Content Issues",
+    "12. ❓ Help",
+    "13. 🚪 Exit",
+    "-"*50,
+    ""
+])
+
+# Validation content diagnosis: flag filings under SMALL_CONTENT_CHARS, or under this fraction of
+# the median size when the documents are typically much larger, and bucket sizes at these edges
+SMALL_CONTENT_CHARS = 10_000
+SMALL_CONTENT_MEDIAN_FRACTION = 0.25
+CONTENT_SIZE_BUCKETS = (10_000, 100_000, 1_000_000, 10_000_000)
+CONTENT_SIZE_BUCKET_LABELS = ("<10K", "10K-100K", "100K-1M", "1M-10M", ">=10M")
+
+# Per-document status block in the validation content diagnosis (str.format_map fields)
+VALIDATION_DOC_STATUS = (
+    "{i}. {company} - {form}\n"
+    "   📅 Filing Date: {date}\n"
+    "   🔗 Source: {source}\n"
+    "   📊 Content Size: {size:,} characters\n"
+    "   ✅ Has Full Content: {has_full}"
+)
+
+# Allowed answers for the console prompts, built once (tuples keep the order shown on bad input)
+MENU_CHOICES = tuple(str(i) for i in range(1, 14))
+FORM_CHOICES = ("10-K", "10-Q", "8-K", "ALL")
+FETCH_LIMIT_CHOICES = tuple(str(i) for i in range(1, 11))
+YES_NO_CHOICES = ("y", "n", "yes", "no")
+YES_ANSWERS = frozenset(("y", "yes"))
+
+# Help screen, written to stdout in one call
+HELP_TEXT = "\n".join([
+    "\n" + "="*50,
+    "❓ Help & Usage Guide",
+    "="*50,
+    "\n🚀 Quick Start:",
+    "1. Use option 1 to search and fetch SEC documents",
+    "2. Wait for documents to be processed and stored",
+    "3. Use option 3 to query your documents",
+    "\n💡 Tips:",
+    "• Be specific with company names (e.g., 'Apple Inc' vs 'Apple')",
+    "• 10-K reports contain the most comprehensive information",
+    "• 10-Q reports are good for quarterly updates",
+    "• Use natural language for queries",
+    "\n🔍 Example Queries:",
+    "• 'What was the revenue last quarter?'",
+    "• 'What are the main business segments?'",
+    "• 'List the key risk factors'",
+    "• 'How much cash does the company have?'",
+    "\n🔬 Validation Feature:",
+    "• Validate RAG insights against raw documents using LLM",
+    "• Get accuracy scores, correctness assessments, and improvements",
+    "• Identify potential errors or omissions in AI-generated insights",
+    "• Cost: ~$0.02 per insight validation",
+    "\n⚡ Performance:",
+    "• First document processing: 15-45 seconds",
+    "• Subsequent queries: 1-10 seconds (cached)",
+    "• Insight validation: 30-60 seconds per insight",
+    "• Larger documents take longer to process",
+    "\n🆘 Troubleshooting:",
+    "• If processing fails, try with fewer documents",
+    "• Check your internet connection for Edgar fetching",
+    "• Ensure your OpenAI API key is set in .env",
+    ""
+])
+
+
+class LazyContent:
+    """Filing text spilled to a zlib-compressed temp file; read back only when validation needs it"""
+    __slots__ = ('path', 'size', 'sha')
+    
+    def __init__(self, path: str, size: int, sha: str = None):
+        self.path = path
+        self.size = size
+        self.sha = sha
+    
+    @classmethod
+    def spill(cls, content: str, sha: str = None) -> 'LazyContent':
+        """Write compressed content to a temp file that is removed when the session exits"""
+        tf = tempfile.NamedTemporaryFile('wb', delete=False, suffix='.txt.z')
+        with tf:
+            tf.write(zlib.compress(content.encode('utf-8'), LAZY_CONTENT_COMPRESSION))
+        atexit.register(Path(tf.name).unlink, missing_ok=True)
+        return cls(path=tf.name, size=len(content), sha=sha)
+    
+    def read(self) -> str:
+        return zlib.decompress(Path(self.path).read_bytes()).decode('utf-8')
+    
+    def head(self, chars: int) -> str:
+        """Return the first `chars` characters, decompressing only as much of the file as needed"""
+        decompressor = zlib.decompressobj()
+        data = bytearray()
+        with open(self.path, 'rb') as f:
+            # UTF-8 needs at most 4 bytes per character
+            while len(data) < chars * 4:
+                block = f.read(64 * 1024)
+                if not block:
+                    break
+                data += decompressor.decompress(block)
+        # A multi-byte character cut at the end of the buffer is dropped
+        return data.decode('utf-8', errors='ignore')[:chars]
+    
+    def __str__(self) -> str:
+        return self.read()
+    
+    def __len__(self) -> int:
+        return self.size
+
+
+@contextmanager
+def buffered_stdout():
+    """Collect everything printed inside the block (or decorated call) and write it out in one call"""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            yield
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
+
+def _setup_django():
+    """Set up Django once, before the services are first imported"""
+    global _django_ready
+    if not _django_ready:
+        django.setup()
+        _django_ready = True
+
+_django_ready = False
+
 
 class InteractiveFinDocGPT:
     """Interactive command-line interface for FinDocGPT"""
     
     def __init__(self):
-        self.edgar_service = EdgarService()
-        self.cognee_service = CogneeService()
+        self._services_ready = False
         self.stored_documents = []
+        self._search_cache = OrderedDict()
+        # Per-document validation chunks, keyed by (accession number, content length)
+        self._document_chunks = {}
+        # Lowercased document text shared by the diagnostic helpers, same keys as the chunks
+        self._lower_contents = {}
+        # Financial-figure and section counts for the diagnosis tools, same keys as the chunks
+        self._document_stats = {}
+        # Company/ticker -> documents index for validation, keyed by (session size, registry version)
+        self._company_index = None
+        self._company_index_key = None
+        # Validation documents from the last full assembly, keyed by (session size, registry version)
+        self._validation_docs_cache = None
+        self._validation_docs_cache_key = None
+        # Background query-state warm-up started by query_documents, if still pending
+        self._warmup = None
         self.session_stats = {
             'documents_fetched': 0,
             'documents_stored': 0,
             'queries_made': 0,
             'session_start': datetime.now()
         }
+    
+    # Services are created on first use so the banner, menu and help come up instantly
+    @cached_property
+    def edgar_service(self):
+        _setup_django()
+        from services.edgar_service import EdgarService
+        return EdgarService()
+    
+    @cached_property
+    def cognee_service(self):
+        _setup_django()
+        from services.cognee_service import CogneeService
+        return CogneeService()
+    
+    @cached_property
+    def _semantic_cache(self):
+        from services.query_cache import ApproximateQueryCache
+        return ApproximateQueryCache(
+            threshold=SEMANTIC_CACHE_DISTANCE,
+            capacity=SEMANTIC_CACHE_SIZE,
+            embed=self.cognee_service.warm_embeddings if self.cognee_service._openai_client else None
+        )
+    
+    def _ensure_services(self) -> bool:
+        """Initialize services before the first action that needs them"""
+        if self._services_ready:
+            return True
+        
+        print("🔄 Initializing services...")
+        if not self.cognee_service.is_configured:
+            print("❌ Cognee service not properly configured!")
+            print("💡 Please check your .env file and ensure LLM_API_KEY is set.")
+            return False
+        
+        print("✅ Services initialized successfully!")
+        self._services_ready = True
         # Check for existing persistent documents
         self._load_existing_documents()
+        return True
     
     def _load_existing_documents(self):
         """Load existing documents from Cognee persistent storage"""
         try:
-            # Test if Cognee has any existing data by doing a simple search
-            test_results = self.cognee_service.search_context("documents", "chunks")
-            if test_results:
+            # The persisted document registry records every stored document, so checking it
+            # avoids an embedding + search round-trip on every start
+            registry_size = len(self.cognee_service._document_registry)
+            if registry_size:
                 print(f"🔄 Found existing data in Cognee storage...")
                 
                 # Instead of creating fake documents from chunks, just indicate data exists
-                # The chunks represent parts of documents, not separate documents
-                print(f"📊 Found {len(test_results)} document chunks in storage")
+                print(f"📊 Found {registry_size} previously stored documents in the registry")
                 print("💡 Previous documents are available for querying via RAG")
                 print("💡 Use 'View Stored Documents' to see current session documents only")
                 print("💡 Use 'Complete Reset' if you want to clear all previous data")
@@ -66,36 +337,38 @@ class InteractiveFinDocGPT:
     
     def print_banner(self):
         """Display welcome banner"""
-        print("\n" + "="*70)
-        print("🚀 FinDocGPT Interactive Console")
-        print("📊 SEC Document Analysis with Cognee RAG")
-        print("="*70)
-        print("\nFeatures:")
-        print("• Fetch real SEC filings via EdgarTools")
-        print("• Store documents in Cognee knowledge graph")
-        print("• Query documents using natural language")
-        print("• Interactive document exploration")
-        print("\n" + "-"*70)
+        sys.stdout.write(BANNER)
+        sys.stdout.flush()
     
     def print_menu(self):
         """Display main menu options"""
-        print("\n📋 Main Menu:")
-        print("1. 🔍 Search & Fetch SEC Documents")
-        print("2. 📄 View Stored Documents")
-        print("3. 💬 Query Documents (RAG)")
-        print("4. 📊 Session Statistics")
-        print("5. 🔧 Service Status")
-        print("6. 🧹 Clear Cognee Data")
-        print("7. 🔄 Complete Reset (Fix Issues)")
-        print("8. 🔍 Debug RAG Results")
-        print("9. 🔬 Diagnose RAG Accuracy Issues")
-        print("10. 📋 Document Registry")
-        print("11. 🔬 Diagnose Validation Content Issues")
-        print("12. ❓ Help")
-        print("13. 🚪 Exit")
-        print("-"*50)
+        sys.stdout.write(MENU)
+        sys.stdout.flush()
+    
+    def _cached_search(self, query: str, company: str, search_type: str) -> List[Any]:
+        """Search Cognee (filtered to company when given) through the session LRU cache"""
+        key = (query.strip().lower(), company or '', search_type)
+        if key in self._search_cache:
+            self._search_cache.move_to_end(key)
+            return self._search_cache[key]
+        
+        # Fall back to near-duplicate (paraphrase) matches before searching
+        scope = (company or '', search_type)
+        query_vector = self._semantic_cache.vectorize(query)
+        hit, results = self._semantic_cache.lookup(query, scope, query_vector)
+        if not hit:
+            if company:
+                results = self.cognee_service.search_context_by_company(query, company, search_type)
+            else:
+                results = self.cognee_service.search_context(query, search_type)
+            self._semantic_cache.store(query, results, scope, query_vector)
+        
+        self._search_cache[key] = results
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return results
     
-    def get_user_input(self, prompt: str, options: List[str] = None) -> str:
+    def get_user_input(self, prompt: str, options: Tuple[str, ...] = None) -> str:
         """Get user input with optional validation"""
         while True:
             try:
@@ -113,8 +386,26 @@ class InteractiveFinDocGPT:
                 print("\n\n👋 Goodbye!")
                 sys.exit(0)
     
+    async def _fetch_filing_contents(self, filings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch filing contents concurrently, in the same order as filings"""
+        semaphore = asyncio.Semaphore(EDGAR_MAX_CONCURRENCY)
+        
+        def fetch_and_hash(filing):
+            content_data = self.edgar_service.get_filing_content(filing['accession_number'], filing['cik'])
+            if content_data and content_data.get('content'):
+                # Hash once here so every add_document attempt (including forced re-stores) reuses it
+                content_data['content_hash'] = self.cognee_service._hash_content(content_data['content'])
+            return content_data
+        
+        async def fetch_one(filing):
+            async with semaphore:
+                return await asyncio.to_thread(fetch_and_hash, filing)
+        
+        return await asyncio.gather(*(fetch_one(filing) for filing in filings))
+    
     def search_and_fetch_documents(self):
         """Search for and fetch SEC documents"""
+        self._wait_for_warmup()
         print("\n" + "="*50)
         print("🔍 SEC Document Search & Fetch")
         print("="*50)
@@ -128,8 +419,7 @@ class InteractiveFinDocGPT:
         print("• 8-K: Current Report")
         print("• ALL: All form types")
         
-        form_input = self.get_user_input("Select form types (10-K, 10-Q, 8-K, or ALL)", 
-                                       ["10-K", "10-Q", "8-K", "ALL"])
+        form_input = self.get_user_input("Select form types (10-K, 10-Q, 8-K, or ALL)", FORM_CHOICES)
         
         if form_input == "ALL":
             form_types = ["10-K", "10-Q", "8-K"]
@@ -137,8 +427,7 @@ class InteractiveFinDocGPT:
             form_types = [form_input]
         
         try:
-            limit = int(self.get_user_input("Number of documents to fetch (1-10)", 
-                                          [str(i) for i in range(1, 11)]))
+            limit = int(self.get_user_input("Number of documents to fetch (1-10)", FETCH_LIMIT_CHOICES))
         except ValueError:
             limit = 3
         
@@ -157,10 +446,9 @@ class InteractiveFinDocGPT:
                 print(f"  {i}. {filing['form']} - {filing['company_name']} ({filing['filing_date']})")
             
             # Confirm processing
-            confirm = self.get_user_input("Process and store these documents in Cognee? (y/n)", 
-                                        ["y", "n", "yes", "no"])
+            confirm = self.get_user_input("Process and store these documents in Cognee? (y/n)", YES_NO_CHOICES)
             
-            if confirm.lower() not in ["y", "yes"]:
+            if confirm.lower() not in YES_ANSWERS:
                 print("❌ Operation cancelled.")
                 return
             
@@ -168,16 +456,14 @@ class InteractiveFinDocGPT:
             print(f"\n🔄 Processing {len(filings)} documents...")
             successful_stores = 0
             
-            for i, filing in enumerate(filings, 1):
+            # Fetch all document contents up front; new documents are then stored as one batch
+            print(f"🔄 Fetching content for {len(filings)} documents...")
+            contents = asyncio.run(self._fetch_filing_contents(filings))
+            
+            pending = []  # (content_data, metadata) to store in a single batch
+            for i, (filing, content_data) in enumerate(zip(filings, contents), 1):
                 print(f"\n📄 Processing document {i}/{len(filings)}: {filing['form']} - {filing['company_name']}")
                 
-                # Fetch document content
-                print("  🔄 Fetching content...")
-                content_data = self.edgar_service.get_filing_content(
-                    filing['accession_number'], 
-                    filing['cik']
-                )
-                
                 if not content_data:
                     print("  ❌ Failed to fetch content")
                     continue
@@ -194,9 +480,35 @@ class InteractiveFinDocGPT:
                     'cik': filing['cik']
                 }
                 
-                # Store in Cognee with duplicate checking
-                print("  🔄 Storing in Cognee RAG...")
-                result = self.cognee_service.add_document(content_data['content'], metadata)
+                # Identical content already embedded with the current model needs no re-ingestion
+                cached = self.cognee_service.find_by_content_hash(content_data.get('content_hash'))
+                if cached:
+                    cached_fingerprint, _ = cached
+                    print(f"  ♻️  Already indexed from identical content ({cached_fingerprint[:8]}...) - skipping ingestion")
+                    self.stored_documents.append({
+                        'metadata': metadata,
+                        'content_size': content_data['size'],
+                        'raw_content': LazyContent.spill(content_data['content'], content_data.get('content_hash')),
+                        'stored_at': datetime.now(),
+                        'fingerprint': cached_fingerprint,
+                        'cached': True
+                    })
+                    successful_stores += 1
+                    continue
+                
+                pending.append((content_data, metadata))
+            
+            # Store all new documents in Cognee at once (one knowledge-graph build for the batch)
+            results = []
+            if pending:
+                print(f"\n🔄 Storing {len(pending)} documents in Cognee RAG...")
+                results = self.cognee_service.add_documents_bulk([
+                    (content_data['content'], metadata, content_data.get('content_hash'))
+                    for content_data, metadata in pending
+                ])
+            
+            for (content_data, metadata), result in zip(pending, results):
+                print(f"\n📄 {metadata['form_type']} - {metadata['company_name']}")
                 
                 if result['success']:
                     print("  ✅ Successfully stored in Cognee")
@@ -206,7 +518,7 @@ class InteractiveFinDocGPT:
                     self.stored_documents.append({
                         'metadata': metadata,
                         'content_size': content_data['size'],
-                        'raw_content': content_data['content'],  # Store raw content for validation
+                        'raw_content': LazyContent.spill(content_data['content'], content_data.get('content_hash')),  # Raw content for validation, kept on disk
                         'stored_at': datetime.now(),
                         'fingerprint': result.get('fingerprint', '')
                     })
@@ -221,20 +533,22 @@ class InteractiveFinDocGPT:
                     
                     # Ask user if they want to proceed with duplicate
                     force_store = input("      🤔 Force store duplicate anyway? (y/n): ").strip().lower()
-                    if force_store in ['y', 'yes']:
+                    if force_store in YES_ANSWERS:
                         # Modify metadata to make it unique
                         modified_metadata = metadata.copy()
                         modified_metadata['accession_number'] = f"{metadata.get('accession_number', 'unknown')}_forced_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                         
                         print("      🔄 Force storing with modified metadata...")
-                        force_result = self.cognee_service.add_document(content_data['content'], modified_metadata)
+                        force_result = self.cognee_service.add_document(
+                            content_data['content'], modified_metadata, content_hash=content_data.get('content_hash')
+                        )
                         
                         if force_result['success']:
                             print("      ✅ Force stored successfully")
                             self.stored_documents.append({
                                 'metadata': modified_metadata,
                                 'content_size': content_data['size'],
-                                'raw_content': content_data['content'],
+                                'raw_content': LazyContent.spill(content_data['content'], content_data.get('content_hash')),
                                 'stored_at': datetime.now(),
                                 'fingerprint': force_result.get('fingerprint', ''),
                                 'forced_duplicate': True
@@ -246,6 +560,11 @@ class InteractiveFinDocGPT:
                 else:
                     print(f"  ❌ Failed to store in Cognee: {result.get('error', 'Unknown error')}")
             
+            # New documents can change search results
+            if successful_stores:
+                self._search_cache.clear()
+                self._semantic_cache.clear()
+            
             # Update stats
             self.session_stats['documents_fetched'] += len(filings)
             self.session_stats['documents_stored'] += successful_stores
@@ -294,7 +613,7 @@ class InteractiveFinDocGPT:
                 
                 if companies:
                     print(f"\n   🏢 Companies Available ({len(companies)}):")
-                    for company in sorted(companies)[:5]:  # Show first 5
+                    for company in heapq.nsmallest(5, companies):  # Show first 5
                         print(f"      • {company}")
                     if len(companies) > 5:
                         print(f"      ... and {len(companies) - 5} more")
@@ -323,6 +642,14 @@ class InteractiveFinDocGPT:
             if not current_session_docs:
                 print("💡 Use option 1 to search and fetch documents first.")
     
+    def _warm_query_state(self):
+        """Build the lookup structures the first query and validation would otherwise build on demand"""
+        self.cognee_service._get_company_matchers()
+        self._get_company_index()
+        for doc in self.stored_documents:
+            if not doc.get('is_from_previous_session'):
+                self._chunk_document(doc)
+    
     def query_documents(self):
         """Query stored documents using RAG"""
         print("\n" + "="*50)
@@ -357,6 +684,29 @@ class InteractiveFinDocGPT:
         print("• 'Summarize the financial performance'")
         print("• 'What business segments does the company have?'")
         
+        # Build lookup structures in the background while the user types the first question
+        warmup_executor = ThreadPoolExecutor(max_workers=1)
+        self._warmup = warmup_executor.submit(self._warm_query_state)
+        warmup_executor.shutdown(wait=False)
+        
+        try:
+            self._query_loop()
+        finally:
+            # Never leave the warm-up running: it fills caches that Clear/Reset empty
+            self._wait_for_warmup()
+    
+    def _wait_for_warmup(self):
+        """Wait for a background query-state warm-up (if any) to finish"""
+        warmup, self._warmup = self._warmup, None
+        if warmup is None:
+            return
+        try:
+            warmup.result()
+        except Exception as e:
+            print(f"⚠️  Background warm-up failed: {str(e)}")
+    
+    def _query_loop(self):
+        """Prompt for questions and answer them until the user goes back"""
         while True:
             query = input("\n💬 Your question (or 'back' to return): ").strip()
             
@@ -367,6 +717,9 @@ class InteractiveFinDocGPT:
                 print("❌ Please enter a question.")
                 continue
             
+            # Warm-up and search share the same caches, so wait for it to finish first
+            self._wait_for_warmup()
+            
             print(f"\n🔍 Searching for: '{query}'")
             print("🔄 Processing...")
             
@@ -382,7 +735,7 @@ class InteractiveFinDocGPT:
                 
                 # Ask user if they want to specify a company
                 specify_company = input("🏢 Specify a company to filter results? (y/n): ").strip().lower()
-                if specify_company in ['y', 'yes']:
+                if specify_company in YES_ANSWERS:
                     company_input = input("Enter company name or ticker (e.g., 'Apple' or 'AAPL'): ").strip()
                     if company_input:
                         detected_company = company_input
@@ -395,11 +748,11 @@ class InteractiveFinDocGPT:
                 print("-" * 40)
                 
                 # Choose search method based on company filtering
-                if use_company_filter and detected_company:
-                    natural_response = self.cognee_service.search_context_by_company(query, detected_company, "natural")
+                company_filter = detected_company if use_company_filter else None
+                natural_response = self._cached_search(query, company_filter, "natural")
+                if company_filter:
                     print(f"🔍 Searched {detected_company} documents only")
                 else:
-                    natural_response = self.cognee_service.search_context(query, "natural")
                     print("🔍 Searched all documents")
                 
                 if natural_response:
@@ -417,11 +770,10 @@ class InteractiveFinDocGPT:
                 print("\n📄 Document Analysis:")
                 print("-" * 40)
                 
-                if use_company_filter and detected_company:
-                    chunks = self.cognee_service.search_context_by_company(query, detected_company, "chunks")
+                chunks = self._cached_search(query, company_filter, "chunks")
+                if company_filter:
                     print(f"🔍 Searched {detected_company} documents only")
                 else:
-                    chunks = self.cognee_service.search_context(query, "chunks")
                     print("🔍 Searched all documents")
                 
                 if chunks:
@@ -431,28 +783,30 @@ class InteractiveFinDocGPT:
                 
                 # Show raw chunks if user wants detailed information
                 show_details = input("\n🔍 Show detailed document chunks? (y/n): ").strip().lower()
-                if show_details in ['y', 'yes']:
+                if show_details in YES_ANSWERS:
                     if chunks:
                         print(f"\n📄 Found {len(chunks)} detailed document sections:")
-                        for i, chunk in enumerate(chunks[:5], 1):  # Show up to 5 chunks
+                        write = sys.stdout.write
+                        for i, chunk in enumerate(islice(chunks, 5), 1):  # Show up to 5 chunks
                             chunk_text = str(chunk).strip()
                             
                             # Skip empty or very short chunks
                             if len(chunk_text) < 50:
                                 continue
                             
-                            # Better formatting for display
+                            # Write head/tail windows directly rather than building a display string
+                            write(f"\n{i}. " + "="*60 + "\n")
                             if len(chunk_text) > 800:
                                 # Show beginning and end of longer chunks
-                                display_text = chunk_text[:400] + "\n\n[... content continues ...]\n\n" + chunk_text[-200:]
+                                write(chunk_text[:400])
+                                write("\n\n[... content continues ...]\n\n")
+                                write(chunk_text[-200:])
                             elif len(chunk_text) > 400:
-                                display_text = chunk_text[:400] + "\n[... truncated]"
+                                write(chunk_text[:400])
+                                write("\n[... truncated]")
                             else:
-                                display_text = chunk_text
-                            
-                            print(f"\n{i}. " + "="*60)
-                            print(display_text)
-                            print("="*60)
+                                write(chunk_text)
+                            write("\n" + "="*60 + "\n")
                     else:
                         print("❌ No detailed chunks available")
                 
@@ -498,9 +852,7 @@ class InteractiveFinDocGPT:
             return
         
         print(f"📊 Validating {len(insights)} insights against {len(validation_documents)} documents...")
-        print("⚠️  This will use OpenAI API calls with FULL document content (no truncation)")
-        print("⚠️  Processing may take 60-120 seconds per insight due to large document size")
-        print("⚠️  Cost will be higher due to processing complete SEC filings")
+        print(f"⚠️  This will use OpenAI API calls with the {VALIDATION_TOP_K} most relevant document excerpts per insight")
         
         # Show document sources
         current_docs = sum(1 for d in validation_documents if d['source'] == 'current_session')
@@ -509,102 +861,110 @@ class InteractiveFinDocGPT:
         
         # Confirm validation
         confirm = input("\n🤖 Proceed with LLM validation? (y/n): ").strip().lower()
-        if confirm not in ['y', 'yes']:
+        if confirm not in YES_ANSWERS:
             print("❌ Validation cancelled")
             return
         
         validation_results = []
         
+        # Chunk and index the corpus once; each insight then only ranks chunks
+        chunk_index = self._build_validation_chunk_index(validation_documents)
+        for doc, chunk_count in zip(validation_documents, chunk_index['chunks_per_document']):
+            source_indicator = "📄" if doc['source'] == 'current_session' else "📚"
+            has_full = "✅" if doc.get('has_full_content', True) else "⚠️ "
+            print(f"  {source_indicator} {has_full} Indexed {chunk_count} chunks from {len(doc['raw_content']):,} characters ({doc['source']})")
+        
+        # Prepare every validation first (interactive prompts stay sequential)
+        validation_jobs = []
         for i, insight in enumerate(insights[:2], 1):  # Limit to first 2 insights to save costs
-            print(f"\n🔍 Validating insight {i}/{min(len(insights), 2)}...")
+            print(f"\n🔍 Preparing insight {i}/{min(len(insights), 2)}...")
             print(f"💡 Insight: {str(insight)[:100]}...")
             
-            # Use ALL available documents for the company - no token limits or truncation
-            combined_content = ""
+            # Send only the top-ranked excerpts, with citation markers
+            top_chunks = self._rank_validation_chunks(chunk_index, f"{query} {insight}")
+            parts = []
             relevant_docs = []
-            
-            for doc in validation_documents:
-                doc_header = f"\n--- {doc['metadata']['form_type']} - {doc['metadata']['company_name']} ({doc['metadata']['filing_date']}) ---\n"
-                
-                # Use the COMPLETE raw document content - no truncation
-                full_doc_content = str(doc['raw_content'])
-                
-                combined_content += doc_header + full_doc_content + "\n\n"
-                relevant_docs.append(doc['metadata'])
-                
-                # Log the full size for transparency
-                source_indicator = "📄" if doc['source'] == 'current_session' else "📚"
-                has_full = "✅" if doc.get('has_full_content', True) else "⚠️ "
-                print(f"  {source_indicator} {has_full} Added complete document: {len(full_doc_content):,} characters ({doc['source']})")
-            
-            print(f"📄 Using content from {len(relevant_docs)} documents ({len(combined_content):,} characters)")
+            for marker, chunk in enumerate(top_chunks, 1):
+                metadata = chunk['metadata']
+                item = f" Item {chunk['item']}" if chunk.get('item') else ""
+                parts.append(f"\n[{marker}] {metadata['form_type']} - {metadata['company_name']} ({metadata['filing_date']}){item}\n")
+                parts.append(chunk['text'])
+                parts.append("\n")
+                if metadata not in relevant_docs:
+                    relevant_docs.append(metadata)
+            combined_content = "".join(parts)
+            
+            print(f"📄 Using {len(top_chunks)} excerpts from {len(relevant_docs)} documents ({len(combined_content):,} characters)")
             
             # Optional: Show preview of content being sent for validation
             show_content_preview = input("🔍 Show preview of content being sent for validation? (y/n): ").strip().lower()
-            if show_content_preview in ['y', 'yes']:
+            if show_content_preview in YES_ANSWERS:
                 print(f"\n📋 Content Preview (first 800 characters):")
                 print("-" * 60)
                 print(combined_content[:800] + "..." if len(combined_content) > 800 else combined_content)
                 print("-" * 60)
                 input("Press Enter to continue with validation...")
             
-            try:
-                # Perform validation
-                validation = self.cognee_service.validate_insight_with_llm(
-                    insight=str(insight),
-                    query=query,
-                    raw_document_content=combined_content,
-                    document_metadata={'documents': relevant_docs}
-                )
+            validation_jobs.append({
+                'insight': str(insight),
+                'query': query,
+                'raw_document_content': combined_content,
+                'document_metadata': {'documents': relevant_docs}
+            })
+        
+        # LLM validations are independent, so run them concurrently
+        print(f"\n🔄 Running {len(validation_jobs)} validations concurrently...")
+        validations = asyncio.run(self._run_validations(validation_jobs))
+        
+        for i, (job, validation) in enumerate(zip(validation_jobs, validations), 1):
+            print(f"\n🔍 Insight {i}/{len(validations)}:")
+            if isinstance(validation, Exception):
+                print(f"❌ Error during validation: {str(validation)}")
+            elif validation.get('validation_available'):
+                print(f"✅ Validation completed!")
                 
-                if validation.get('validation_available'):
-                    print(f"✅ Validation completed!")
-                    
-                    # Display validation results
-                    accuracy = validation.get('accuracy_score', 'N/A')
-                    correctness = validation.get('correctness', 'Unknown')
-                    completeness = validation.get('completeness', 'Unknown')
-                    
-                    print(f"\n📊 Validation Results:")
-                    print(f"   🎯 Accuracy Score: {accuracy}/10")
-                    print(f"   ✅ Correctness: {correctness}")
-                    print(f"   📋 Completeness: {completeness}")
-                    
-                    # Show ALL issues without truncation
-                    issues = validation.get('issues', [])
-                    if issues:
-                        print(f"\n⚠️  Issues Identified ({len(issues)}):")
-                        for issue in issues:  # Show ALL issues
-                            print(f"   • {issue}")
-                    
-                    # Show ALL supporting evidence without truncation
-                    evidence = validation.get('supporting_evidence', [])
-                    if evidence:
-                        print(f"\n📝 Supporting Evidence:")
-                        for ev in evidence:  # Show ALL evidence
-                            print(f"   • {ev}")
-                    
-                    # Show FULL improved insight if available
-                    improved = validation.get('improved_insight')
-                    if improved and improved != str(insight):
-                        print(f"\n💡 Improved Insight (FULL):")
-                        print(f"   {improved}")  # Show complete improved insight
-                    
-                    # Show FULL explanation
-                    explanation = validation.get('explanation', '')
-                    if explanation:
-                        print(f"\n📖 Explanation (FULL): {explanation}")
-                    
-                    validation_results.append(validation)
-                    
-                else:
-                    print(f"❌ Validation failed: {validation.get('error', 'Unknown error')}")
-            
-            except Exception as e:
-                print(f"❌ Error during validation: {str(e)}")
+                # Display validation results
+                accuracy = validation.get('accuracy_score', 'N/A')
+                correctness = validation.get('correctness', 'Unknown')
+                completeness = validation.get('completeness', 'Unknown')
+                
+                print(f"\n📊 Validation Results:")
+                print(f"   🎯 Accuracy Score: {accuracy}/10")
+                print(f"   ✅ Correctness: {correctness}")
+                print(f"   📋 Completeness: {completeness}")
+                
+                # Show ALL issues without truncation
+                issues = validation.get('issues', [])
+                if issues:
+                    print(f"\n⚠️  Issues Identified ({len(issues)}):")
+                    for issue in issues:  # Show ALL issues
+                        print(f"   • {issue}")
+                
+                # Show ALL supporting evidence without truncation
+                evidence = validation.get('supporting_evidence', [])
+                if evidence:
+                    print(f"\n📝 Supporting Evidence:")
+                    for ev in evidence:  # Show ALL evidence
+                        print(f"   • {ev}")
+                
+                # Show FULL improved insight if available
+                improved = validation.get('improved_insight')
+                if improved and improved != job['insight']:
+                    print(f"\n💡 Improved Insight (FULL):")
+                    print(f"   {improved}")  # Show complete improved insight
+                
+                # Show FULL explanation
+                explanation = validation.get('explanation', '')
+                if explanation:
+                    print(f"\n📖 Explanation (FULL): {explanation}")
+                
+                validation_results.append(validation)
+                
+            else:
+                print(f"❌ Validation failed: {validation.get('error', 'Unknown error')}")
             
             # Pause between validations
-            if i < min(len(insights), 2):
+            if i < len(validations):
                 print("\n" + "-" * 40)
         
         # Summary
@@ -616,98 +976,349 @@ class InteractiveFinDocGPT:
             correct_count = sum(1 for v in validation_results if v.get('correctness') == 'Yes')
             print(f"   ✅ Fully Correct: {correct_count}/{len(validation_results)} insights")
             
-            print(f"\n💰 Estimated API Cost: ~${len(validation_results) * 0.10:.2f} (approximate - higher due to full document processing)")
+            print(f"\n💰 Estimated API Cost: ~${len(validation_results) * 0.02:.2f} (approximate - top {VALIDATION_TOP_K} excerpts per insight)")
+            prompt_tokens = sum(v.get('prompt_tokens', 0) for v in validation_results)
+            if prompt_tokens:
+                cached_tokens = sum(v.get('cached_prompt_tokens', 0) for v in validation_results)
+                print(f"   🗄️  Prompt tokens: {prompt_tokens:,} ({cached_tokens:,} served from prompt cache)")
         
         print("\n" + "="*60)
     
+    async def _run_validations(self, jobs: List[Dict[str, Any]]) -> List[Any]:
+        """Run validate_insight_with_llm for each job concurrently, in job order (exceptions are returned)"""
+        semaphore = asyncio.Semaphore(VALIDATION_CONCURRENCY)
+        
+        async def validate_one(job):
+            async with semaphore:
+                return await asyncio.to_thread(self.cognee_service.validate_insight_with_llm, **job)
+        
+        return await asyncio.gather(*(validate_one(job) for job in jobs), return_exceptions=True)
+    
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        return re.findall(r"[a-z0-9]+", text.lower())
+    
+    @staticmethod
+    def _split_filing_sections(text: str) -> List[tuple]:
+        """Split filing text at SEC item headings ("Item 1A.", "ITEM 7") into (item, text) sections"""
+        headings = list(SEC_ITEM_HEADING.finditer(text))
+        if not headings:
+            return [(None, text)]
+        
+        sections = []
+        if headings[0].start() > 0:
+            sections.append((None, text[:headings[0].start()]))  # Cover page / table of contents
+        for heading, next_heading in zip(headings, headings[1:] + [None]):
+            end = next_heading.start() if next_heading else len(text)
+            sections.append((heading.group(1).upper(), text[heading.start():end]))
+        return sections
+    
+    @staticmethod
+    def _sentence_units(section: str) -> List[List[str]]:
+        """Sentences of a section as word lists, with overlong runs (tables) cut to chunk size"""
+        units = []
+        for sentence in SENTENCE_BOUNDARY.split(section):
+            words = sentence.split()
+            for start in range(0, len(words), VALIDATION_CHUNK_WORDS):
+                units.append(words[start:start + VALIDATION_CHUNK_WORDS])
+        return units
+    
+    @staticmethod
+    def _document_key(doc: Dict[str, Any]) -> Tuple[Any, int]:
+        """Cache key for per-document derived data: (accession number, content length)"""
+        return (doc['metadata'].get('accession_number'), len(doc['raw_content']))
+    
+    def _get_lower_content(self, doc: Dict[str, Any]) -> str:
+        """Return the document's lowercased text, computed once per document"""
+        key = self._document_key(doc)
+        content_lower = self._lower_contents.get(key)
+        if content_lower is None:
+            content_lower = str(doc['raw_content']).lower()
+            self._lower_contents[key] = content_lower
+        return content_lower
+    
+    def _chunk_document(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Split one document into chunks with term counts, computed once per document
+        
+        Chunks never cross an SEC item boundary; within an item they are packed from whole
+        sentences up to VALIDATION_CHUNK_WORDS, overlapping by about VALIDATION_CHUNK_OVERLAP words.
+        """
+        key = self._document_key(doc)
+        if key in self._document_chunks:
+            return self._document_chunks[key]
+        
+        chunks = []
+        
+        def emit(item, units):
+            text = " ".join(word for unit in units for word in unit)
+            term_counts = {}
+            for term in self._tokenize(text):
+                term_counts[term] = term_counts.get(term, 0) + 1
+            chunks.append({
+                'metadata': doc['metadata'],
+                'item': item,
+                'text': text,
+                'term_counts': term_counts,
+                'length': sum(term_counts.values())
+            })
+        
+        for item, section in self._split_filing_sections(str(doc['raw_content'])):
+            current, current_words = [], 0
+            for unit in self._sentence_units(section):
+                if current and current_words + len(unit) > VALIDATION_CHUNK_WORDS:
+                    emit(item, current)
+                    # Carry trailing sentences (up to the overlap budget) into the next chunk
+                    overlap, overlap_words = [], 0
+                    for previous in reversed(current):
+                        if overlap_words + len(previous) > VALIDATION_CHUNK_OVERLAP:
+                            break
+                        overlap.insert(0, previous)
+                        overlap_words += len(previous)
+                    current, current_words = overlap, overlap_words
+                current.append(unit)
+                current_words += len(unit)
+            if current_words:
+                emit(item, current)
+        
+        self._document_chunks[key] = chunks
+        return chunks
+    
+    def _build_validation_chunk_index(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Collect BM25 statistics over the cached chunks of the selected documents"""
+        chunks = []
+        chunks_per_document = []
+        document_frequency = {}
+        
+        for doc in documents:
+            doc_chunks = self._chunk_document(doc)
+            for chunk in doc_chunks:
+                for term in chunk['term_counts']:
+                    document_frequency[term] = document_frequency.get(term, 0) + 1
+            chunks.extend(doc_chunks)
+            chunks_per_document.append(len(doc_chunks))
+        
+        return {
+            'chunks': chunks,
+            'chunks_per_document': chunks_per_document,
+            'document_frequency': document_frequency,
+            'average_length': (sum(c['length'] for c in chunks) / len(chunks)) if chunks else 0
+        }
+    
+    def _rank_validation_chunks(self, chunk_index: Dict[str, Any], query_text: str) -> List[Dict[str, Any]]:
+        """
+        Rank chunks for a validation query: BM25 picks candidates, then embeddings (when
+        available) rerank them with a weighted blend of cosine similarity and normalized BM25
+        """
+        chunks = chunk_index['chunks']
+        if not chunks:
+            return []
+        
+        k1, b = 1.5, 0.75
+        total = len(chunks)
+        average_length = chunk_index['average_length'] or 1
+        query_terms = set(self._tokenize(query_text))
+        idf = {}
+        for term in query_terms:
+            df = chunk_index['document_frequency'].get(term, 0)
+            idf[term] = math.log(1 + (total - df + 0.5) / (df + 0.5))
+        
+        bm25_scores = []
+        for position, chunk in enumerate(chunks):
+            term_counts = chunk['term_counts']
+            norm = k1 * (1 - b + b * chunk['length'] / average_length)
+            score = 0.0
+            for term in query_terms:
+                tf = term_counts.get(term)
+                if tf:
+                    score += idf[term] * tf * (k1 + 1) / (tf + norm)
+            bm25_scores.append((score, position))
+        
+        candidates = sorted(bm25_scores, reverse=True)[:VALIDATION_RERANK_CANDIDATES]
+        best_bm25 = candidates[0][0] or 1.0
+        
+        vectors = self.cognee_service.warm_embeddings([query_text] + [chunks[p]['text'] for _, p in candidates])
+        if len(vectors) == len(candidates) + 1:
+            query_vector = vectors[0]
+            query_norm = math.sqrt(sum(v * v for v in query_vector)) or 1.0
+            blended = []
+            for (score, position), vector in zip(candidates, vectors[1:]):
+                vector_norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+                cosine = sum(q * v for q, v in zip(query_vector, vector)) / (query_norm * vector_norm)
+                blended.append((
+                    VALIDATION_DENSE_WEIGHT * cosine + (1 - VALIDATION_DENSE_WEIGHT) * score / best_bm25,
+                    position
+                ))
+            candidates = sorted(blended, reverse=True)
+        
+        return [chunks[position] for _, position in candidates[:VALIDATION_TOP_K]]
+    
+    def _session_validation_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Validation entry for a document stored in this session (these should have full content)"""
+        metadata = doc['metadata']
+        raw_content = doc.get('raw_content', '')
+        print(f"📄 Current session doc: {metadata.get('company_name')} - {len(raw_content):,} chars")
+        return {
+            'metadata': metadata,
+            'raw_content': raw_content,
+            'source': 'current_session',
+            'content_size': doc.get('content_size', len(raw_content)),
+            'has_full_content': True
+        }
+    
+    def _registry_validation_document(self, doc_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Validation entry for a registry document, preferring its full content over the preview"""
+        metadata = doc_info['metadata']
+        
+        # Check what content is available in registry
+        has_full_content = 'full_content' in doc_info
+        full_content = doc_info.get('full_content', '')
+        content_preview = doc_info.get('content_preview', '')
+        full_length = len(full_content)
+        preview_length = len(content_preview)
+        
+        # Debug logging
+        print(f"📚 Registry doc: {metadata.get('company_name', 'Unknown')}")
+        print(f"    Has full_content: {has_full_content}")
+        print(f"    Full content length: {full_length:,} chars")
+        print(f"    Preview length: {preview_length:,} chars")
+        
+        # Use full content if available, otherwise warn and use preview
+        use_full_content = has_full_content and full_length > preview_length
+        if use_full_content:
+            raw_content = full_content
+            print(f"    ✅ Using full content ({full_length:,} chars)")
+        else:
+            raw_content = content_preview
+            print(f"    ⚠️  WARNING: Using content preview only ({preview_length:,} chars)")
+            print(f"    ⚠️  Full document content not available - validation may be incomplete")
+        
+        return {
+            'metadata': metadata,
+            'raw_content': raw_content,
+            'source': 'registry',
+            'content_size': doc_info.get('content_length', 0),
+            'has_full_content': use_full_content
+        }
+    
     def _get_all_available_documents_for_validation(self) -> List[Dict[str, Any]]:
         """Get all available documents from current session + registry for validation"""
-        all_documents = []
+        # Reuse the previous result until session documents are added or the registry changes
+        cache_key = (len(self.stored_documents), self.cognee_service.registry_version())
+        if self._validation_docs_cache_key == cache_key:
+            print(f"📚 Using {len(self._validation_docs_cache)} previously prepared validation documents")
+            return self._validation_docs_cache
         
-        # Add current session documents (these should have full content)
         current_session_docs = [d for d in self.stored_documents if not d.get('is_from_previous_session')]
-        for doc in current_session_docs:
-            raw_content = doc.get('raw_content', '')
-            print(f"📄 Current session doc: {doc['metadata'].get('company_name')} - {len(raw_content):,} chars")
-            all_documents.append({
-                'metadata': doc['metadata'],
-                'raw_content': raw_content,
-                'source': 'current_session',
-                'content_size': doc.get('content_size', len(raw_content)),
-                'has_full_content': True
-            })
+        all_documents = [self._session_validation_document(doc) for doc in current_session_docs]
         
-        # Add documents from registry
+        # Add documents from registry, skipping those we already have from the current session
         try:
             registry = self.cognee_service._document_registry
-            
-            for fingerprint, doc_info in registry.items():
-                # Skip if we already have this document from current session
-                accession = doc_info['metadata'].get('accession_number', '')
-                already_have = any(
-                    d['metadata'].get('accession_number') == accession 
-                    for d in current_session_docs 
-                    if accession
-                )
-                
-                if not already_have:
-                    # Check what content is available in registry
-                    has_full_content = 'full_content' in doc_info
-                    full_content = doc_info.get('full_content', '')
-                    content_preview = doc_info.get('content_preview', '')
-                    
-                    # Debug logging
-                    company = doc_info['metadata'].get('company_name', 'Unknown')
-                    print(f"📚 Registry doc: {company}")
-                    print(f"    Has full_content: {has_full_content}")
-                    print(f"    Full content length: {len(full_content):,} chars")
-                    print(f"    Preview length: {len(content_preview):,} chars")
-                    
-                    # Use full content if available, otherwise warn and use preview
-                    if has_full_content and len(full_content) > len(content_preview):
-                        raw_content = full_content
-                        print(f"    ✅ Using full content ({len(raw_content):,} chars)")
-                    else:
-                        raw_content = content_preview
-                        print(f"    ⚠️  WARNING: Using content preview only ({len(raw_content):,} chars)")
-                        print(f"    ⚠️  Full document content not available - validation may be incomplete")
-                    
-                    all_documents.append({
-                        'metadata': doc_info['metadata'],
-                        'raw_content': raw_content,
-                        'source': 'registry',
-                        'content_size': doc_info.get('content_length', 0),
-                        'has_full_content': has_full_content and len(full_content) > len(content_preview)
-                    })
+            for fingerprint in self._registry_fingerprints_outside_session():
+                all_documents.append(self._registry_validation_document(registry[fingerprint]))
         
         except Exception as e:
             print(f"⚠️  Error accessing registry for validation: {str(e)}")
+            return all_documents
         
+        self._validation_docs_cache = all_documents
+        self._validation_docs_cache_key = cache_key
         return all_documents
     
+    def _registry_fingerprints_outside_session(self) -> List[str]:
+        """Registry fingerprints whose accession number no current-session document already covers"""
+        session_accessions = {
+            d['metadata'].get('accession_number')
+            for d in self.stored_documents if not d.get('is_from_previous_session')
+        }
+        session_accessions -= {None, ''}
+        
+        # Registry column view: no per-entry metadata dict lookups for the accession check
+        columns = self.cognee_service._get_registry_columns()
+        return [
+            fingerprint
+            for fingerprint, accession in zip(columns['fingerprints'], columns['accession_numbers'])
+            if accession not in session_accessions
+        ]
+    
+    def _get_company_index(self) -> Dict[str, List[tuple]]:
+        """
+        Company/ticker -> document inverted index over session and registry documents
+        
+        Entries are ('session', position in stored_documents) or ('registry', fingerprint).
+        The index is rebuilt only when session documents are added or the registry changes.
+        """
+        cache_key = (len(self.stored_documents), self.cognee_service.registry_version())
+        if self._company_index is not None and self._company_index_key == cache_key:
+            return self._company_index
+        
+        company_key = self.cognee_service.company_key
+        index = defaultdict(list)
+        for position, doc in enumerate(self.stored_documents):
+            if doc.get('is_from_previous_session'):
+                continue
+            metadata = doc['metadata']
+            for name in {company_key(metadata.get('company_name', '')), company_key(metadata.get('ticker', ''))}:
+                if name:
+                    index[name].append(('session', position))
+        
+        # Registry documents come from the service's company index, minus those the session covers
+        outside_session = set(self._registry_fingerprints_outside_session())
+        for name, fingerprints in self.cognee_service.get_company_index().items():
+            entries = [('registry', fingerprint) for fingerprint in fingerprints if fingerprint in outside_session]
+            if entries:
+                index[name].extend(entries)
+        
+        self._company_index = index
+        self._company_index_key = cache_key
+        return index
+    
     def _get_company_documents_for_validation(self, company_name: str) -> List[Dict[str, Any]]:
         """Get all documents for a specific company for validation"""
-        all_documents = self._get_all_available_documents_for_validation()
-        
         if not company_name:
-            return all_documents
+            return self._get_all_available_documents_for_validation()
         
-        # Filter documents for the specific company
-        company_documents = []
-        company_lower = company_name.lower()
+        index = self._get_company_index()
+        company_key = self.cognee_service.company_key(company_name)
+        
+        # Exact key first; otherwise fall back to containment against the (few) indexed names
+        entries = index.get(company_key)
+        if entries is None and company_key:
+            entries = []
+            for name, name_entries in index.items():
+                if company_key in name or name in company_key:
+                    entries.extend(name_entries)
         
-        for doc in all_documents:
-            doc_company = doc['metadata'].get('company_name', '').lower()
-            if company_lower in doc_company or doc_company in company_lower:
-                company_documents.append(doc)
+        if not entries:
+            return self._get_all_available_documents_for_validation()
         
-        return company_documents if company_documents else all_documents
+        # The same document can be indexed under its name and its ticker
+        company_documents = []
+        registry = self.cognee_service._document_registry
+        for source, key in dict.fromkeys(entries):
+            if source == 'session':
+                company_documents.append(self._session_validation_document(self.stored_documents[key]))
+            elif key in registry:
+                company_documents.append(self._registry_validation_document(registry[key]))
+        
+        return company_documents
     
-    def _extract_financial_sections(self, document_content: str, query: str, insight: str) -> str:
-        """Extract relevant financial sections from SEC document for validation"""
+    def _extract_financial_sections(self, document_content: str, query: str, insight: str,
+                                    content_lower: Optional[str] = None) -> str:
+        """
+        Extract relevant financial sections from SEC document for validation
+        
+        Args:
+            document_content: Full document text
+            query: The validation query
+            insight: The insight being validated
+            content_lower: Lowercased document text, if the caller already has it
+                (see _get_lower_content) so repeated calls skip the copy
+        """
+        # Bind the text once; only non-str inputs (e.g. spilled content) need converting
+        content = document_content if isinstance(document_content, str) else str(document_content)
         try:
-            # Convert to string and get reasonable length
-            content = str(document_content)
             max_content_length = 12000  # Conservative limit for validation
             
             # Keywords to look for based on common financial queries
@@ -726,100 +1337,98 @@ class InteractiveFinDocGPT:
             insight_words = str(insight).lower().split() if insight else []
             search_terms = set(query_words + insight_words + financial_keywords)
             
-            # Try to find financial statement sections
-            sections_to_find = [
-                'CONSOLIDATED STATEMENTS OF OPERATIONS',
-                'CONSOLIDATED STATEMENTS OF COMPREHENSIVE INCOME',
-                'CONSOLIDATED BALANCE SHEETS',
-                'CONSOLIDATED STATEMENTS OF CASH FLOWS',
-                'RESULTS OF OPERATIONS',
-                'FINANCIAL CONDITION',
-                'LIQUIDITY AND CAPITAL RESOURCES'
-            ]
+            if content_lower is None:
+                content_lower = content.lower()
             
-            extracted_sections = []
-            content_lower = content.lower()
+            # Find the first occurrence of every financial statement section in one pass
+            section_positions = {}
+            for match in FINANCIAL_SECTION_HEADING.finditer(content_lower):
+                section_positions.setdefault(match.group(0), match.start())
+                if len(section_positions) == len(FINANCIAL_SECTIONS):
+                    break
             
-            # Look for specific financial sections
-            for section in sections_to_find:
-                section_lower = section.lower()
-                start_pos = content_lower.find(section_lower)
+            # Look for specific financial sections, tracked as (header, start, end) offsets into content
+            section_spans = []
+            for section in FINANCIAL_SECTIONS:
+                start_pos = section_positions.get(section.lower(), -1)
                 
                 if start_pos != -1:
                     # Extract section content (up to next major section or reasonable limit)
                     section_start = max(0, start_pos - 100)  # Include some context before
                     section_end = min(len(content), start_pos + 3000)  # Get substantial content
                     
-                    # Try to find natural end of section
-                    section_content = content[section_start:section_end]
-                    
-                    # Look for next major section as natural boundary
-                    next_section_patterns = [
-                        r'\n[A-Z][A-Z\s]+\n',  # All caps section headers
-                        r'\nITEM \d+',  # SEC item headers
-                        r'\nPART [IVX]+',  # SEC part headers
-                    ]
-                    
-                    import re
-                    for pattern in next_section_patterns:
-                        match = re.search(pattern, section_content[500:])  # Skip first 500 chars
-                        if match:
-                            natural_end = 500 + match.start()
-                            section_content = section_content[:natural_end]
-                            break
+                    # Look for next major section as natural boundary (skip first 500 chars)
+                    match = SECTION_BOUNDARY.search(content, section_start + 500, section_end)
+                    if match:
+                        section_end = match.start()
                     
-                    extracted_sections.append(f"\n=== {section} ===\n{section_content}")
+                    section_spans.append((f"\n=== {section} ===\n", section_start, section_end))
             
             # If we found financial sections, use them
-            if extracted_sections:
-                combined_sections = '\n'.join(extracted_sections)
-                if len(combined_sections) <= max_content_length:
-                    return combined_sections
+            if section_spans:
+                def pieces():
+                    for i, (header, start, end) in enumerate(section_spans):
+                        if i:
+                            yield '\n'
+                        yield header
+                        yield content[start:end]
+                
+                combined_length = sum(len(header) + end - start for header, start, end in section_spans) + len(section_spans) - 1
+                if combined_length <= max_content_length:
+                    return ''.join(pieces())
                 else:
-                    # Truncate but try to keep complete sections
-                    return combined_sections[:max_content_length] + "\n\n[Additional sections truncated for length]"
+                    # Truncate but try to keep complete sections; only the kept text is copied
+                    parts = []
+                    budget = max_content_length
+                    for piece in pieces():
+                        if len(piece) >= budget:
+                            parts.append(piece[:budget])
+                            break
+                        parts.append(piece)
+                        budget -= len(piece)
+                    return ''.join(parts) + "\n\n[Additional sections truncated for length]"
             
             # Fallback: Look for content with high concentration of financial terms
-            chunks = [content[i:i+2000] for i in range(0, len(content), 1500)]  # Overlapping chunks
-            scored_chunks = []
+            # One alternation regex finds every search term present in a chunk in a single scan
+            term_pattern = re.compile("|".join(re.escape(term) for term in sorted(search_terms, key=len, reverse=True)))
             
-            for i, chunk in enumerate(chunks):
-                chunk_lower = chunk.lower()
-                score = sum(1 for term in search_terms if term in chunk_lower)
+            def score_chunk(offset):
+                score = len(set(term_pattern.findall(content_lower, offset, offset + 2000)))
                 
                 # Bonus for chunks with numbers (likely financial data)
-                import re
-                number_matches = len(re.findall(r'\$[\d,]+|\d+\.\d+%|\d{4}', chunk))
+                number_matches = sum(1 for _ in FINANCIAL_FIGURE.finditer(content, offset, offset + 2000))
                 score += number_matches * 2
-                
-                scored_chunks.append((score, i, chunk))
+                return score
             
-            # Sort by score and take the best chunks
-            scored_chunks.sort(reverse=True, key=lambda x: x[0])
+            # Score overlapping 2000-char windows and keep only the best three offsets
+            best_offsets = heapq.nlargest(3, range(0, len(content), 1500), key=score_chunk)
             
-            best_content = ""
-            for score, _, chunk in scored_chunks[:3]:  # Take top 3 chunks
-                if len(best_content) + len(chunk) <= max_content_length:
-                    best_content += chunk + "\n\n"
+            parts = []
+            best_length = 0
+            for chunk in (content[offset:offset + 2000] for offset in best_offsets):  # Take top 3 chunks
+                if best_length + len(chunk) <= max_content_length:
+                    parts.append(chunk + "\n\n")
+                    best_length += len(chunk) + 2
                 else:
-                    remaining_space = max_content_length - len(best_content)
+                    remaining_space = max_content_length - best_length
                     if remaining_space > 500:  # Only add if substantial space remains
-                        best_content += chunk[:remaining_space] + "\n[Truncated]"
+                        parts.append(chunk[:remaining_space] + "\n[Truncated]")
                     break
             
+            best_content = "".join(parts)
             return best_content if best_content else content[:max_content_length]
             
         except Exception as e:
             print(f"⚠️  Error extracting financial sections: {str(e)}")
             # Fallback to middle section of document (often contains financial data)
-            content_length = len(str(document_content))
+            content_length = len(content)
             if content_length > 16000:
                 # Skip first 8000 chars (cover page) and take middle section
                 start = 8000
                 end = min(content_length, start + 12000)
-                return str(document_content)[start:end]
+                return content[start:end]
             else:
-                return str(document_content)[:12000]
+                return content[:12000]
     
     def diagnose_rag_accuracy(self):
         """Comprehensive diagnosis of RAG accuracy issues"""
@@ -880,35 +1489,49 @@ class InteractiveFinDocGPT:
         """Manually search raw documents to find the correct answer"""
         try:
             query_lower = query.lower()
-            search_terms = ['revenue', 'sales', 'growth', 'increase', 'billion', 'million']
             
             for doc in self.stored_documents[:1]:  # Test first document
                 content = str(doc['raw_content'])
                 
-                # Find relevant sections manually
-                lines = content.split('\n')
-                relevant_lines = []
-                
-                for i, line in enumerate(lines):
-                    line_lower = line.lower()
-                    if any(term in line_lower for term in search_terms):
-                        # Include context lines
-                        start_idx = max(0, i-2)
-                        end_idx = min(len(lines), i+3)
-                        context = lines[start_idx:end_idx]
-                        relevant_lines.extend(context)
-                
-                if relevant_lines:
-                    print(f"✅ Found {len(relevant_lines)} potentially relevant lines in raw document:")
+                # Find relevant sections manually, streaming lines with a two-line lookbehind
+                # and deduplicating context lines as we go
+                relevant_count = 0
+                seen = set()
+                excerpts = []
+                previous = deque(maxlen=2)
+                recent_matches = deque(maxlen=2)  # Matches whose trailing context is still open
+                
+                for i, line in enumerate(content.splitlines()):
+                    # Each match includes two lines of context on either side
+                    trailing = sum(1 for match_idx in recent_matches if i - match_idx <= 2)
+                    relevant_count += trailing
+                    if MANUAL_SEARCH_TERM.search(line.lower()):
+                        relevant_count += len(previous) + 1
+                        recent_matches.append(i)
+                        context = (*previous, line)
+                    elif trailing:
+                        context = (line,)
+                    else:
+                        context = ()
+                    previous.append(line)
+                    
+                    for context_line in context:
+                        if context_line in seen:
+                            continue
+                        seen.add(context_line)
+                        # Show qualifying lines among the first 10 unique lines
+                        if len(seen) <= 10 and context_line.strip() and MANUAL_SEARCH_TERM.search(context_line.lower()):
+                            excerpts.append(context_line.strip())
+                
+                if relevant_count:
+                    print(f"✅ Found {relevant_count} potentially relevant lines in raw document:")
                     
                     # Show most relevant excerpts
-                    unique_lines = list(dict.fromkeys(relevant_lines))  # Remove duplicates
-                    for line in unique_lines[:10]:  # Show first 10 unique lines
-                        if line.strip() and any(term in line.lower() for term in search_terms):
-                            print(f"   📄 {line.strip()}")
+                    for line in excerpts:
+                        print(f"   📄 {line}")
                     
-                    if len(unique_lines) > 10:
-                        print(f"   ... and {len(unique_lines) - 10} more lines")
+                    if len(seen) > 10:
+                        print(f"   ... and {len(seen) - 10} more lines")
                 else:
                     print("❌ No relevant lines found with manual search")
                     print("💡 The query terms might not match the document content")
@@ -935,23 +1558,34 @@ class InteractiveFinDocGPT:
         
         best_results = []
         
-        for search_type, description in search_types:
-            try:
-                print(f"\n🔍 Testing {description} ({search_type}):")
-                
-                # Test general search
-                print(f"   📋 General Search:")
-                results = self.cognee_service.search_context(query, search_type)
-                self._analyze_search_results(results, "general", best_results, search_type)
-                
-                # Test company-specific search if company detected
-                if detected_company:
-                    print(f"   🏢 Company-Specific Search ({detected_company}):")
-                    company_results = self.cognee_service.search_context_by_company(query, detected_company, search_type)
-                    self._analyze_search_results(company_results, "company-specific", best_results, f"{search_type}_company")
+        # Run every search concurrently, then report in the usual order
+        with ThreadPoolExecutor(max_workers=DIAGNOSTIC_SEARCH_CONCURRENCY) as executor:
+            futures = [
+                (
+                    executor.submit(self.cognee_service.search_context, query, search_type),
+                    executor.submit(self.cognee_service.search_context_by_company, query, detected_company, search_type)
+                    if detected_company else None
+                )
+                for search_type, _ in search_types
+            ]
+            
+            for (search_type, description), (general_future, company_future) in zip(search_types, futures):
+                try:
+                    print(f"\n🔍 Testing {description} ({search_type}):")
                     
-            except Exception as e:
-                print(f"   ❌ Error: {str(e)}")
+                    # Test general search
+                    print(f"   📋 General Search:")
+                    results = general_future.result()
+                    self._analyze_search_results(results, "general", best_results, search_type)
+                    
+                    # Test company-specific search if company detected
+                    if company_future:
+                        print(f"   🏢 Company-Specific Search ({detected_company}):")
+                        company_results = company_future.result()
+                        self._analyze_search_results(company_results, "company-specific", best_results, f"{search_type}_company")
+                        
+                except Exception as e:
+                    print(f"   ❌ Error: {str(e)}")
     
     def _analyze_search_results(self, results, search_label, best_results, search_type):
         """Analyze and display search results quality"""
@@ -963,9 +1597,13 @@ class InteractiveFinDocGPT:
                 result_str = str(result)
                 
                 # Check for financial data patterns
-                import re
-                dollar_amounts = re.findall(r'\$[\d,]+(?:\.\d+)?', result_str)
-                percentages = re.findall(r'\d+(?:\.\d+)?%', result_str)
+                dollar_amounts = []
+                percentages = []
+                for match in FINANCIAL_AMOUNT.finditer(result_str):
+                    if match.lastgroup == 'dollar':
+                        dollar_amounts.append(match.group())
+                    else:
+                        percentages.append(match.group())
                 
                 quality_score = len(dollar_amounts) + len(percentages)
                 
@@ -991,6 +1629,45 @@ class InteractiveFinDocGPT:
             print(f"\n🏆 Best performing search type: {best_type}")
             print(f"   💡 Consider using this search type for better accuracy")
     
+    def _get_document_stats(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return financial-content statistics for a document, computed once per document
+        
+        Returns:
+            Dict with 'length', 'sections' (DIAGNOSTIC_SECTIONS present, in order),
+            'dollars' and 'percentages' (decimal percentages) counts
+        """
+        key = self._document_key(doc)
+        stats = self._document_stats.get(key)
+        if stats is not None:
+            return stats
+        
+        content = str(doc['raw_content'])
+        
+        # Financial statement sections in one scan, stopping once all are seen
+        found_groups = set()
+        for match in DIAGNOSTIC_SECTION_HEADING.finditer(self._get_lower_content(doc)):
+            found_groups.add(match.lastindex)
+            if len(found_groups) == len(DIAGNOSTIC_SECTIONS):
+                break
+        
+        # Dollar amounts and percentages, counted in one scan without materializing the matches
+        dollar_amounts = percentages = 0
+        for match in FINANCIAL_AMOUNT.finditer(content):
+            if match.lastgroup == 'dollar':
+                dollar_amounts += 1
+            elif match.group('decimal'):
+                percentages += 1
+        
+        stats = {
+            'length': len(content),
+            'sections': [section for i, section in enumerate(DIAGNOSTIC_SECTIONS, 1) if i in found_groups],
+            'dollars': dollar_amounts,
+            'percentages': percentages
+        }
+        self._document_stats[key] = stats
+        return stats
+    
     def _analyze_document_processing(self):
         """Analyze how well documents were processed by Cognee"""
         if not self.stored_documents:
@@ -998,26 +1675,15 @@ class InteractiveFinDocGPT:
             return
         
         doc = self.stored_documents[0]  # Analyze first document
-        content = str(doc['raw_content'])
+        stats = self._get_document_stats(doc)
         
         print(f"📊 Document Analysis:")
-        print(f"   📄 Original size: {len(content):,} characters")
+        print(f"   📄 Original size: {stats['length']:,} characters")
         print(f"   🏢 Company: {doc['metadata']['company_name']}")
         print(f"   📋 Form: {doc['metadata']['form_type']}")
         
         # Check for financial statement sections
-        financial_sections = [
-            'CONSOLIDATED STATEMENTS OF OPERATIONS',
-            'CONSOLIDATED BALANCE SHEETS', 
-            'RESULTS OF OPERATIONS',
-            'REVENUE',
-            'NET SALES'
-        ]
-        
-        found_sections = []
-        for section in financial_sections:
-            if section.lower() in content.lower():
-                found_sections.append(section)
+        found_sections = stats['sections']
         
         print(f"   💼 Financial sections found: {len(found_sections)}")
         for section in found_sections:
@@ -1028,14 +1694,13 @@ class InteractiveFinDocGPT:
             print("   💡 Document may not have been processed completely")
         
         # Check for data quality
-        import re
-        dollar_amounts = re.findall(r'\$[\d,]+', content)
-        percentages = re.findall(r'\d+\.\d+%', content)
+        dollar_amounts = stats['dollars']
+        percentages = stats['percentages']
         
-        print(f"   💰 Dollar amounts found: {len(dollar_amounts)}")
-        print(f"   📈 Percentages found: {len(percentages)}")
+        print(f"   💰 Dollar amounts found: {dollar_amounts}")
+        print(f"   📈 Percentages found: {percentages}")
         
-        if len(dollar_amounts) < 10:
+        if dollar_amounts < 10:
             print("   ⚠️  WARNING: Very few financial figures detected")
             print("   💡 Document content may be incomplete or poorly formatted")
     
@@ -1096,7 +1761,7 @@ class InteractiveFinDocGPT:
                 print(f"   📅 Date Range: {stats['date_range']['earliest']} to {stats['date_range']['latest']}")
             
             print(f"\n🏢 Companies in Registry:")
-            for company in sorted(stats['companies'])[:10]:  # Show first 10
+            for company in heapq.nsmallest(10, stats['companies']):  # Show first 10
                 print(f"   • {company}")
             if len(stats['companies']) > 10:
                 print(f"   ... and {len(stats['companies']) - 10} more")
@@ -1107,19 +1772,34 @@ class InteractiveFinDocGPT:
             
             # Show recent storage activity
             if stats['storage_dates']:
-                recent_dates = sorted(stats['storage_dates'])[-5:]  # Last 5
+                recent_dates = heapq.nlargest(5, stats['storage_dates'])  # Last 5
+                recent_dates.reverse()
                 print(f"\n🕒 Recent Storage Activity:")
                 for date in recent_dates:
                     print(f"   • {date}")
             
             # Offer detailed view
             show_details = input("\n🔍 Show detailed document list? (y/n): ").strip().lower()
-            if show_details in ['y', 'yes']:
+            if show_details in YES_ANSWERS:
                 self._show_detailed_registry()
                 
         except Exception as e:
             print(f"❌ Error viewing registry: {str(e)}")
     
+    @staticmethod
+    def _format_registry_entry(i: int, fingerprint: str, doc_info: Dict[str, Any]):
+        """Yield the display lines for one registry entry"""
+        metadata = doc_info['metadata']
+        yield f"\n{i}. {metadata.get('company_name', 'Unknown')} - {metadata.get('form_type', 'Unknown')}"
+        yield f"   📅 Filing Date: {metadata.get('filing_date', 'Unknown')}"
+        yield f"   🏢 Ticker: {metadata.get('ticker', 'N/A')}"
+        yield f"   📊 Content: {doc_info.get('content_length', 0):,} characters"
+        yield f"   🔐 Fingerprint: {fingerprint[:16]}..."
+        yield f"   🕒 Stored: {doc_info.get('stored_at', 'Unknown')}"
+        
+        if metadata.get('accession_number'):
+            yield f"   📋 Accession: {metadata['accession_number']}"
+    
     def _show_detailed_registry(self):
         """Show detailed document registry information"""
         try:
@@ -1129,27 +1809,14 @@ class InteractiveFinDocGPT:
             print(f"\n📄 Detailed Document Registry ({len(registry)} documents):")
             print("="*80)
             
-            # Sort by storage date
-            sorted_docs = sorted(
-                registry.items(), 
-                key=lambda x: x[1].get('stored_at', ''), 
-                reverse=True
-            )
+            # Most recently stored first; only the 20 shown entries are ever formatted
+            recent_docs = heapq.nlargest(20, registry.items(), key=lambda x: x[1].get('stored_at', ''))
             
-            for i, (fingerprint, doc_info) in enumerate(sorted_docs[:20], 1):  # Show first 20
-                metadata = doc_info['metadata']
-                print(f"\n{i}. {metadata.get('company_name', 'Unknown')} - {metadata.get('form_type', 'Unknown')}")
-                print(f"   📅 Filing Date: {metadata.get('filing_date', 'Unknown')}")
-                print(f"   🏢 Ticker: {metadata.get('ticker', 'N/A')}")
-                print(f"   📊 Content: {doc_info.get('content_length', 0):,} characters")
-                print(f"   🔐 Fingerprint: {fingerprint[:16]}...")
-                print(f"   🕒 Stored: {doc_info.get('stored_at', 'Unknown')}")
-                
-                if metadata.get('accession_number'):
-                    print(f"   📋 Accession: {metadata['accession_number']}")
+            for i, (fingerprint, doc_info) in enumerate(recent_docs, 1):
+                print("\n".join(self._format_registry_entry(i, fingerprint, doc_info)))
             
-            if len(sorted_docs) > 20:
-                print(f"\n... and {len(sorted_docs) - 20} more documents")
+            if len(registry) > 20:
+                print(f"\n... and {len(registry) - 20} more documents")
                 
         except Exception as e:
             print(f"❌ Error showing detailed registry: {str(e)}")
@@ -1177,14 +1844,19 @@ class InteractiveFinDocGPT:
             ("summaries", "Summaries")
         ]
         
-        for search_type, description in search_types:
+        # Run all search types concurrently; results are shown in order
+        executor = ThreadPoolExecutor(max_workers=DIAGNOSTIC_SEARCH_CONCURRENCY)
+        futures = [executor.submit(self.cognee_service.search_context, query, search_type) for search_type, _ in search_types]
+        executor.shutdown(wait=False)
+        
+        for (search_type, description), future in zip(search_types, futures):
             print(f"\n{'='*40}")
             print(f"🔍 {description}")
             print(f"Search Type: {search_type}")
             print('='*40)
             
             try:
-                results = self.cognee_service.search_context(query, search_type)
+                results = future.result()
                 
                 if results:
                     print(f"✅ Found {len(results)} results")
@@ -1207,9 +1879,9 @@ class InteractiveFinDocGPT:
                         else:
                             print("   ⚠️  May be object representation, not content")
                         
-                        # Try to show attributes if it's an object
-                        if hasattr(result, '__dict__'):
-                            attrs = [attr for attr in dir(result) if not attr.startswith('_')][:5]
+                        # Try to show attributes if it's an object (introspection only in verbose mode)
+                        if DIAGNOSTIC_VERBOSE and hasattr(result, '__dict__'):
+                            attrs = list(islice((attr for attr in dir(result) if not attr.startswith('_')), 5))
                             if attrs:
                                 print(f"   Attributes: {', '.join(attrs)}")
                 
@@ -1226,7 +1898,7 @@ class InteractiveFinDocGPT:
         
         # Offer to test with a known working example
         test_simple = input("\n🧪 Test with a simple document? (y/n): ").strip().lower()
-        if test_simple in ['y', 'yes']:
+        if test_simple in YES_ANSWERS:
             self._test_simple_document()
     
     def _test_simple_document(self):
@@ -1270,110 +1942,141 @@ class InteractiveFinDocGPT:
     
     def diagnose_validation_content_issues(self):
         """Diagnose content availability issues for LLM validation"""
-        print("\n" + "="*60)
-        print("🔬 Validation Content Diagnosis")
-        print("="*60)
-        
-        print("This tool helps diagnose why validation is only receiving truncated content.")
-        print("We'll check what content is available from different sources.\n")
-        
-        # Get all available documents
-        all_documents = self._get_all_available_documents_for_validation()
-        
-        if not all_documents:
-            print("❌ No documents available for validation")
-            print("💡 Use option 1 to fetch documents first")
-            return
-        
-        print(f"📊 Found {len(all_documents)} documents for validation:\n")
-        
-        issues_found = []
-        
-        for i, doc in enumerate(all_documents, 1):
-            metadata = doc['metadata']
-            raw_content = doc.get('raw_content', '')
-            source = doc.get('source', 'unknown')
-            has_full = doc.get('has_full_content', False)
-            
-            print(f"{i}. {metadata.get('company_name')} - {metadata.get('form_type')}")
-            print(f"   📅 Filing Date: {metadata.get('filing_date')}")
-            print(f"   🔗 Source: {source}")
-            print(f"   📊 Content Size: {len(raw_content):,} characters")
-            print(f"   ✅ Has Full Content: {has_full}")
-            
-            # Check for issues
-            if len(raw_content) < 10000:  # Less than 10KB is suspicious for SEC filings
-                issues_found.append(f"Document {i}: Very small content ({len(raw_content):,} chars)")
-                print(f"   ⚠️  WARNING: Content unusually small for SEC filing")
-            
-            if source == 'registry' and not has_full:
-                issues_found.append(f"Document {i}: Registry missing full content")
-                print(f"   ⚠️  WARNING: Registry doesn't have full content")
-            
-            # Show content preview
-            if raw_content:
-                preview = raw_content[:200].replace('\n', ' ').strip()
-                print(f"   📄 Preview: {preview}...")
-            else:
-                issues_found.append(f"Document {i}: No content available")
-                print(f"   ❌ No content available")
+        with buffered_stdout():
+            print("\n" + "="*60)
+            print("🔬 Validation Content Diagnosis")
+            print("="*60)
             
-            print()
-        
-        # Summary and recommendations
-        print("="*60)
-        print("📋 DIAGNOSIS SUMMARY")
-        print("="*60)
-        
-        if issues_found:
-            print(f"⚠️  Found {len(issues_found)} issues:")
-            for issue in issues_found:
-                print(f"   • {issue}")
+            print("This tool helps diagnose why validation is only receiving truncated content.")
+            print("We'll check what content is available from different sources.\n")
             
-            print(f"\n💡 RECOMMENDATIONS:")
+            # Get all available documents
+            all_documents = self._get_all_available_documents_for_validation()
             
-            registry_issues = [i for i in issues_found if 'registry' in i.lower()]
-            if registry_issues:
-                print("   🔄 Registry Issues:")
-                print("      • Try 'Complete Reset' (option 7) to clear corrupted registry")
-                print("      • Re-fetch documents using option 1")
-                print("      • Registry may have size limits causing content truncation")
+            if not all_documents:
+                print("❌ No documents available for validation")
+                print("💡 Use option 1 to fetch documents first")
+                return
             
-            small_content_issues = [i for i in issues_found if 'small' in i.lower()]
-            if small_content_issues:
-                print("   📄 Content Size Issues:")
-                print("      • Documents may not have been fetched completely")
-                print("      • Check internet connection and Edgar service status")
-                print("      • Re-fetch specific documents")
+            print(f"📊 Found {len(all_documents)} documents for validation:\n")
+            
+            # Content sizes up front (len() never reads spilled content) for the size distribution
+            lengths = [len(doc.get('raw_content', '')) for doc in all_documents]
+            sorted_lengths = sorted(lengths)
+            median_length = sorted_lengths[len(sorted_lengths) // 2]
+            p95_length = sorted_lengths[min(len(sorted_lengths) - 1, math.ceil(0.95 * len(sorted_lengths)) - 1)]
+            small_threshold = max(SMALL_CONTENT_CHARS, SMALL_CONTENT_MEDIAN_FRACTION * median_length)
+            
+            issues_found = []
+            # Summary counts gathered in the same pass as the per-document checks
+            size_buckets = [0] * len(CONTENT_SIZE_BUCKET_LABELS)
+            source_counts = Counter()
+            full_content_count = 0
+            total_chars = 0
+            registry_issue_count = 0
+            small_content_count = 0
+            
+            for i, (doc, content_length) in enumerate(zip(all_documents, lengths), 1):
+                metadata = doc['metadata']
+                raw_content = doc.get('raw_content', '')
+                source = doc.get('source', 'unknown')
+                has_full = doc.get('has_full_content', False)
+                
+                size_buckets[bisect.bisect_right(CONTENT_SIZE_BUCKETS, content_length)] += 1
+                source_counts[source] += 1
+                if has_full:
+                    full_content_count += 1
+                total_chars += content_length
+                
+                print(VALIDATION_DOC_STATUS.format_map({
+                    'i': i,
+                    'company': metadata.get('company_name'),
+                    'form': metadata.get('form_type'),
+                    'date': metadata.get('filing_date'),
+                    'source': source,
+                    'size': content_length,
+                    'has_full': has_full
+                }))
+                
+                # Check for issues
+                if content_length < small_threshold:  # Small for an SEC filing, or an outlier in this set
+                    issues_found.append(f"Document {i}: Very small content ({content_length:,} chars)")
+                    small_content_count += 1
+                    print(f"   ⚠️  WARNING: Content unusually small for SEC filing")
+                
+                if source == 'registry' and not has_full:
+                    issues_found.append(f"Document {i}: Registry missing full content")
+                    registry_issue_count += 1
+                    print(f"   ⚠️  WARNING: Registry doesn't have full content")
+                
+                # Show content preview
+                if raw_content:
+                    # Spilled session content is only decompressed as far as the preview needs
+                    head = raw_content.head(200) if isinstance(raw_content, LazyContent) else str(raw_content)[:200]
+                    preview = head.replace('\n', ' ').strip()
+                    print(f"   📄 Preview: {preview}...")
+                else:
+                    issues_found.append(f"Document {i}: No content available")
+                    print(f"   ❌ No content available")
+                
+                print()
             
-            print(f"\n🔧 IMMEDIATE ACTIONS:")
-            print("   1. Use current session documents for validation (these should have full content)")
-            print("   2. If using registry documents, consider re-fetching them")
-            print("   3. Check the CogneeService registry file size limits")
+            # Summary and recommendations
+            print("="*60)
+            print("📋 DIAGNOSIS SUMMARY")
+            print("="*60)
             
-        else:
-            print("✅ No content issues detected!")
-            print("💡 All documents appear to have adequate content for validation")
+            if issues_found:
+                print(f"⚠️  Found {len(issues_found)} issues:")
+                for issue in issues_found:
+                    print(f"   • {issue}")
+                
+                print(f"\n💡 RECOMMENDATIONS:")
+                
+                if registry_issue_count:
+                    print("   🔄 Registry Issues:")
+                    print("      • Try 'Complete Reset' (option 7) to clear corrupted registry")
+                    print("      • Re-fetch documents using option 1")
+                    print("      • Registry may have size limits causing content truncation")
+                
+                if small_content_count:
+                    print("   📄 Content Size Issues:")
+                    print("      • Documents may not have been fetched completely")
+                    print("      • Check internet connection and Edgar service status")
+                    print("      • Re-fetch specific documents")
+                
+                print(f"\n🔧 IMMEDIATE ACTIONS:")
+                print("   1. Use current session documents for validation (these should have full content)")
+                print("   2. If using registry documents, consider re-fetching them")
+                print("   3. Check the CogneeService registry file size limits")
+                
+            else:
+                print("✅ No content issues detected!")
+                print("💡 All documents appear to have adequate content for validation")
+                
+                # Check if validation is still failing
+                print(f"\n📊 Total content available: {total_chars:,} characters")
+                
+                if total_chars > 50000:  # Should be plenty for validation
+                    print("✅ Sufficient content available for LLM validation")
+                else:
+                    print("⚠️  Total content may be insufficient for comprehensive validation")
             
-            # Check if validation is still failing
-            total_chars = sum(len(doc.get('raw_content', '')) for doc in all_documents)
-            print(f"\n📊 Total content available: {total_chars:,} characters")
+            print(f"\n🔬 Technical Details:")
+            print(f"   • Current session docs: {source_counts['current_session']}")
+            print(f"   • Registry docs: {source_counts['registry']}")
+            print(f"   • Docs with full content: {full_content_count}")
+            print(f"   • Content size median / p95: {median_length:,} / {p95_length:,} characters")
+            print("   • Content size buckets: " + " | ".join(
+                f"{label}: {count}" for label, count in zip(CONTENT_SIZE_BUCKET_LABELS, size_buckets)
+            ))
             
-            if total_chars > 50000:  # Should be plenty for validation
-                print("✅ Sufficient content available for LLM validation")
-            else:
-                print("⚠️  Total content may be insufficient for comprehensive validation")
-        
-        print(f"\n🔬 Technical Details:")
-        print(f"   • Current session docs: {sum(1 for d in all_documents if d.get('source') == 'current_session')}")
-        print(f"   • Registry docs: {sum(1 for d in all_documents if d.get('source') == 'registry')}")
-        print(f"   • Docs with full content: {sum(1 for d in all_documents if d.get('has_full_content'))}")
-        
         # Offer to test validation with current content
         test_validation = input("\n🧪 Test validation with current content? (y/n): ").strip().lower()
-        if test_validation in ['y', 'yes']:
+        if test_validation in YES_ANSWERS:
             self._test_validation_content(all_documents)
     
+    @buffered_stdout()
     def _test_validation_content(self, documents):
         """Test what content would actually be sent to LLM validation"""
         print("\n🧪 Testing Validation Content...")
@@ -1382,24 +2085,40 @@ class InteractiveFinDocGPT:
             print("❌ No documents to test")
             return
         
-        # Simulate the validation content preparation
-        combined_content = ""
+        # Simulate the validation content preparation; only its length and the first
+        # 500 characters are shown, so the combined text is never materialized
+        combined_length = 0
+        preview_parts = []
+        preview_budget = 500
         for doc in documents[:2]:  # Test first 2 documents
-            doc_header = f"\n--- {doc['metadata']['form_type']} - {doc['metadata']['company_name']} ({doc['metadata']['filing_date']}) ---\n"
-            full_doc_content = str(doc['raw_content'])
-            combined_content += doc_header + full_doc_content + "\n\n"
-        
-        print(f"📊 Combined content length: {len(combined_content):,} characters")
+            metadata = doc['metadata']
+            raw_content = doc['raw_content']
+            header = f"\n--- {metadata['form_type']} - {metadata['company_name']} ({metadata['filing_date']}) ---\n"
+            combined_length += len(header) + len(raw_content) + 2
+            for part in (header, raw_content, "\n\n"):
+                if preview_budget <= 0:
+                    break
+                if isinstance(part, LazyContent):
+                    part = part.head(preview_budget)
+                elif not isinstance(part, str):
+                    part = str(part)
+                part = part[:preview_budget]
+                preview_parts.append(part)
+                preview_budget -= len(part)
+        preview = "".join(preview_parts)
+        
+        print(f"📊 Combined content length: {combined_length:,} characters")
         print(f"📄 Content preview (first 500 characters):")
         print("-" * 60)
-        print(combined_content[:500] + "..." if len(combined_content) > 500 else combined_content)
+        print(preview + "..." if combined_length > 500 else preview)
         print("-" * 60)
         
-        if len(combined_content) < 5000:
+        if combined_length < 5000:
             print("⚠️  WARNING: Content seems too short for meaningful validation")
         else:
             print("✅ Content length appears adequate for validation")
     
+    @buffered_stdout()
     def show_session_stats(self):
         """Display session statistics"""
         print("\n" + "="*50)
@@ -1437,6 +2156,10 @@ class InteractiveFinDocGPT:
             print(f"   Configuration: {'✅' if service_info['configured'] else '❌'}")
             print(f"   Cache Size: {service_info['cache_size']} items")
             
+            # On-demand check that the RAG store actually returns stored content
+            test_results = self.cognee_service.search_context("documents", "chunks")
+            print(f"   Stored Data: {len(test_results)} document chunks found" if test_results else "   Stored Data: none found")
+            
             print(f"\n🗂️ Database Providers:")
             for db_type, provider in service_info['providers'].items():
                 print(f"   {db_type}: {provider}")
@@ -1446,15 +2169,15 @@ class InteractiveFinDocGPT:
     
     def clear_cognee_data(self):
         """Clear Cognee data"""
+        self._wait_for_warmup()
         print("\n" + "="*50)
         print("🧹 Clear Cognee Data")
         print("="*50)
         
         print("⚠️  This will delete all stored documents and knowledge graphs from Cognee.")
-        confirm = self.get_user_input("Are you sure? This cannot be undone (y/n)", 
-                                    ["y", "n", "yes", "no"])
+        confirm = self.get_user_input("Are you sure? This cannot be undone (y/n)", YES_NO_CHOICES)
         
-        if confirm.lower() not in ["y", "yes"]:
+        if confirm.lower() not in YES_ANSWERS:
             print("❌ Operation cancelled.")
             return
         
@@ -1463,6 +2186,13 @@ class InteractiveFinDocGPT:
             if success:
                 print("✅ Cognee data cleared successfully")
                 self.stored_documents = []
+                self._search_cache.clear()
+                self._semantic_cache.clear()
+                self._document_chunks.clear()
+                self._lower_contents.clear()
+                self._document_stats.clear()
+                self._company_index = None
+                self._validation_docs_cache_key = None
                 # Reset relevant stats
                 self.session_stats['documents_stored'] = 0
             else:
@@ -1472,6 +2202,7 @@ class InteractiveFinDocGPT:
     
     def complete_reset(self):
         """Perform complete reset of Cognee system"""
+        self._wait_for_warmup()
         print("\n" + "="*50)
         print("🔄 Complete Cognee Reset")
         print("="*50)
@@ -1479,10 +2210,9 @@ class InteractiveFinDocGPT:
         print("⚠️  This will completely remove all Cognee data and databases.")
         print("⚠️  This fixes file reference issues and database corruption.")
         print("⚠️  All stored documents will be permanently deleted.")
-        confirm = self.get_user_input("Are you sure? This cannot be undone (y/n)", 
-                                    ["y", "n", "yes", "no"])
+        confirm = self.get_user_input("Are you sure? This cannot be undone (y/n)", YES_NO_CHOICES)
         
-        if confirm.lower() not in ["y", "yes"]:
+        if confirm.lower() not in YES_ANSWERS:
             print("❌ Operation cancelled.")
             return
         
@@ -1492,6 +2222,13 @@ class InteractiveFinDocGPT:
                 print("✅ Complete reset successful!")
                 print("✅ Cognee is now ready for fresh documents")
                 self.stored_documents = []
+                self._search_cache.clear()
+                self._semantic_cache.clear()
+                self._document_chunks.clear()
+                self._lower_contents.clear()
+                self._document_stats.clear()
+                self._company_index = None
+                self._validation_docs_cache_key = None
                 # Reset relevant stats
                 self.session_stats['documents_stored'] = 0
             else:
@@ -1501,67 +2238,22 @@ class InteractiveFinDocGPT:
     
     def show_help(self):
         """Display help information"""
-        print("\n" + "="*50)
-        print("❓ Help & Usage Guide")
-        print("="*50)
-        
-        print("\n🚀 Quick Start:")
-        print("1. Use option 1 to search and fetch SEC documents")
-        print("2. Wait for documents to be processed and stored")
-        print("3. Use option 3 to query your documents")
-        
-        print("\n💡 Tips:")
-        print("• Be specific with company names (e.g., 'Apple Inc' vs 'Apple')")
-        print("• 10-K reports contain the most comprehensive information")
-        print("• 10-Q reports are good for quarterly updates")
-        print("• Use natural language for queries")
-        
-        print("\n🔍 Example Queries:")
-        print("• 'What was the revenue last quarter?'")
-        print("• 'What are the main business segments?'")
-        print("• 'List the key risk factors'")
-        print("• 'How much cash does the company have?'")
-        
-        print("\n🔬 Validation Feature:")
-        print("• Validate RAG insights against raw documents using LLM")
-        print("• Get accuracy scores, correctness assessments, and improvements")
-        print("• Identify potential errors or omissions in AI-generated insights")
-        print("• Cost: ~$0.02 per insight validation")
-        
-        print("\n⚡ Performance:")
-        print("• First document processing: 15-45 seconds")
-        print("• Subsequent queries: 1-10 seconds (cached)")
-        print("• Insight validation: 30-60 seconds per insight")
-        print("• Larger documents take longer to process")
-        
-        print("\n🆘 Troubleshooting:")
-        print("• If processing fails, try with fewer documents")
-        print("• Check your internet connection for Edgar fetching")
-        print("• Ensure your OpenAI API key is set in .env")
+        sys.stdout.write(HELP_TEXT)
+        sys.stdout.flush()
     
     def run(self):
         """Main interactive loop"""
         self.print_banner()
         
-        # Quick service check
-        if not self.cognee_service.is_configured:
-            print("❌ Cognee service not properly configured!")
-            print("💡 Please check your .env file and ensure LLM_API_KEY is set.")
-            return
-        
-        print("✅ Services initialized successfully!")
-        
-        # Show existing document status
-        if self.stored_documents:
-            previous_count = sum(1 for d in self.stored_documents if d.get('is_from_previous_session'))
-            if previous_count > 0:
-                print(f"📚 Found {previous_count} documents from previous sessions - ready to query!")
-        
         while True:
             try:
                 self.print_menu()
-                choice = self.get_user_input("Select an option (1-13)", 
-                                           ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13"])
+                choice = self.get_user_input("Select an option (1-13)", MENU_CHOICES)
+                
+                # Session stats, help and exit don't need the services
+                if choice not in ("4", "12", "13") and not self._ensure_services():
+                    input("\n⏸️  Press Enter to continue...")
+                    continue
                 
                 if choice == "1":
                     self.search_and_fetch_documents()
@@ -17,6 +17,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
 from services.cognee_service import CogneeService
 
+# Summary LLM calls in flight at once (each is an I/O-bound 30-60s round-trip)
+SUMMARY_CONCURRENCY = 5
+
 async def add_summaries_to_existing_docs():
     """Add summaries to existing documents"""
     
@@ -42,14 +45,19 @@ async def add_summaries_to_existing_docs():
     docs_needing_summaries = []
     docs_with_summaries = 0
     
-    for fingerprint, doc_info in cognee_service._document_registry.items():
-        if 'summary' in doc_info and doc_info['summary']:
+    # Summary/full-content presence comes from the registry's column view, so entries
+    # that already have a summary are never touched
+    registry = cognee_service._document_registry
+    for (fingerprint, _), has_summary, has_full_content in zip(
+            cognee_service.iter_accession_numbers(),
+            cognee_service.has_summary_mask(),
+            cognee_service.has_full_content_mask()):
+        if has_summary:
             docs_with_summaries += 1
+        elif has_full_content:
+            docs_needing_summaries.append((fingerprint, registry[fingerprint]))
         else:
-            if 'full_content' in doc_info:
-                docs_needing_summaries.append((fingerprint, doc_info))
-            else:
-                print(f"⚠️  Document {fingerprint[:8]} has no full_content - skipping")
+            print(f"⚠️  Document {fingerprint[:8]} has no full_content - skipping")
     
     print(f"✅ Documents with summaries: {docs_with_summaries}")
     print(f"🔄 Documents needing summaries: {len(docs_needing_summaries)}")
@@ -58,29 +66,43 @@ async def add_summaries_to_existing_docs():
         print("🎉 All documents already have summaries!")
         return
     
-    # Process each document
+    # Generate summaries concurrently, a bounded number at a time
     successful = 0
     failed = 0
+    updated_fingerprints = []  # Registry entries to write back in one transaction
+    semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
     
-    for i, (fingerprint, doc_info) in enumerate(docs_needing_summaries, 1):
+    async def generate_summary(i, fingerprint, doc_info):
         metadata = doc_info.get('metadata', {})
-        company = metadata.get('company_name', 'Unknown')
-        form_type = metadata.get('form_type', 'Unknown')
-        content_length = doc_info.get('content_length', 0)
-        
-        print(f"\n📄 Processing {i}/{len(docs_needing_summaries)}: {company} {form_type}")
-        print(f"    ID: {fingerprint[:8]}")
-        print(f"    Size: {content_length:,} characters")
+        async with semaphore:
+            print(f"\n📄 Processing {i}/{len(docs_needing_summaries)}: "
+                  f"{metadata.get('company_name', 'Unknown')} {metadata.get('form_type', 'Unknown')}")
+            print(f"    ID: {fingerprint[:8]}")
+            print(f"    Size: {doc_info.get('content_length', 0):,} characters")
+            return await cognee_service._generate_document_summary(doc_info['full_content'], metadata)
+    
+    results = await asyncio.gather(*(
+        generate_summary(i, fingerprint, doc_info)
+        for i, (fingerprint, doc_info) in enumerate(docs_needing_summaries, 1)
+    ), return_exceptions=True)
+    
+    # Every summary in the batch has finished by now, so they share one timestamp
+    generated_at = datetime.now().isoformat()
+    
+    print(f"\n📋 Results:")
+    for (fingerprint, doc_info), summary in zip(docs_needing_summaries, results):
+        metadata = doc_info.get('metadata', {})
+        print(f"\n📄 {metadata.get('company_name', 'Unknown')} {metadata.get('form_type', 'Unknown')} [{fingerprint[:8]}]")
         
         try:
-            # Generate summary
-            full_content = doc_info['full_content']
-            summary = await cognee_service._generate_document_summary(full_content, metadata)
+            if isinstance(summary, Exception):
+                raise summary
             
             if summary:
                 # Add summary to document info
                 doc_info['summary'] = summary
-                doc_info['summary_generated_at'] = datetime.now().isoformat()
+                doc_info['summary_generated_at'] = generated_at
+                updated_fingerprints.append(fingerprint)
                 
                 print(f"    ✅ Summary generated successfully")
                 successful += 1
@@ -98,10 +120,10 @@ async def add_summaries_to_existing_docs():
             print(f"    ❌ Error: {str(e)}")
             failed += 1
     
-    # Save updated registry
+    # Save only the updated registry entries
     if successful > 0:
         print(f"\n💾 Saving updated registry...")
-        cognee_service._save_document_registry()
+        cognee_service._save_registry_entries(updated_fingerprints)
         print(f"✅ Registry saved with {successful} new summaries")
     
     # Final report
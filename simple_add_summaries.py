@@ -9,14 +9,9 @@ import sys
 import django
 from datetime import datetime
 
-# Setup Django
+# Django settings; django.setup() and the service imports happen in main(), not at import
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finDocGPT.settings')
-django.setup()
-
-from documents.models import Document
-from services.cognee_service import CogneeService
-from services.edgar_service import EdgarService
 
 def main():
     """Main function to add summaries"""
@@ -24,9 +19,13 @@ def main():
     print("🚀 Adding Summaries from Django Database")
     print("="*50)
     
-    # Initialize services
+    django.setup()
+    from documents.models import Document
+    from services.cognee_service import CogneeService
+    
+    # Initialize services (Edgar only if a document has to be fetched)
     cognee_service = CogneeService()
-    edgar_service = EdgarService()
+    edgar_service = None
     
     if not cognee_service.is_configured:
         print("❌ CogneeService not configured!")
@@ -57,20 +56,24 @@ def main():
     
     print(f"\n🔍 Checking which documents have summaries...")
     
+    # accession_number -> (fingerprint, registry entry), looked up once for all Django documents
+    registry_by_accession = cognee_service.get_registry_entries_by_accession(
+        [doc.accession_number for doc in django_docs]
+    )
+    
     for doc in django_docs:
         # Check if this document is in Cognee registry with summary
         found_with_summary = False
         
-        for fingerprint, cognee_doc in cognee_service._document_registry.items():
-            cognee_metadata = cognee_doc.get('metadata', {})
-            if cognee_metadata.get('accession_number') == doc.accession_number:
-                if 'summary' in cognee_doc and cognee_doc['summary']:
-                    found_with_summary = True
-                    docs_already_have_summaries += 1
-                    print(f"   ✅ {doc.company_name} {doc.form_type} - Has summary")
-                else:
-                    print(f"   ⚠️  {doc.company_name} {doc.form_type} - In registry but no summary")
-                break
+        entry = registry_by_accession.get(doc.accession_number)
+        if entry:
+            _, cognee_doc = entry
+            if 'summary' in cognee_doc and cognee_doc['summary']:
+                found_with_summary = True
+                docs_already_have_summaries += 1
+                print(f"   ✅ {doc.company_name} {doc.form_type} - Has summary")
+            else:
+                print(f"   ⚠️  {doc.company_name} {doc.form_type} - In registry but no summary")
         
         if not found_with_summary:
             docs_needing_summaries.append(doc)
@@ -93,6 +96,13 @@ def main():
     # Process each document that needs a summary
     successful = 0
     failed = 0
+    updated_fingerprints = []  # Registry entries to write back in one transaction
+    
+    # Content hash -> existing summary, so identical filing text is only summarized once
+    summary_by_hash = {}
+    for cognee_doc in cognee_service._document_registry.values():
+        if cognee_doc.get('summary') and cognee_doc.get('content_hash'):
+            summary_by_hash.setdefault(cognee_doc['content_hash'], cognee_doc['summary'])
     
     for i, doc in enumerate(docs_needing_summaries, 1):
         print(f"\n📄 Processing {i}/{len(docs_needing_summaries)}: {doc.company_name} {doc.form_type}")
@@ -100,15 +110,7 @@ def main():
         
         try:
             # Check if document is already in Cognee registry (but without summary)
-            cognee_doc = None
-            cognee_fingerprint = None
-            
-            for fingerprint, existing_doc in cognee_service._document_registry.items():
-                existing_metadata = existing_doc.get('metadata', {})
-                if existing_metadata.get('accession_number') == doc.accession_number:
-                    cognee_doc = existing_doc
-                    cognee_fingerprint = fingerprint
-                    break
+            cognee_fingerprint, cognee_doc = registry_by_accession.get(doc.accession_number, (None, None))
             
             # Get document content
             if cognee_doc and 'full_content' in cognee_doc:
@@ -118,6 +120,9 @@ def main():
             else:
                 # Fetch content from Edgar
                 print(f"    📥 Fetching content from Edgar...")
+                if edgar_service is None:
+                    from services.edgar_service import EdgarService
+                    edgar_service = EdgarService()
                 content_data = edgar_service.get_filing_content(doc.accession_number, doc.cik)
                 
                 if not content_data:
@@ -125,7 +130,9 @@ def main():
                     failed += 1
                     continue
                 
-                content = content_data['content']
+                # Take the text out of the response so this filing is only referenced by `content`
+                # (and the registry entry below), not kept alive by content_data into the next iteration
+                content = content_data.pop('content')
                 print(f"    📥 Content fetched from Edgar ({len(content):,} chars)")
             
             # Prepare metadata
@@ -138,27 +145,40 @@ def main():
                 'cik': doc.cik
             }
             
-            # Generate summary using the sync wrapper
-            print(f"    🤖 Generating summary...")
-            try:
-                summary = cognee_service._run_async(
-                    cognee_service._generate_document_summary(content, metadata)
-                )
-            except Exception as summary_error:
-                print(f"    ❌ Summary generation failed: {summary_error}")
-                failed += 1
-                continue
+            # Hash the content once; it is reused for the summary lookup and the fingerprint
+            content_hash = cognee_service._hash_content(content)
             
+            summary = summary_by_hash.get(content_hash)
             if summary:
+                print(f"    ♻️  Reusing summary of an identical document")
+            else:
+                # Generate summary using the sync wrapper
+                print(f"    🤖 Generating summary...")
+                try:
+                    summary = cognee_service._run_async(
+                        cognee_service._generate_document_summary(content, metadata)
+                    )
+                except Exception as summary_error:
+                    print(f"    ❌ Summary generation failed: {summary_error}")
+                    failed += 1
+                    continue
+                if summary:
+                    summary_by_hash[content_hash] = summary
+            
+            if summary:
+                # One timestamp per document; summaries take 30-60s each, so a per-batch one would drift
+                generated_at = datetime.now().isoformat()
+                
                 # Update or create Cognee registry entry
                 if cognee_doc:
                     # Update existing entry with summary
                     cognee_doc['summary'] = summary
-                    cognee_doc['summary_generated_at'] = datetime.now().isoformat()
+                    cognee_doc['summary_generated_at'] = generated_at
+                    updated_fingerprints.append(cognee_fingerprint)
                     print(f"    ✅ Summary added to existing Cognee entry [{cognee_fingerprint[:8]}]")
                 else:
                     # Create new Cognee registry entry
-                    fingerprint = cognee_service._create_document_fingerprint(content, metadata)
+                    fingerprint = cognee_service._create_document_fingerprint(content, metadata, content_hash)
                     doc_info = {
                         'fingerprint': fingerprint,
                         'metadata': metadata,
@@ -166,11 +186,12 @@ def main():
                         'content_length': len(content),
                         'content_preview': content[:2000],
                         'full_content': content,
-                        'stored_at': datetime.now().isoformat(),
-                        'content_hash': cognee_service._create_document_fingerprint(content, metadata),
-                        'summary_generated_at': datetime.now().isoformat()
+                        'stored_at': generated_at,
+                        'content_hash': content_hash,
+                        'summary_generated_at': generated_at
                     }
                     cognee_service._document_registry[fingerprint] = doc_info
+                    updated_fingerprints.append(fingerprint)
                     print(f"    ✅ New Cognee registry entry created [{fingerprint[:8]}]")
                 
                 successful += 1
@@ -188,11 +209,11 @@ def main():
             print(f"    ❌ Error: {str(e)}")
             failed += 1
     
-    # Save updated registry
+    # Save only the updated registry entries
     if successful > 0:
         print(f"\n💾 Saving updated Cognee registry...")
         try:
-            cognee_service._save_document_registry()
+            cognee_service._save_registry_entries(updated_fingerprints)
             print(f"✅ Registry saved with {successful} new summaries")
         except Exception as e:
             print(f"❌ Error saving registry: {e}")
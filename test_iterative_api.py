@@ -6,22 +6,20 @@ This script tests the new API endpoints for iterative analysis.
 Run the Django server first, then run this script.
 """
 
-import requests
-import json
 import time
 from datetime import datetime
 
-BASE_URL = "http://localhost:8000"
+from api_test_client import BASE_URL, SESSION, parse_json, poll_until
 
 def test_service_status():
     """Test if the iterative analysis service is available"""
     print("🔍 Testing service status...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/analysis/iterative/service_status/")
+        response = SESSION.get(f"{BASE_URL}/api/analysis/iterative/service_status/")
         
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             print(f"✅ Service available: {data.get('available', False)}")
             print(f"   Documents available: {data.get('documents_available', 0)}")
             print(f"   Companies available: {data.get('companies_available', 0)}")
@@ -41,7 +39,7 @@ def test_create_analysis():
     test_query = "Analyze Apple Inc's investment potential based on recent SEC filings"
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/analysis/iterative/",
             json={
                 "query": test_query,
@@ -50,7 +48,7 @@ def test_create_analysis():
         )
         
         if response.status_code == 201:
-            data = response.json()
+            data = parse_json(response)
             analysis_id = data.get('id')
             print(f"✅ Analysis created successfully!")
             print(f"   ID: {analysis_id}")
@@ -70,46 +68,40 @@ def test_analysis_status(analysis_id):
     """Test checking analysis status"""
     print(f"\n📊 Testing analysis status (ID: {analysis_id})...")
     
-    max_checks = 20  # Maximum number of status checks
-    check_interval = 15  # Seconds between checks
+    started = time.monotonic()
+    checks = 0
     
-    for check in range(max_checks):
-        try:
-            response = requests.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/status/")
-            
-            if response.status_code == 200:
-                data = response.json()
-                status = data.get('status')
-                progress = data.get('progress', {})
-                
-                print(f"   Check {check + 1}: Status = {status}")
-                print(f"   Progress: {progress.get('total_iterations', 0)} iterations, " +
-                      f"{progress.get('rag_queries_executed', 0)} RAG queries")
-                
-                if status == 'COMPLETED':
-                    print(f"✅ Analysis completed!")
-                    print(f"   Final recommendation: {data.get('final_recommendation', 'N/A')}")
-                    print(f"   Confidence level: {data.get('confidence_level', 'N/A')}")
-                    return True
-                elif status == 'FAILED':
-                    print(f"❌ Analysis failed: {data.get('error_message', 'Unknown error')}")
-                    return False
-                elif status == 'IN_PROGRESS':
-                    print(f"   ⏳ Still processing... waiting {check_interval} seconds")
-                    time.sleep(check_interval)
-                else:
-                    print(f"   ❓ Unknown status: {status}")
-                    time.sleep(check_interval)
-                    
-            else:
-                print(f"❌ Status check failed: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error checking status: {str(e)}")
-            return False
+    def report(data):
+        nonlocal checks
+        checks += 1
+        progress = data.get('progress', {})
+        print(f"   Update {checks} (+{time.monotonic() - started:.0f}s): Status = {data.get('status')}")
+        print(f"   Progress: {progress.get('total_iterations', 0)} iterations, " +
+              f"{progress.get('rag_queries_executed', 0)} RAG queries")
+    
+    try:
+        data = poll_until(
+            f"{BASE_URL}/api/analysis/iterative/{analysis_id}/status/",
+            on_update=report
+        )
+    except Exception as e:
+        print(f"❌ Error checking status: {str(e)}")
+        return False
+    
+    if data is None:
+        print(f"⏰ Analysis did not complete within the polling timeout")
+        return False
     
-    print(f"⏰ Analysis did not complete within {max_checks * check_interval} seconds")
+    status = data.get('status')
+    if status == 'COMPLETED':
+        print(f"✅ Analysis completed!")
+        print(f"   Final recommendation: {data.get('final_recommendation', 'N/A')}")
+        print(f"   Confidence level: {data.get('confidence_level', 'N/A')}")
+        return True
+    elif status == 'FAILED':
+        print(f"❌ Analysis failed: {data.get('error_message', 'Unknown error')}")
+    else:
+        print(f"❌ Analysis ended with status: {status}")
     return False
 
 def test_analysis_results(analysis_id):
@@ -117,10 +109,10 @@ def test_analysis_results(analysis_id):
     print(f"\n📋 Testing analysis results (ID: {analysis_id})...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/results/")
+        response = SESSION.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/results/")
         
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             
             print("✅ Results retrieved successfully!")
             print(f"   Query: {data.get('query', 'N/A')[:50]}...")
@@ -151,10 +143,10 @@ def test_iteration_details(analysis_id):
     print(f"\n🔍 Testing iteration details (ID: {analysis_id})...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/iteration_details/")
+        response = SESSION.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/iteration_details/")
         
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             
             print("✅ Iteration details retrieved!")
             print(f"   Total iterations: {data.get('total_iterations', 0)}")
@@ -191,13 +183,13 @@ def test_demo_analysis():
     print("\n🎮 Testing demo analysis...")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/analysis/iterative/demo_analysis/",
             json={"query": "Quick demo analysis of available companies"}
         )
         
         if response.status_code == 201:
-            data = response.json()
+            data = parse_json(response)
             print("✅ Demo analysis started!")
             print(f"   ID: {data.get('id')}")
             print(f"   Demo mode: {data.get('demo_mode', False)}")
@@ -257,6 +249,7 @@ def main():
     print(f"   GET    {BASE_URL}/api/analysis/iterative/{{id}}/status/")
     print(f"   GET    {BASE_URL}/api/analysis/iterative/{{id}}/results/")
     print(f"   GET    {BASE_URL}/api/analysis/iterative/{{id}}/iteration_details/")
+    print(f"   GET    {BASE_URL}/api/analysis/iterative/{{id}}/snapshot/")
     print(f"   GET    {BASE_URL}/api/analysis/iterative/service_status/")
     print(f"   POST   {BASE_URL}/api/analysis/iterative/demo_analysis/")
 
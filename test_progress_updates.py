@@ -3,11 +3,12 @@
 Test script to verify that progress updates are working during iterative analysis
 """
 
-import requests
 import time
-import json
 
-BASE_URL = "http://localhost:8000"
+from api_test_client import BASE_URL, SESSION, parse_json, poll_until
+
+# Order of the values in each polled state tuple
+STATE_FIELDS = ('status', 'iterations', 'rag_queries', 'score', 'history_length')
 
 def test_progress_updates():
     """Test that progress updates work during analysis"""
@@ -16,7 +17,7 @@ def test_progress_updates():
     
     # Step 1: Create a new analysis
     print("\n1️⃣ Creating new analysis...")
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/api/analysis/iterative/",
         json={
             "query": "Analyze Apple Inc's investment potential based on recent SEC filings",
@@ -29,7 +30,7 @@ def test_progress_updates():
         print(response.text)
         return
     
-    analysis_data = response.json()
+    analysis_data = parse_json(response)
     analysis_id = analysis_data['id']
     print(f"✅ Analysis created with ID: {analysis_id}")
     
@@ -38,59 +39,53 @@ def test_progress_updates():
     print("Time | Status | Iterations | RAG Queries | Score | History Length")
     print("-" * 70)
     
-    previous_state = {}
+    previous_state = None
+    iteration_history = []
     updates_detected = []
     
-    for check in range(60):  # Monitor for up to 10 minutes (60 * 10 seconds)
-        try:
-            # Get status
-            status_response = requests.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/status/")
-            if status_response.status_code != 200:
-                print(f"❌ Failed to get status: {status_response.status_code}")
-                break
-                
-            status_data = status_response.json()
-            
-            # Get iteration details
-            details_response = requests.get(f"{BASE_URL}/api/analysis/iterative/{analysis_id}/iteration_details/")
-            if details_response.status_code != 200:
-                print(f"❌ Failed to get iteration details: {details_response.status_code}")
-                break
-                
-            details_data = details_response.json()
-            
-            # Extract current state
-            current_state = {
-                'status': status_data.get('status'),
-                'iterations': status_data.get('progress', {}).get('total_iterations', 0),
-                'rag_queries': status_data.get('progress', {}).get('rag_queries_executed', 0),
-                'score': status_data.get('progress', {}).get('final_completeness_score', 0),
-                'history_length': len(details_data.get('iteration_history', []))
-            }
-            
-            # Check for updates
-            if current_state != previous_state:
-                timestamp = time.strftime("%H:%M:%S")
-                print(f"{timestamp} | {current_state['status']:11} | {current_state['iterations']:10} | {current_state['rag_queries']:11} | {current_state['score']:5.1f} | {current_state['history_length']:14}")
-                
-                # Record the update
-                updates_detected.append({
-                    'time': timestamp,
-                    'state': current_state.copy()
-                })
-                
-                previous_state = current_state.copy()
+    def record(snapshot):
+        nonlocal previous_state
+        # Only the history steps we did not already hold are sent back
+        iteration_history.extend(snapshot.get('iteration_history', []))
+        
+        # Extract current state as a fixed-order tuple; a single tuple compare
+        # detects changes, and the dict is only built when something moved
+        progress = snapshot.get('progress', {})
+        current_state = (
+            snapshot.get('status'),
+            progress.get('total_iterations', 0),
+            progress.get('rag_queries_executed', 0),
+            progress.get('final_completeness_score', 0),
+            len(iteration_history)
+        )
+        
+        # Check for updates
+        if current_state != previous_state:
+            timestamp = time.strftime("%H:%M:%S")
+            state = dict(zip(STATE_FIELDS, current_state))
+            print(f"{timestamp} | {state['status']:11} | {state['iterations']:10} | {state['rag_queries']:11} | {state['score']:5.1f} | {state['history_length']:14}")
             
-            # Stop if analysis is complete
-            if current_state['status'] in ['COMPLETED', 'FAILED', 'CANCELLED']:
-                print(f"\n✅ Analysis finished with status: {current_state['status']}")
-                break
-                
-        except Exception as e:
-            print(f"❌ Error during monitoring: {str(e)}")
-            break
+            # Record the update
+            updates_detected.append({
+                'time': timestamp,
+                'state': state
+            })
             
-        time.sleep(10)  # Check every 10 seconds
+            previous_state = current_state
+    
+    # Monitor for up to 10 minutes, checking at least every 10 seconds
+    try:
+        final_snapshot = poll_until(
+            f"{BASE_URL}/api/analysis/iterative/{analysis_id}/snapshot/",
+            on_update=record,
+            params=lambda: {'since_step': len(iteration_history)},
+            max_interval=10,
+            timeout=600
+        )
+        if final_snapshot:
+            print(f"\n✅ Analysis finished with status: {final_snapshot.get('status')}")
+    except Exception as e:
+        print(f"❌ Error during monitoring: {str(e)}")
     
     # Step 3: Analyze results
     print(f"\n3️⃣ Analysis Results:")